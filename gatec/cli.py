@@ -0,0 +1,372 @@
+import argparse
+import math
+import os
+
+# Most values one sweep may run over; a tiny --step would otherwise exhaust memory
+MAX_SWEEP_VALUES = 100000
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='gatec', description="GATEC total efficiency calculator")
+    parser.add_argument('--db', help="Path to the history database (defaults to data/history.db)")
+    commands = parser.add_subparsers(dest='command')
+
+    commands.add_parser('gui', help="Launch the desktop application (default)")
+
+    serve_parser = commands.add_parser('serve', help="Run the local HTTP calculation service")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--workers', type=int, default=None, help="Calculation processes (default: CPU count)")
+    serve_parser.add_argument('--max-pending', type=int, default=10000,
+                              help="Queued calculations before requests are refused with 503")
+
+    commands.add_parser('compact', help="Merge duplicate calculations saved before input hashing")
+
+    commands.add_parser('migrate', help="Show the database schema version and finish pending data backfills")
+
+    prune_parser = commands.add_parser('prune', help="Archive and delete old calculations (retention policy)")
+    prune_parser.add_argument('--max-age-days', type=float, default=None)
+    prune_parser.add_argument('--max-rows', type=int, default=None)
+    prune_parser.add_argument('--archive-dir', default=None)
+    prune_parser.add_argument('--no-archive', action='store_true', help="Delete without writing an archive")
+
+    export_parser = commands.add_parser('export', help="Export the calculation history")
+    export_parser.add_argument('output', help="Output file (csv, jsonl, arrow) or directory (npy)")
+    export_parser.add_argument('--format', choices=['csv', 'jsonl', 'npy', 'arrow'], default='csv')
+    export_parser.add_argument('--chunk-size', type=int, default=10000)
+
+    import_parser = commands.add_parser('import', help="Import past calculations from a CSV or JSONL file")
+    import_parser.add_argument('input', help="CSV or JSONL file with one calculation per row")
+    import_parser.add_argument('--report', default=None, help="Write the per-row error report to this CSV file")
+    import_parser.add_argument('--chunk-size', type=int, default=20000)
+    import_parser.add_argument('--restart', action='store_true',
+                               help="Start over instead of resuming an interrupted import of the same file")
+
+    report_parser = commands.add_parser('report', help="Render PDF/PNG/SVG reports for saved calculations")
+    report_parser.add_argument('ids', nargs='*', type=int, help="Calculation ids (default: all)")
+    report_parser.add_argument('--out', default='reports', help="Output directory")
+    report_parser.add_argument('--format', choices=['pdf', 'png', 'svg'], default='pdf')
+    report_parser.add_argument('--workers', type=int, default=None, help="Rendering processes (default: CPU count)")
+
+    plants_parser = commands.add_parser('plants', help="List registered plants or show one plant's history")
+    plants_parser.add_argument('location', nargs='?', help="Plant as \"Name - Country\"")
+    plants_parser.add_argument('--limit', type=int, default=20, help="Calculations to show for a plant")
+
+    sweep_parser = commands.add_parser('sweep', help="Sweep one input over many plants through a work spool")
+    sweep_parser.add_argument('plants', help="CSV or JSONL file of plants in the import format")
+    sweep_parser.add_argument('--field', required=True, help="Input field to sweep, e.g. ccs_capture")
+    sweep_parser.add_argument('--start', type=float, required=True)
+    sweep_parser.add_argument('--stop', type=float, required=True)
+    sweep_parser.add_argument('--step', type=float, default=1.0)
+    sweep_parser.add_argument('--spool', default=os.path.join('data', 'spool.db'),
+                              help="Work queue database, on a share the worker nodes can reach")
+    sweep_parser.add_argument('--workers', type=int, default=None,
+                              help="Local worker processes (default: CPU count; 0 waits for remote workers)")
+    sweep_parser.add_argument('--chunk-size', type=int, default=1000, help="Plants per work item")
+    sweep_parser.add_argument('--out', default='sweep.npz', help="Result arrays (NumPy .npz)")
+    sweep_parser.add_argument('--restart', action='store_true',
+                              help="Recompute everything instead of reusing finished chunks of the same sweep")
+
+    fleet_parser = commands.add_parser('fleet', help="Fleet totals and each plant's contribution to fleet efficiency")
+    fleet_parser.add_argument('plants', help="CSV or JSONL file of plants in the import format")
+    fleet_parser.add_argument('--top', type=int, default=10, help="Plants to list by efficiency contribution")
+
+    series_parser = commands.add_parser('timeseries', help="Evaluate a plant over interval operating data (e.g. hourly)")
+    series_parser.add_argument('input', help="CSV with output, efficiency and optional ccs columns, one row per interval")
+    plant_source = series_parser.add_mutually_exclusive_group(required=True)
+    plant_source.add_argument('--calculation', type=int, help="Saved calculation whose inputs describe the plant")
+    plant_source.add_argument('--plant', help="JSON file with the plant inputs (stage consumptions, CCS, emissions)")
+    series_parser.add_argument('--window', type=float, default=24, help="Rolling window in hours")
+    series_parser.add_argument('--step', type=float, default=1.0, help="Hours per row")
+    series_parser.add_argument('--chunk-size', type=int, default=8760)
+    series_parser.add_argument('--out', default=None, help="Write per-interval and rolling results to this CSV file")
+
+    ccs_parser = commands.add_parser('optimize-ccs', help="Pareto frontier of CCS option combinations for a plant")
+    plant_source = ccs_parser.add_mutually_exclusive_group(required=True)
+    plant_source.add_argument('--calculation', type=int, help="Saved calculation whose inputs describe the plant")
+    plant_source.add_argument('--plant', help="JSON file with the plant inputs")
+    ccs_parser.add_argument('--min-efficiency', type=float, default=None, help="Drop options below this total efficiency (%%)")
+    ccs_parser.add_argument('--max-emissions', type=float, default=None, help="Drop options above this (kg CO2/MWh)")
+    ccs_parser.add_argument('--workers', type=int, default=None, help="Processes for large option sets (default: CPU count)")
+
+    blend_parser = commands.add_parser('blend-sweep', help="Sweep a fuel blend ratio (co-firing) over many plants")
+    blend_parser.add_argument('plants', help="CSV or JSONL file of plants in the import format")
+    blend_parser.add_argument('--base', required=True, help="Fuel or blend at 0 %%, e.g. Coal")
+    blend_parser.add_argument('--blend', required=True, help="Fuel or blend at 100 %%, e.g. \"Natural gas 70, Hydrogen 30\"")
+    blend_parser.add_argument('--start', type=float, default=0.0)
+    blend_parser.add_argument('--stop', type=float, default=100.0)
+    blend_parser.add_argument('--step', type=float, default=1.0)
+    blend_parser.add_argument('--region', default=None)
+    blend_parser.add_argument('--route', default=None)
+    blend_parser.add_argument('--year', type=int, default=None)
+    blend_parser.add_argument('--out', default='blend.npz', help="Result arrays (NumPy .npz)")
+
+    worker_parser = commands.add_parser('sweep-worker', help="Process sweep work items from a spool")
+    worker_parser.add_argument('spool', help="Work queue database shared with the coordinator")
+    worker_parser.add_argument('--idle-exit', action='store_true', help="Stop when the spool has no work left")
+    worker_parser.add_argument('--lease', type=float, default=60, help="Seconds before an unfinished item is retried")
+
+    return parser
+
+
+def load_plant_inputs(args):
+    """Calculator inputs from --plant (JSON file) or --calculation (saved id); None if not found"""
+    import json
+    from gatec.core.batch import NUMERIC_FIELDS, FLAG_FIELDS
+    if args.plant:
+        with open(args.plant) as f:
+            inputs = json.load(f)
+    else:
+        from gatec.core.db_manager import db
+        rows = db.get_calculations([args.calculation])
+        if not rows:
+            print(f"Calculation {args.calculation} not found")
+            return None
+        inputs = json.loads(rows[0]['inputs_json'] or '{}')
+    return {field: value for field, value in inputs.items() if field in NUMERIC_FIELDS or field in FLAG_FIELDS}
+
+
+def sweep_values(args, low=None, high=None):
+    """
+    The values from --start to --stop (inclusive) in --step increments,
+    optionally kept within low..high; None after printing why they are invalid.
+    """
+    import numpy as np
+    if not all(math.isfinite(value) for value in (args.start, args.stop, args.step)):
+        print("--start, --stop and --step must be numbers")
+    elif args.step <= 0:
+        print("--step must be greater than 0")
+    elif args.stop < args.start:
+        print("--stop must not be below --start")
+    elif (low is not None and args.start < low) or (high is not None and args.stop > high):
+        print(f"--start and --stop must be within {low:g}-{high:g}")
+    elif (args.stop - args.start) / args.step + 1 > MAX_SWEEP_VALUES:
+        print(f"Too many values: a sweep covers at most {MAX_SWEEP_VALUES}")
+    else:
+        values = np.arange(args.start, args.stop + args.step / 2, args.step)
+        # The half step of slack includes --stop despite rounding, but must not add a value past it
+        return values[values <= args.stop + args.step * 1e-9]
+    return None
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Must be set before gatec.core.db_manager creates its singleton
+    if args.db:
+        os.environ['GATEC_DB_PATH'] = os.path.abspath(args.db)
+
+    if args.command == 'serve':
+        from gatec.service.server import serve
+        serve(host=args.host, port=args.port, workers=args.workers, max_pending=args.max_pending)
+    elif args.command == 'compact':
+        from gatec.core.db_manager import db
+        removed = db.compact_duplicates()
+        print(f"Removed {removed} duplicate calculations")
+    elif args.command == 'migrate':
+        import sqlite3
+        from gatec.core.db_manager import db
+        status = db.schema_status()
+        print(f"Schema version {status['version']} (latest {status['latest']})")
+        for version, name, rows in status['backfills']:
+            print(f"  backfill {version} ({name}): {rows} rows done so far")
+        try:
+            db.run_backfills(progress=lambda migration, rows: print(f"  backfill {migration['version']}: {rows} rows"))
+        except sqlite3.Error as e:
+            print(f"Backfill stopped: {e}; run gatec migrate again to resume")
+            return
+        print("All backfills done")
+    elif args.command == 'prune':
+        from gatec.core.db_manager import db
+        from gatec.core.data_manager import get_retention_policy
+        policy = get_retention_policy()
+        removed, archive_path = db.apply_retention(
+            max_age_days=args.max_age_days if args.max_age_days is not None else policy['max_age_days'],
+            max_rows=args.max_rows if args.max_rows is not None else policy['max_rows'],
+            archive_dir=None if args.no_archive else (args.archive_dir or policy['archive_dir']),
+        )
+        print(f"Removed {removed} calculations" + (f", archived to {archive_path}" if archive_path else ""))
+    elif args.command == 'export':
+        from gatec.core.db_manager import db
+        from gatec.core.export import export_history
+        count = export_history(db, args.output, fmt=args.format, chunk_size=args.chunk_size)
+        print(f"Exported {count} calculations to {args.output}")
+    elif args.command == 'import':
+        from gatec.core.db_manager import db
+        from gatec.core.importer import import_file
+        summary = import_file(db, args.input, chunk_size=args.chunk_size, report_path=args.report,
+                              resume=not args.restart)
+        if summary['already_done']:
+            print("This file was already imported; use --restart to import it again")
+        elif summary['resumed_chunks']:
+            print(f"Resumed after {summary['resumed_chunks']} finished chunks")
+        print(f"Imported {summary['imported']} of {summary['rows']} rows, {summary['rejected']} rejected")
+        if not summary['complete']:
+            print("Import stopped early; run the same command again to continue")
+        for line, message in summary['errors'][:10]:
+            print(f"  line {line}: {message}")
+        if len(summary['errors']) > 10:
+            print(f"  ... {len(summary['errors']) - 10} more" + (f", see {args.report}" if args.report else ""))
+    elif args.command == 'report':
+        from gatec.core.db_manager import db
+        from gatec.core.reports import render_reports
+        ids = args.ids or [row['id'] for row in db.get_history()]
+        outcomes = render_reports(db, ids, args.out, fmt=args.format, workers=args.workers)
+        failed = [(calc_id, error) for calc_id, _, error in outcomes if error]
+        print(f"Rendered {len(outcomes) - len(failed)} reports to {args.out}")
+        for calc_id, error in failed:
+            print(f"  calculation {calc_id}: {error}")
+    elif args.command == 'plants':
+        from gatec.core.db_manager import db
+        db.run_backfills()  # link rows saved before the registry, if the app has not yet
+        if not args.location:
+            for plant in db.get_plants():
+                country = f" - {plant['country']}" if plant['country'] else ""
+                print(f"{plant['id']:>5}  {plant['name']}{country}  ({plant['fuel'] or 'unknown fuel'})")
+            return
+        plant = db.find_plant(args.location)
+        if plant is None:
+            print(f"No plant registered as {args.location}")
+            return
+        for row in db.get_plant_history(plant['id'], limit=args.limit):
+            print(f"{row['timestamp']}  efficiency {row['total_efficiency']:.2f}%  drop {row['efficiency_drop']:.2f}%"
+                  f"  emissions {row['total_emissions']:.2f}  runs {row['run_count']}")
+    elif args.command == 'sweep':
+        import numpy as np
+        from gatec.core.batch import NUMERIC_FIELDS
+        from gatec.core.spool import read_plants, run_sweep, SWEEP_OUTPUTS
+        if args.field not in NUMERIC_FIELDS:
+            print(f"Cannot sweep {args.field}; choose one of {', '.join(NUMERIC_FIELDS)}")
+            return
+        values = sweep_values(args)
+        if values is None:
+            return
+        names, columns, errors = read_plants(args.plants)
+        for line, message in errors[:10]:
+            print(f"  line {line}: {message}")
+        if not names:
+            print("No valid plants to sweep")
+            return
+        try:
+            results = run_sweep(args.spool, columns, args.field, values, workers=args.workers,
+                                chunk_size=args.chunk_size, resume=not args.restart)
+        except ValueError as e:
+            print(e)
+            return
+        np.savez(args.out, names=np.array(names), values=results['values'],
+                 **{name: results[name] for name in SWEEP_OUTPUTS})
+        print(f"Swept {len(names)} plants over {len(values)} values of {args.field}, saved to {args.out}")
+        for start, stop, error in results['failed']:
+            print(f"  plants {start}-{stop - 1} failed: {error}")
+    elif args.command == 'fleet':
+        import numpy as np
+        from gatec.core.spool import read_plants
+        from gatec.core.fleet import Fleet
+        names, columns, errors = read_plants(args.plants)
+        for line, message in errors[:10]:
+            print(f"  line {line}: {message}")
+        if not names:
+            print("No valid plants in the fleet")
+            return
+        fleet = Fleet(names=names, columns=columns)
+        summary = fleet.summary()
+        print(f"{summary['plant_count']} plants, {summary['total_output']:.1f} MW output")
+        print(f"  total efficiency {summary['total_efficiency']:.2f}% (capacity-weighted), "
+              f"system efficiency {summary['system_efficiency']:.2f}%")
+        print(f"  emissions {summary['emissions_intensity']:.2f} kg CO2/MWh, {summary['total_emissions']:.0f} kg CO2/h")
+        print("  energy by stage: " + ", ".join(f"{stage} {share * 100:.1f}%"
+                                                for stage, share in summary['stage_shares'].items()))
+        contributions = fleet.marginal_contributions()
+        order = np.argsort(-np.abs(contributions['efficiency_contribution']))[:args.top]
+        for i in order:
+            name = contributions['names'][i] or f"plant {i + 1}"
+            print(f"  {name}: {contributions['efficiency_contribution'][i]:+.3f} pts"
+                  f" ({contributions['capacity_share'][i] * 100:.1f}% of output)")
+    elif args.command == 'timeseries':
+        import csv
+        import numpy as np
+        from gatec.core.timeseries import stream_timeseries, TimeSeriesCalculator, SERIES_OUTPUTS
+        plant = load_plant_inputs(args)
+        if plant is None:
+            return
+
+        out = open(args.out, 'w', newline='') if args.out else None
+        try:
+            writer = csv.writer(out) if out else None
+            if writer:
+                writer.writerow(['interval', *SERIES_OUTPUTS])
+            calculator, offset = None, 0
+            for calculator, results in stream_timeseries(args.input, plant, window_hours=args.window,
+                                                         step_hours=args.step, chunk_size=args.chunk_size):
+                count = len(results['total_efficiency'])
+                if writer:
+                    rows = np.column_stack([results[name] for name in SERIES_OUTPUTS]).tolist()
+                    writer.writerows([interval, *row] for interval, row in enumerate(rows, offset))
+                offset += count
+        except ValueError as e:
+            print(e)
+            return
+        finally:
+            if out:
+                out.close()
+        summary = (calculator or TimeSeriesCalculator(plant)).summary()
+        print(f"{summary['intervals']} intervals, {summary['hours']:g} h ({summary['ccs_hours']:g} h with CCS), "
+              f"{summary['energy_output']:.0f} MWh output")
+        print(f"  total efficiency {summary['total_efficiency']:.2f}%, plant efficiency {summary['plant_efficiency']:.2f}%,"
+              f" drop {summary['efficiency_drop']:.2f}%")
+        print(f"  emissions {summary['total_emissions']:.2f} kg CO2/MWh, {summary['emissions_mass'] / 1000:.1f} t CO2")
+        if calculator and calculator.errors:
+            print(f"{summary['rejected']} rows left out:")
+            for line, message in calculator.errors[:10]:
+                print(f"  line {line}: {message}")
+            if len(calculator.errors) > 10:
+                print(f"  ... {len(calculator.errors) - 10} more")
+        if args.out:
+            print(f"Interval results saved to {args.out}")
+    elif args.command == 'optimize-ccs':
+        from gatec.core.ccs_optimizer import optimize_ccs, COMPONENTS
+        plant = load_plant_inputs(args)
+        if plant is None:
+            return
+        frontier = optimize_ccs(plant, min_efficiency=args.min_efficiency, max_emissions=args.max_emissions,
+                                workers=args.workers)
+        if not frontier:
+            print("No CCS configuration meets the constraints")
+            return
+        print(f"{len(frontier)} Pareto-optimal CCS configurations, most efficient first:")
+        for entry in frontier:
+            print(f"  {entry['total_efficiency']:6.2f}%  {entry['total_emissions']:8.2f} kg CO2/MWh"
+                  f"  net capture {entry['net_capture_rate'] * 100:5.1f}%  "
+                  + " / ".join(entry[component] for component in COMPONENTS))
+    elif args.command == 'blend-sweep':
+        import numpy as np
+        from gatec.core.spool import read_plants, SWEEP_OUTPUTS
+        from gatec.core.blending import calculate_blend_sweep
+        shares = sweep_values(args, low=0.0, high=100.0)
+        if shares is None:
+            return
+        names, columns, errors = read_plants(args.plants)
+        for line, message in errors[:10]:
+            print(f"  line {line}: {message}")
+        if not names:
+            print("No valid plants to sweep")
+            return
+        try:
+            results = calculate_blend_sweep(columns, args.base, args.blend, shares,
+                                            regions=args.region, years=args.year, routes=args.route)
+        except ValueError as e:
+            print(e)
+            return
+        np.savez(args.out, names=np.array(names), shares=shares, **{name: results[name] for name in SWEEP_OUTPUTS})
+        print(f"Swept {len(names)} plants over {len(shares)} blend shares, saved to {args.out}")
+    elif args.command == 'sweep-worker':
+        from gatec.core.spool import run_worker
+        completed = run_worker(args.spool, idle_exit=args.idle_exit, lease_seconds=args.lease)
+        print(f"Completed {completed} work items")
+    else:
+        from gatec.gui.app import run
+        run()
+
+
+if __name__ == '__main__':
+    main()
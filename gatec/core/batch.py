@@ -0,0 +1,205 @@
+import numpy as np
+
+from gatec.core.stages import stage_model
+
+# Numeric inputs understood by calculate_results, with their defaults
+NUMERIC_FIELDS = {
+    'total_output': 0.0,
+    'extraction': 0.0,
+    'processing': 0.0,
+    'transportation': 0.0,
+    'generation': np.nan,  # NaN means "derive from plant_efficiency and total_output"
+    'plant_efficiency': 0.0,
+    'ccs_capture': 0.0,
+    'ccs_compression': 0.0,
+    'ccs_transportation': 0.0,
+    'ccs_storage': 0.0,
+    'emissions_value': 0.0,  # combustion factor, kg CO2/MWh of fuel
+    'upstream_emissions': 0.0,  # kg CO2/MWh of fuel-chain energy
+    'ccs_capture_rate': 0.9,
+    'sensitivity_value': 5.0,
+    'ccs_sensitivity_value': 5.0,
+}
+
+# Inputs of extra stages from the registry default to zero
+for _field in stage_model.fields:
+    NUMERIC_FIELDS.setdefault(_field, 0.0)
+
+FLAG_FIELDS = {
+    'ccs': False,
+    'include_emissions': False,
+}
+
+# Marker the v7 migration puts on inputs saved before emissions were modelled
+# per stage: their emissions_value is in g CO2/kg fuel, so it reads as NaN
+# rather than being taken as kg CO2/MWh of fuel
+LEGACY_EMISSION_UNITS = 'g CO2/kg fuel'
+
+CCS_FIELDS = stage_model.fields_in('ccs')
+STAGE_KEYS = stage_model.keys
+
+# Sensitivity steps: 100-2*i, 100-i, 100, 100+i, 100+2*i
+SENSITIVITY_STEPS = np.arange(-2, 3, dtype=float)
+
+
+def inputs_to_columns(inputs):
+    """
+    Convert a list of input dicts (as produced by InputScreen.collect_data)
+    into a dict of NumPy columns accepted by calculate_batch.
+    """
+    columns = {}
+    for field, default in NUMERIC_FIELDS.items():
+        columns[field] = np.array([_as_float(item.get(field), default) for item in inputs], dtype=float)
+    for field, default in FLAG_FIELDS.items():
+        columns[field] = np.array([bool(item.get(field, default)) for item in inputs], dtype=bool)
+    columns['emissions_value'][np.array([legacy_emissions(item) for item in inputs], dtype=bool)] = np.nan
+    return columns
+
+
+def legacy_emissions(input_data):
+    """True for saved inputs whose emissions_value is still in g CO2/kg fuel"""
+    return input_data.get('emissions_units') == LEGACY_EMISSION_UNITS
+
+
+def _as_float(value, default):
+    if value is None or value == '':
+        return default
+    return float(value)
+
+
+def _column(columns, field, n):
+    """Fetch a column broadcast to length n, falling back to the field default"""
+    if field in FLAG_FIELDS:
+        value = columns.get(field, FLAG_FIELDS[field])
+        return np.broadcast_to(np.asarray(value, dtype=bool), (n,))
+    value = columns.get(field, NUMERIC_FIELDS[field])
+    return np.broadcast_to(np.asarray(value, dtype=float), (n,))
+
+
+def _batch_size(columns):
+    sizes = [np.size(v) for v in columns.values() if np.ndim(v) > 0]
+    return max(sizes) if sizes else 1
+
+
+def calculate_batch(columns, sensitivity=True):
+    """
+    Vectorized counterpart of calculate_results.
+    Takes a dict of equal-length columns (scalars are broadcast) and returns
+    a dict of arrays; sensitivity results are (n, 5) matrices and are skipped
+    when sensitivity is False.
+    """
+    n = _batch_size(columns)
+
+    total_output = _column(columns, 'total_output', n)
+    plant_efficiency = _column(columns, 'plant_efficiency', n)
+    ccs_enabled = _column(columns, 'ccs', n)
+    include_emissions = _column(columns, 'include_emissions', n)
+
+    # Generation is derived the same way as calculate_generation when not supplied
+    generation = _column(columns, 'generation', n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        derived = np.where((total_output > 0) & (plant_efficiency > 0),
+                           total_output / (plant_efficiency / 100), 0.0)
+    generation = np.where(np.isnan(generation), derived, generation)
+
+    # 1. Energy inputs as an (n, fields) matrix, mapped to stages and totals by the stage model
+    energy = np.column_stack([_column(columns, field, n) for field in stage_model.fields])
+    energy[:, stage_model.generation_index] = generation
+    energy[:, stage_model.ccs_mask] = np.where(ccs_enabled[:, None], energy[:, stage_model.ccs_mask], 0.0)
+    total_energy, ccs_energy, scaled_energy = (energy @ stage_model.coefficients).T
+    stage_energy = energy @ stage_model.stage_matrix.T
+
+    # 2. Total efficiency
+    total_efficiency = _efficiency(total_output, total_energy)
+
+    # 3. Efficiency drop
+    efficiency_drop = np.maximum(0.0, plant_efficiency - total_efficiency)
+
+    # 4. Lifecycle emissions per stage (if enabled), kg CO2/MWh of output
+    stage_emissions, captured_emissions = stage_model.emissions(
+        stage_energy, total_output,
+        _column(columns, 'emissions_value', n),
+        _column(columns, 'upstream_emissions', n),
+        _column(columns, 'ccs_capture_rate', n),
+        ccs_enabled,
+    )
+    stage_emissions = np.where(include_emissions[:, None], stage_emissions, 0.0)
+    captured_emissions = np.where(include_emissions, captured_emissions, 0.0)
+    total_emissions = stage_emissions.sum(axis=1)
+
+    results = {
+        'total_energy': total_energy,
+        'total_efficiency': total_efficiency,
+        'efficiency_drop': efficiency_drop,
+        'total_emissions': total_emissions,
+        'energy_contributions': {key: stage_energy[:, i] for i, key in enumerate(STAGE_KEYS)},
+        'stage_emissions': {key: stage_emissions[:, i] for i, key in enumerate(STAGE_KEYS)},
+        'captured_emissions': captured_emissions,
+    }
+    if not sensitivity:
+        return results
+
+    # 6. CCS sensitivity: scale the CCS energy only
+    ccs_interval = _interval(_column(columns, 'ccs_sensitivity_value', n))
+    ccs_percentages = 100 + ccs_interval[:, None] * SENSITIVITY_STEPS
+    adjusted_total = (total_energy - ccs_energy)[:, None] + ccs_energy[:, None] * (ccs_percentages / 100)
+    ccs_sensitivity = _efficiency(total_output[:, None], adjusted_total)
+    ccs_sensitivity = np.where(ccs_enabled[:, None], ccs_sensitivity, total_efficiency[:, None])
+    ccs_percentages = np.where(ccs_enabled[:, None], ccs_percentages, 100.0)
+
+    # 7. General sensitivity: scale every non-generation component
+    interval = _interval(_column(columns, 'sensitivity_value', n))
+    general_percentages = 100 + interval[:, None] * SENSITIVITY_STEPS
+    adjusted_total = (total_energy - scaled_energy)[:, None] + scaled_energy[:, None] * (general_percentages / 100)
+    general_sensitivity = _efficiency(total_output[:, None], adjusted_total)
+
+    results.update({
+        'ccs_sensitivity': ccs_sensitivity,
+        'ccs_sensitivity_percentages': ccs_percentages,
+        'general_sensitivity_percentages': general_percentages,
+        'general_sensitivity': general_sensitivity,
+    })
+    return results
+
+
+def _efficiency(total_output, total_energy):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total_energy > 0, total_output / total_energy * 100, 0.0)
+
+
+def _interval(values):
+    return np.where(values > 0, values, 5.0)
+
+
+def row_results(batch, i):
+    """Extract row i of a calculate_batch result in the calculate_results format"""
+    return {
+        'total_efficiency': float(batch['total_efficiency'][i]),
+        'efficiency_drop': float(batch['efficiency_drop'][i]),
+        'total_emissions': float(batch['total_emissions'][i]),
+        'energy_contributions': {
+            stage: float(values[i]) for stage, values in batch['energy_contributions'].items()
+        },
+        'stage_emissions': {
+            stage: float(values[i]) for stage, values in batch['stage_emissions'].items()
+        },
+        'captured_emissions': float(batch['captured_emissions'][i]),
+        'ccs_sensitivity': batch['ccs_sensitivity'][i].tolist(),
+        'ccs_sensitivity_percentages': batch['ccs_sensitivity_percentages'][i].tolist(),
+        'general_sensitivity': {
+            'percentages': batch['general_sensitivity_percentages'][i].tolist(),
+            'efficiencies': batch['general_sensitivity'][i].tolist(),
+        },
+    }
+
+
+def calculate_sweep(input_data, field, values, sensitivity=False):
+    """Evaluate one scenario while varying a single numeric field over values"""
+    if field not in NUMERIC_FIELDS:
+        raise ValueError(f"Cannot sweep {field}")
+    columns = {k: v for k, v in input_data.items() if k in NUMERIC_FIELDS or k in FLAG_FIELDS}
+    if field in ('plant_efficiency', 'total_output'):
+        # Let generation follow the swept value
+        columns.pop('generation', None)
+    columns[field] = np.asarray(values, dtype=float)
+    return calculate_batch(columns, sensitivity=sensitivity)
@@ -0,0 +1,133 @@
+import re
+
+import numpy as np
+
+from gatec.core.batch import calculate_batch, _batch_size
+from gatec.core.reference_data import catalog, VALUE_FIELDS, to_predefined
+
+# Calculator input filled from each catalogued reference field
+BLEND_INPUTS = {field: ('emissions_value' if field == 'emissions' else field) for field in VALUE_FIELDS}
+
+# "Coal 80%", "Biomass: 20" or "Hydrogen 0.3"
+_PART = re.compile(r'^\s*(.+?)(?:\s+|\s*[:=]\s*)([0-9]*\.?[0-9]+)\s*%?\s*$')
+
+
+def parse_blend(blend):
+    """
+    Read a blend as a dict of fuel fractions of the heat input. Accepts a
+    dict {fuel: share}, a single fuel name, or text such as
+    "Coal 80%, Biomass 20%". Shares are normalised to sum to 1.
+    Raises ValueError for malformed or empty blends.
+    """
+    if isinstance(blend, dict):
+        parts = list(blend.items())
+    else:
+        text = str(blend or '').strip()
+        if not text:
+            raise ValueError("Empty blend")
+        pieces = [piece for piece in re.split(r'[,+;]', text) if piece.strip()]
+        if len(pieces) == 1 and not _PART.match(pieces[0]):
+            parts = [(pieces[0].strip(), 1.0)]
+        else:
+            parts = []
+            for piece in pieces:
+                match = _PART.match(piece)
+                if match is None:
+                    raise ValueError(f"Cannot read blend part: {piece.strip()}")
+                parts.append((match.group(1), match.group(2)))
+
+    fractions = {}
+    for fuel, share in parts:
+        share = float(share)
+        if share < 0:
+            raise ValueError(f"Negative share for {fuel}")
+        if share > 0:
+            fractions[fuel] = fractions.get(fuel, 0.0) + share
+    total = sum(fractions.values())
+    if total <= 0:
+        raise ValueError("Blend has no fuel with a positive share")
+    return {fuel: share / total for fuel, share in fractions.items()}
+
+
+def blend_label(fractions):
+    """Display name of a blend, e.g. "Coal 80% + Biomass 20%"; a single fuel keeps its name"""
+    if len(fractions) == 1:
+        return next(iter(fractions))
+    return " + ".join(f"{fuel} {share * 100:g}%" for fuel, share in
+                      sorted(fractions.items(), key=lambda item: -item[1]))
+
+
+def _check_fuels(fractions, reference):
+    known = set(reference.fuels())
+    unknown = [fuel for fuel in fractions if fuel not in known]
+    if unknown:
+        raise ValueError(f"Unknown fuel in blend: {', '.join(unknown)}")
+
+
+def resolve_blend(blend, region=None, year=None, route=None, reference=None):
+    """
+    Reference values of a blend in the predefined_values shape: every
+    consumption, emission factor and CCS figure is the heat-input weighted
+    mean of the blended fuels' catalogue values.
+    """
+    reference = reference or catalog
+    fractions = parse_blend(blend)
+    _check_fuels(fractions, reference)
+    values = dict.fromkeys(VALUE_FIELDS, 0.0)
+    for fuel, share in fractions.items():
+        fuel_values = reference.lookup(fuel, region=region, year=year, route=route)
+        for field in VALUE_FIELDS:
+            values[field] += share * fuel_values[field]
+    return to_predefined(values)
+
+
+def blend_columns(blend, n, regions=None, years=None, routes=None, reference=None):
+    """
+    Weighted reference values of a blend for n plants (each plant may have
+    its own region, year and route), as calculator input columns.
+    """
+    reference = reference or catalog
+    fractions = parse_blend(blend)
+    _check_fuels(fractions, reference)
+    columns = {field: np.zeros(n) for field in BLEND_INPUTS.values()}
+    for fuel, share in fractions.items():
+        values = reference.lookup_columns([fuel] * n, regions=regions, years=years, routes=routes)
+        for field, input_field in BLEND_INPUTS.items():
+            columns[input_field] += share * values[field]
+    return columns
+
+
+def calculate_blend_sweep(columns, base, blend, shares, regions=None, years=None, routes=None,
+                          sensitivity=False, reference=None):
+    """
+    Evaluate plants while the share of blend in their fuel goes over shares
+    (percent of heat input; the rest is base), e.g. coal to biomass co-firing
+    from 0 to 100 % in 1 % steps.
+
+    columns are plant inputs as accepted by calculate_batch (see
+    inputs_to_columns); their catalogued fields are replaced by the blend's.
+    Since blending is linear in the shares, all plants x shares rows go
+    through one calculate_batch call. Returns its results with every array
+    shaped (plants, shares) (sensitivity matrices (plants, shares, 5)).
+    """
+    n = _batch_size(columns)
+    shares = np.asarray(shares, dtype=float)
+    m = len(shares)
+    start = blend_columns(base, n, regions, years, routes, reference)
+    end = blend_columns(blend, n, regions, years, routes, reference)
+    t = shares / 100
+
+    flat = {}
+    for field, value in columns.items():
+        value = np.asarray(value)
+        flat[field] = np.repeat(np.broadcast_to(value, (n,)), m) if value.ndim else value
+    for field in BLEND_INPUTS.values():
+        flat[field] = (start[field][:, None] + (end[field] - start[field])[:, None] * t[None, :]).ravel()
+
+    return _reshape(calculate_batch(flat, sensitivity=sensitivity), n, m)
+
+
+def _reshape(results, n, m):
+    if isinstance(results, dict):
+        return {key: _reshape(value, n, m) for key, value in results.items()}
+    return results.reshape((n, m) + results.shape[1:])
@@ -1,3 +1,9 @@
+import numpy as np
+
+from gatec.core.batch import legacy_emissions
+from gatec.core.stages import stage_model
+
+
 def calculate_generation(efficiency, total_output):
     """
     Calculate generation value based on efficiency and total output.
@@ -15,60 +21,85 @@ def calculate_generation(efficiency, total_output):
     except (ValueError, TypeError):
         return 0.0
 
-def calculate_results(input_data):
+# Result parts in evaluation order, with the input fields each one reads
+# and the parts it builds on. Energy feeds everything else.
+RESULT_PARTS = ['energy', 'efficiency', 'emissions', 'ccs_sensitivity', 'general_sensitivity']
+PART_FIELDS = {
+    'energy': stage_model.fields + ['ccs'],
+    'efficiency': ['total_output', 'plant_efficiency'],
+    'emissions': ['total_output', 'ccs', 'include_emissions', 'emissions_value',
+                  'upstream_emissions', 'ccs_capture_rate'],
+    'ccs_sensitivity': ['total_output', 'ccs', 'ccs_sensitivity_value'],
+    'general_sensitivity': ['total_output', 'sensitivity_value'],
+}
+PART_DEPENDENCIES = {
+    'energy': [],
+    'efficiency': ['energy'],
+    'emissions': ['energy'],
+    'ccs_sensitivity': ['energy', 'efficiency'],
+    'general_sensitivity': ['energy'],
+}
+
+
+def dependent_parts(changed_fields):
+    """Result parts that must be recomputed when changed_fields change, in evaluation order"""
+    changed_fields = set(changed_fields)
+    dirty = set()
+    for part in RESULT_PARTS:
+        if changed_fields & set(PART_FIELDS[part]) or dirty & set(PART_DEPENDENCIES[part]):
+            dirty.add(part)
+    return [part for part in RESULT_PARTS if part in dirty]
+
+
+def calculate_parts(input_data, parts=RESULT_PARTS, results=None, state=None):
     """
-    Perform all calculations based on input data.
-    Returns a dictionary with results.
+    Compute the given result parts into a copy of results, reusing the
+    intermediate energy totals in state for the parts left out.
+    Returns (results, state). Raises ValueError on invalid input.
     """
+    results = dict(results or {})
+    state = dict(state or {})
+    defaults = {
+        'total_output': 0,
+        'generation': 0,
+        'plant_efficiency': 0,
+        'emissions_value': 0,
+        'upstream_emissions': 0,
+        'ccs_capture_rate': 0.9,
+        'ccs': False,
+        'include_emissions': False
+    }
+
+    # Safely get all input values with defaults
     try:
-        results = {}
-        
-        # Initialize default values
-        defaults = {
-            'total_output': 0,
-            'extraction': 0,
-            'processing': 0,
-            'transportation': 0,
-            'generation': 0,
-            'plant_efficiency': 0,
-            'ccs_capture': 0,
-            'ccs_compression': 0,
-            'ccs_transportation': 0,
-            'ccs_storage': 0,
-            'emissions_value': 0,
-            'ccs': False,
-            'include_emissions': False
-        }
-        
-        # Safely get all input values with defaults
+        total_output = float(input_data.get('total_output', defaults['total_output']))
+        generation = float(input_data.get('generation', defaults['generation']))
+        plant_efficiency = float(input_data.get('plant_efficiency', defaults['plant_efficiency']))
+        ccs_enabled = bool(input_data.get('ccs', defaults['ccs']))
+        include_emissions = bool(input_data.get('include_emissions', defaults['include_emissions']))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid input values: {str(e)}")
+
+    # 1. Calculate total energy contributions from the stage model
+    if 'energy' in parts:
         try:
-            total_output = float(input_data.get('total_output', defaults['total_output']))
-            extraction = float(input_data.get('extraction', defaults['extraction']))
-            processing = float(input_data.get('processing', defaults['processing']))
-            transportation = float(input_data.get('transportation', defaults['transportation']))
-            generation = float(input_data.get('generation', defaults['generation']))
-            plant_efficiency = float(input_data.get('plant_efficiency', defaults['plant_efficiency']))
-            ccs_enabled = bool(input_data.get('ccs', defaults['ccs']))
-            include_emissions = bool(input_data.get('include_emissions', defaults['include_emissions']))
+            energy_inputs = stage_model.input_vector(input_data, generation, ccs_enabled)
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid input values: {str(e)}")
-
-        # 1. Calculate total energy contributions
         try:
-            ccs_energy = 0
-            if ccs_enabled:
-                ccs_energy = (
-                    float(input_data.get('ccs_capture', defaults['ccs_capture'])) +
-                    float(input_data.get('ccs_compression', defaults['ccs_compression'])) +
-                    float(input_data.get('ccs_transportation', defaults['ccs_transportation'])) +
-                    float(input_data.get('ccs_storage', defaults['ccs_storage']))
-                )
-            
-            total_energy = extraction + processing + transportation + generation + ccs_energy
+            state['stage_energy'] = stage_model.stage_matrix @ energy_inputs
+            state['total_energy'], state['ccs_energy'], state['scaled_energy'] = (
+                energy_inputs @ stage_model.coefficients).tolist()
+            results['energy_contributions'] = dict(zip(stage_model.keys, state['stage_energy'].tolist()))
         except Exception as e:
             raise ValueError(f"Error calculating total energy: {str(e)}")
+    stage_energy = state['stage_energy']
+    total_energy = state['total_energy']
+    ccs_energy = state['ccs_energy']
+    scaled_energy = state['scaled_energy']
 
-        # 2. Calculate total efficiency
+    # 2. Calculate total efficiency and efficiency drop
+    if 'efficiency' in parts:
         try:
             if total_energy > 0:
                 results['total_efficiency'] = (total_output / total_energy) * 100
@@ -76,50 +107,52 @@ def calculate_results(input_data):
                 results['total_efficiency'] = 0.0
         except Exception as e:
             raise ValueError(f"Error calculating total efficiency: {str(e)}")
-
-        # 3. Calculate efficiency drop
         try:
             results['efficiency_drop'] = max(0.0, plant_efficiency - results['total_efficiency'])
         except Exception as e:
             raise ValueError(f"Error calculating efficiency drop: {str(e)}")
 
-        # 4. Calculate emissions (if enabled)
+    # 3. Calculate lifecycle emissions per stage (if enabled), in kg CO2/MWh of output
+    if 'emissions' in parts:
         try:
             if include_emissions:
-                emissions_value = float(input_data.get('emissions_value', defaults['emissions_value']))
-                results['total_emissions'] = emissions_value * (1 - results['total_efficiency']/100)
+                # A legacy factor (g CO2/kg fuel) is not recomputed in the new units
+                emissions_value = np.nan if legacy_emissions(input_data) else \
+                    float(input_data.get('emissions_value', defaults['emissions_value']))
+                stage_emissions, captured = stage_model.emissions(
+                    stage_energy[None, :],
+                    np.array([total_output]),
+                    np.array([emissions_value]),
+                    np.array([float(input_data.get('upstream_emissions', defaults['upstream_emissions']))]),
+                    np.array([float(input_data.get('ccs_capture_rate', defaults['ccs_capture_rate']))]),
+                    np.array([ccs_enabled]),
+                )
+                results['total_emissions'] = float(stage_emissions.sum())
+                results['stage_emissions'] = dict(zip(stage_model.keys, stage_emissions[0].tolist()))
+                results['captured_emissions'] = float(captured[0])
             else:
                 results['total_emissions'] = 0.0
+                results['stage_emissions'] = {key: 0.0 for key in stage_model.keys}
+                results['captured_emissions'] = 0.0
         except Exception as e:
             raise ValueError(f"Error calculating emissions: {str(e)}")
 
-        # 5. Energy contributions by stage
-        try:
-            results['energy_contributions'] = {
-                'extraction': extraction,
-                'processing': processing,
-                'transportation': transportation,
-                'generation': generation,
-                'ccs': ccs_energy if ccs_enabled else 0.0
-            }
-        except Exception as e:
-            raise ValueError(f"Error preparing energy contributions: {str(e)}")
-
-        # 6. CCS sensitivity analysis
+    # 4. CCS sensitivity analysis
+    if 'ccs_sensitivity' in parts:
         try:
             results['ccs_sensitivity'] = []
             results['ccs_sensitivity_percentages'] = []
             if ccs_enabled:
                 ccs_interval = float(input_data.get('ccs_sensitivity_value', 5))
                 if ccs_interval <= 0: ccs_interval = 5
-                
+
                 # Range: 100-2*i, 100-i, 100, 100+i, 100+2*i
                 percentages = [100 + (i * ccs_interval) for i in range(-2, 3)]
                 results['ccs_sensitivity_percentages'] = percentages
-                
+
                 for percentage in percentages:
                     adjusted_ccs = ccs_energy * (percentage/100)
-                    adjusted_total = extraction + processing + transportation + generation + adjusted_ccs
+                    adjusted_total = total_energy - ccs_energy + adjusted_ccs
                     eff = (total_output / adjusted_total) * 100 if adjusted_total > 0 else 0
                     results['ccs_sensitivity'].append(eff)
             else:
@@ -128,33 +161,39 @@ def calculate_results(input_data):
         except Exception as e:
             raise ValueError(f"Error in CCS sensitivity analysis: {str(e)}")
 
-        # 7. General Sensitivity Analysis
+    # 5. General Sensitivity Analysis
+    if 'general_sensitivity' in parts:
         try:
             interval = float(input_data.get('sensitivity_value', 5))
             if interval <= 0: interval = 5
-            
+
             # Range: 100-2*i, 100-i, 100, 100+i, 100+2*i
             percentages = [100 + (i * interval) for i in range(-2, 3)]
-            
+
             results['general_sensitivity'] = {'percentages': percentages, 'efficiencies': []}
-            
+
             for p in percentages:
                 factor = p / 100.0
-                
+
                 # Apply factor to all non-generation components
-                adj_extraction = extraction * factor
-                adj_processing = processing * factor
-                adj_transportation = transportation * factor
-                adj_ccs = ccs_energy * factor
-                
-                adj_total_energy = adj_extraction + adj_processing + adj_transportation + generation + adj_ccs
-                
+                adj_total_energy = total_energy - scaled_energy + scaled_energy * factor
+
                 eff = (total_output / adj_total_energy) * 100 if adj_total_energy > 0 else 0
                 results['general_sensitivity']['efficiencies'].append(eff)
-                
+
         except Exception as e:
              raise ValueError(f"Error in General sensitivity analysis: {str(e)}")
 
+    return results, state
+
+
+def calculate_results(input_data):
+    """
+    Perform all calculations based on input data.
+    Returns a dictionary with results.
+    """
+    try:
+        results, _ = calculate_parts(input_data)
         return results
 
     except Exception as e:
@@ -164,13 +203,9 @@ def calculate_results(input_data):
             'total_efficiency': 0.0,
             'efficiency_drop': 0.0,
             'total_emissions': 0.0,
-            'energy_contributions': {
-                'extraction': 0.0,
-                'processing': 0.0,
-                'transportation': 0.0,
-                'generation': 0.0,
-                'ccs': 0.0
-            },
+            'energy_contributions': {key: 0.0 for key in stage_model.keys},
+            'stage_emissions': {key: 0.0 for key in stage_model.keys},
+            'captured_emissions': 0.0,
             'ccs_sensitivity': [0.0] * 5,
             'general_sensitivity': {'percentages': [], 'efficiencies': []}
         }
@@ -0,0 +1,162 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gatec.core.batch import calculate_batch
+from gatec.core.data_manager import load_data
+
+# CCS components in the order of the ccs_* input fields
+COMPONENTS = ['capture', 'compression', 'transportation', 'storage']
+
+# Candidate sets larger than this are split across worker processes
+PARALLEL_THRESHOLD = 200000
+
+
+def load_ccs_options():
+    """Catalogued CCS technology options per component from data.json"""
+    return load_data().get('ccs_options', {})
+
+
+def _retention(component, option):
+    """Fraction of the CO2 an option keeps out of the atmosphere"""
+    if component == 'capture':
+        return float(option.get('capture_rate', 0.0))
+    return 1.0 - float(option.get('leakage', 0.0))
+
+
+def prune_options(options):
+    """
+    Drop options that are dominated within their component: another option
+    uses no more energy and retains at least as much CO2, and is strictly
+    better in one of the two.
+    """
+    pruned = {}
+    for component in COMPONENTS:
+        candidates = options.get(component, [])
+        kept = []
+        for option in candidates:
+            consumption = float(option['consumption'])
+            retention = _retention(component, option)
+            dominated = any(
+                float(other['consumption']) <= consumption
+                and _retention(component, other) >= retention
+                and (float(other['consumption']) < consumption or _retention(component, other) > retention)
+                for other in candidates
+            )
+            if not dominated:
+                kept.append(option)
+        pruned[component] = kept
+    return pruned
+
+
+def _combine_components(options):
+    """
+    Build CCS combinations one component at a time, keeping only partial
+    combinations that are not dominated on (lower consumption, higher
+    retention). Efficiency falls with consumption and emissions fall with
+    retention, so a dominated partial combination can never reach the
+    frontier and is dropped before the next component multiplies it out.
+    """
+    consumption = np.zeros(1)
+    retention = np.ones(1)
+    choices = np.zeros((1, 0), dtype=int)
+
+    for component in COMPONENTS:
+        option_consumption = np.array([float(o['consumption']) for o in options[component]])
+        option_retention = np.array([_retention(component, o) for o in options[component]])
+        m, k = len(consumption), len(option_consumption)
+
+        consumption = (consumption[:, None] + option_consumption[None, :]).ravel()
+        retention = (retention[:, None] * option_retention[None, :]).ravel()
+        choices = np.column_stack([np.repeat(choices, k, axis=0), np.tile(np.arange(k), m)])
+
+        keep = pareto_front(-consumption, -retention)
+        consumption, retention, choices = consumption[keep], retention[keep], choices[keep]
+
+    return consumption, retention, choices
+
+
+def _evaluate_chunk(args):
+    """Evaluate a block of CCS combinations and return its local Pareto set"""
+    input_data, consumptions, retentions, start, min_efficiency, max_emissions = args
+
+    columns = dict(input_data)
+    columns['ccs'] = True
+    columns['include_emissions'] = True
+    # The total CCS energy is all that matters for efficiency; put it on one component
+    columns['ccs_capture'] = consumptions
+    for component in COMPONENTS[1:]:
+        columns[f'ccs_{component}'] = 0.0
+    # Net capture after transport and storage leakage
+    columns['ccs_capture_rate'] = retentions
+
+    batch = calculate_batch(columns, sensitivity=False)
+    efficiency = batch['total_efficiency']
+    emissions = batch['total_emissions']
+
+    keep = np.ones(len(consumptions), dtype=bool)
+    if min_efficiency is not None:
+        keep &= efficiency >= min_efficiency
+    if max_emissions is not None:
+        keep &= emissions <= max_emissions
+
+    rows = np.flatnonzero(keep)
+    front = rows[pareto_front(efficiency[rows], emissions[rows])]
+    return start + front, efficiency[front], emissions[front]
+
+
+def pareto_front(efficiency, emissions):
+    """Indices of points not dominated on (maximize efficiency, minimize emissions)"""
+    if len(efficiency) == 0:
+        return np.zeros(0, dtype=int)
+    order = np.lexsort((emissions, -efficiency))
+    sorted_emissions = emissions[order]
+    # A point is on the front if its emissions beat every more efficient point
+    best_before = np.minimum.accumulate(np.concatenate([[np.inf], sorted_emissions[:-1]]))
+    return order[sorted_emissions < best_before]
+
+
+def optimize_ccs(input_data, options=None, min_efficiency=None, max_emissions=None,
+                 workers=None, chunk_size=50000):
+    """
+    Search the combinations of catalogued CCS options for the plant in
+    input_data and return the Pareto frontier of total efficiency against
+    total emissions (after the net capture rate), most efficient first.
+    """
+    options = prune_options(options if options is not None else load_ccs_options())
+    if any(not options[component] for component in COMPONENTS):
+        return []
+
+    consumption, retention, choices = _combine_components(options)
+    total = len(consumption)
+
+    tasks = [
+        (input_data, consumption[start:start + chunk_size], retention[start:start + chunk_size],
+         start, min_efficiency, max_emissions)
+        for start in range(0, total, chunk_size)
+    ]
+
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if total > PARALLEL_THRESHOLD and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_evaluate_chunk, tasks))
+    else:
+        parts = [_evaluate_chunk(task) for task in tasks]
+
+    rows = np.concatenate([p[0] for p in parts])
+    efficiency = np.concatenate([p[1] for p in parts])
+    emissions = np.concatenate([p[2] for p in parts])
+
+    frontier = []
+    for i in pareto_front(efficiency, emissions):
+        row = rows[i]
+        entry = {c: options[c][int(choices[row, k])]['name'] for k, c in enumerate(COMPONENTS)}
+        entry.update({
+            'total_efficiency': float(efficiency[i]),
+            'total_emissions': float(emissions[i]),
+            'net_capture_rate': float(retention[row]),
+            'ccs_consumption': float(consumption[row]),
+        })
+        frontier.append(entry)
+    return frontier
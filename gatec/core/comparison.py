@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+
+from gatec.core.batch import STAGE_KEYS, SENSITIVITY_STEPS, inputs_to_columns, calculate_batch, legacy_emissions
+
+METRICS = ['total_efficiency', 'efficiency_drop', 'total_emissions']
+
+# Sensitivity curves, one value per sensitivity step
+CURVES = ['ccs_sensitivity_percentages', 'ccs_sensitivity', 'general_sensitivity_percentages', 'general_sensitivity']
+
+
+def compare_scenarios(rows):
+    """
+    Align N saved calculations for side-by-side comparison.
+
+    Figures come from each row's stored results, so they match the history
+    list and saved reports. Rows whose stored results lack a needed figure
+    (saved by an older version) are re-evaluated from their inputs in one
+    batch call and flagged in 'recomputed'; rows flagged in 'legacy_emissions'
+    keep their stored emissions, which use the old factor units. Deltas are taken against the
+    first scenario (the baseline).
+    """
+    if not rows:
+        return None
+    labels = [_label(row) for row in rows]
+    stored = [_stored_figures(json.loads(row.get('results_json') or '{}')) for row in rows]
+    inputs = [json.loads(row.get('inputs_json') or '{}') for row in rows]
+    legacy = np.array([legacy_emissions(input_data) for input_data in inputs])
+
+    recomputed = np.array([figures is None for figures in stored])
+    if recomputed.any():
+        missing = np.flatnonzero(recomputed)
+        batch = calculate_batch(inputs_to_columns([inputs[i] for i in missing]))
+        for k, i in enumerate(missing):
+            stored[i] = {
+                **{metric: float(batch[metric][k]) for metric in METRICS},
+                'stages': [float(batch['energy_contributions'][s][k]) for s in STAGE_KEYS],
+                **{name: batch[name][k] for name in CURVES},
+            }
+            if legacy[i]:
+                stored[i]['total_emissions'] = float(rows[i].get('total_emissions') or 0.0)
+
+    stages = np.array([figures['stages'] for figures in stored], dtype=float)
+    stage_totals = stages.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stage_shares = np.where(stage_totals > 0, stages / stage_totals, 0.0)
+
+    metrics = {metric: np.array([figures[metric] for figures in stored], dtype=float) for metric in METRICS}
+    curves = {name: np.array([figures[name] for figures in stored], dtype=float) for name in CURVES}
+
+    return {
+        'ids': [row['id'] for row in rows],
+        'labels': labels,
+        'recomputed': recomputed,
+        'legacy_emissions': legacy,
+        'stage_keys': list(STAGE_KEYS),
+        'stages': stages,
+        'stage_shares': stage_shares,
+        'metrics': metrics,
+        'metric_deltas': {metric: values - values[0] for metric, values in metrics.items()},
+        'stage_deltas': stages - stages[0],
+        'ccs_sensitivity_percentages': curves['ccs_sensitivity_percentages'],
+        'ccs_sensitivity': curves['ccs_sensitivity'],
+        'ccs_sensitivity_deltas': curves['ccs_sensitivity'] - curves['ccs_sensitivity'][0],
+        'general_sensitivity_percentages': curves['general_sensitivity_percentages'],
+        'general_sensitivity': curves['general_sensitivity'],
+        'general_sensitivity_deltas': curves['general_sensitivity'] - curves['general_sensitivity'][0],
+    }
+
+
+def _stored_figures(results):
+    """The comparison figures of a stored results dict, or None if any is missing"""
+    try:
+        contributions = results['energy_contributions']
+        general = results['general_sensitivity']
+        figures = {
+            **{metric: float(results[metric]) for metric in METRICS},
+            'stages': [float(contributions[s]) for s in STAGE_KEYS],
+            'ccs_sensitivity_percentages': [float(v) for v in results['ccs_sensitivity_percentages']],
+            'ccs_sensitivity': [float(v) for v in results['ccs_sensitivity']],
+            'general_sensitivity_percentages': [float(v) for v in general['percentages']],
+            'general_sensitivity': [float(v) for v in general['efficiencies']],
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    # Curves are drawn as one array per row, so they must have the batch length
+    if any(len(figures[name]) != len(SENSITIVITY_STEPS) for name in CURVES):
+        return None
+    return figures
+
+
+def _label(row):
+    location = row.get('plant_location') or "Unknown Location"
+    fuel = row.get('fuel_type') or "Unknown Fuel"
+    return f"#{row['id']} {location} ({fuel})"
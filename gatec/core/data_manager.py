@@ -24,3 +24,18 @@ def load_data():
     except json.JSONDecodeError:
         print(f"Error: Invalid JSON in {data_path}")
         return {"card_data": [], "predefined_values": {}}
+
+
+def get_retention_policy():
+    """
+    Retention settings from data.json: max_age_days, max_rows and archive_dir
+    (resolved against the project root). Unset limits are None.
+    """
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    policy = load_data().get('retention', {})
+    archive_dir = policy.get('archive_dir')
+    return {
+        'max_age_days': policy.get('max_age_days'),
+        'max_rows': policy.get('max_rows'),
+        'archive_dir': os.path.join(base_dir, archive_dir) if archive_dir else None,
+    }
@@ -1,42 +1,314 @@
 import sqlite3
+import threading
 import json
 import os
-from datetime import datetime
+import hashlib
+import gzip
+from datetime import datetime, timedelta
+
+from gatec.core.batch import legacy_emissions, LEGACY_EMISSION_UNITS
+from gatec.core.migrations import migrate, add_column, schema_version, run_backfills, start_backfills
+
+
+def canonical_input_hash(input_data):
+    """
+    Content hash of a calculation's inputs. Keys are sorted and numbers are
+    normalized (5 == 5.0, float noise beyond 12 significant digits ignored),
+    so identical scenarios always hash the same.
+    """
+    def normalize(value):
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)):
+            return float(f"{float(value):.12g}")
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return str(value)
+
+    canonical = json.dumps(normalize(input_data), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def parse_plant_location(location):
+    """Split a "Name - Country" location into (name, country), whitespace tidied"""
+    name, separator, country = (location or '').rpartition(' - ')
+    if not separator:
+        name, country = location or '', ''
+    return ' '.join(name.split()), ' '.join(country.split())
+
+
+def plant_key(location):
+    """
+    Registry key of a plant location. Case and spacing are ignored so that
+    "Goose bay Plant - Canada" and "goose Bay plant -  canada" are one plant.
+    None for an empty location.
+    """
+    name, country = parse_plant_location(location)
+    if not name:
+        return None
+    return f"{name.casefold()}|{country.casefold()}"
+
+
+# Re-running an identical scenario bumps its counter instead of adding a row.
+# The plant must already be registered (see register_plants).
+UPSERT_CALCULATION = '''
+    INSERT INTO calculations (
+        timestamp, plant_location, fuel_type, plant_efficiency, total_output,
+        total_efficiency, efficiency_drop, total_emissions, inputs_json, results_json,
+        input_hash, run_count, plant_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, (SELECT id FROM plants WHERE name_key = ?))
+    ON CONFLICT(input_hash) DO UPDATE SET
+        run_count = run_count + 1,
+        plant_id = excluded.plant_id,
+        timestamp = excluded.timestamp,
+        total_efficiency = excluded.total_efficiency,
+        efficiency_drop = excluded.efficiency_drop,
+        total_emissions = excluded.total_emissions,
+        results_json = excluded.results_json
+'''
+
+
+# Every write to calculations is logged with an increasing sequence number,
+# so readers in any process can ask what changed since they last looked.
+# Updates of internal columns such as plant_id are not reported.
+CHANGE_LOG_TRIGGERS = {
+    'calculations_log_insert': "AFTER INSERT ON calculations BEGIN "
+                               "INSERT INTO change_log (calculation_id, op) VALUES (NEW.id, 'insert'); END",
+    'calculations_log_update': "AFTER UPDATE OF timestamp, plant_location, fuel_type, total_efficiency, "
+                               "efficiency_drop, total_emissions, inputs_json, results_json, run_count "
+                               "ON calculations BEGIN "
+                               "INSERT INTO change_log (calculation_id, op) VALUES (NEW.id, 'update'); END",
+    'calculations_log_delete': "AFTER DELETE ON calculations BEGIN "
+                               "INSERT INTO change_log (calculation_id, op) VALUES (OLD.id, 'delete'); END",
+}
+CHANGE_LOG_KEEP = 10000
+
+
+def calculation_row(input_data, results, timestamp):
+    """Parameters for UPSERT_CALCULATION from one calculation"""
+    return (
+        timestamp,
+        input_data.get('plant_location', ''),
+        input_data.get('fuel_type', ''),
+        float(input_data.get('plant_efficiency', 0)),
+        float(input_data.get('total_output', 0)),
+        results.get('total_efficiency', 0),
+        results.get('efficiency_drop', 0),
+        results.get('total_emissions', 0),
+        json.dumps(input_data),
+        json.dumps(results),
+        canonical_input_hash(input_data),
+        plant_key(input_data.get('plant_location', '')),
+    )
+
+
+def register_plants(conn, params):
+    """Add the plants of calculation_row params that are not in the registry yet"""
+    plants = {}
+    for row in params:
+        key = row[-1]
+        if key is not None and key not in plants:
+            name, country = parse_plant_location(row[1])
+            plants[key] = (key, name, country, row[2] or None, row[4])
+    conn.executemany(
+        'INSERT OR IGNORE INTO plants (name_key, name, country, fuel, capacity) VALUES (?, ?, ?, ?, ?)',
+        list(plants.values())
+    )
+
+
+def _schema_calculations(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS calculations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME,
+            plant_location TEXT,
+            fuel_type TEXT,
+            plant_efficiency REAL,
+            total_output REAL,
+            total_efficiency REAL,
+            efficiency_drop REAL,
+            total_emissions REAL,
+            inputs_json TEXT,
+            results_json TEXT
+        )
+    ''')
+
+
+def _schema_deduplication(conn):
+    add_column(conn, 'calculations', 'input_hash', 'TEXT')
+    add_column(conn, 'calculations', 'run_count', 'INTEGER NOT NULL DEFAULT 1')
+    # Legacy rows keep a NULL hash until compact_duplicates() runs, which the index allows
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_calculations_input_hash ON calculations (input_hash)')
+
+
+def _schema_change_log(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            calculation_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    ''')
+    for name, body in CHANGE_LOG_TRIGGERS.items():
+        conn.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+
+
+def _schema_batch_jobs(conn):
+    # Manifests of long batch jobs: one row per job and per finished chunk
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS batch_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_key TEXT UNIQUE NOT NULL,
+            kind TEXT,
+            source TEXT,
+            status TEXT NOT NULL DEFAULT 'running',
+            created DATETIME,
+            updated DATETIME
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS batch_job_chunks (
+            job_id INTEGER NOT NULL REFERENCES batch_jobs (id),
+            chunk INTEGER NOT NULL,
+            start_line INTEGER,
+            end_line INTEGER,
+            end_offset INTEGER,
+            rows INTEGER NOT NULL DEFAULT 0,
+            saved INTEGER NOT NULL DEFAULT 0,
+            errors_json TEXT,
+            PRIMARY KEY (job_id, chunk)
+        )
+    ''')
+
+
+def _schema_plants(conn):
+    # Plant registry; calculations point at it so per-plant queries use an index
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS plants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name_key TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            country TEXT,
+            fuel TEXT,
+            capacity REAL
+        )
+    ''')
+    add_column(conn, 'calculations', 'plant_id', 'INTEGER REFERENCES plants (id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_calculations_plant ON calculations (plant_id, timestamp)')
+
+
+def _backfill_plants(conn, after_id, chunk_size):
+    """Register the plants of rows saved before the registry existed and link the rows"""
+    rows = conn.execute('''
+        SELECT id, plant_location, fuel_type, total_output FROM calculations
+        WHERE id > ? AND plant_id IS NULL
+        ORDER BY id LIMIT ?
+    ''', (after_id, chunk_size)).fetchall()
+    params = [(row_id, location, fuel, None, output, plant_key(location)) for row_id, location, fuel, output in rows]
+    register_plants(conn, params)
+    conn.executemany(
+        'UPDATE calculations SET plant_id = (SELECT id FROM plants WHERE name_key = ?) WHERE id = ?',
+        [(row[-1], row[0]) for row in params if row[-1] is not None]
+    )
+    return (rows[-1][0] if len(rows) == chunk_size else None), len(rows)
+
+
+def _schema_quiet_change_log(conn):
+    # Recreate the update trigger so backfills of internal columns stay out of the log
+    conn.execute('DROP TRIGGER IF EXISTS calculations_log_update')
+    conn.execute(f"CREATE TRIGGER calculations_log_update {CHANGE_LOG_TRIGGERS['calculations_log_update']}")
+
+
+def _schema_emission_units(conn):
+    # No DDL: emission factors changed units (g CO2/kg fuel to kg CO2/MWh of
+    # fuel), and the backfill marks the inputs saved in the old ones
+    pass
+
+
+def _backfill_emission_units(conn, after_id, chunk_size):
+    """Mark the inputs of rows saved before per-stage emissions as using the old factor units"""
+    rows = conn.execute('''
+        SELECT id, inputs_json, results_json FROM calculations
+        WHERE id > ? ORDER BY id LIMIT ?
+    ''', (after_id, chunk_size)).fetchall()
+    updates = []
+    for row_id, inputs_json, results_json in rows:
+        # Results without stage_emissions come from emissions_value * (1 - efficiency)
+        if not inputs_json or 'stage_emissions' in json.loads(results_json or '{}'):
+            continue
+        input_data = json.loads(inputs_json)
+        if not legacy_emissions(input_data):
+            input_data['emissions_units'] = LEGACY_EMISSION_UNITS
+            updates.append((json.dumps(input_data), row_id))
+    conn.executemany('UPDATE calculations SET inputs_json = ? WHERE id = ?', updates)
+    return (rows[-1][0] if len(rows) == chunk_size else None), len(rows)
+
+
+# Numbered schema versions of history.db (PRAGMA user_version). Append new
+# steps at the end; never change one that has shipped.
+MIGRATIONS = [
+    {'version': 1, 'name': "calculations table", 'schema': _schema_calculations},
+    {'version': 2, 'name': "input hash and run count", 'schema': _schema_deduplication},
+    {'version': 3, 'name': "change log", 'schema': _schema_change_log},
+    {'version': 4, 'name': "batch job manifests", 'schema': _schema_batch_jobs},
+    {'version': 5, 'name': "plant registry", 'schema': _schema_plants, 'backfill': _backfill_plants},
+    {'version': 6, 'name': "change log ignores internal columns", 'schema': _schema_quiet_change_log},
+    {'version': 7, 'name': "legacy emission units", 'schema': _schema_emission_units,
+     'backfill': _backfill_emission_units},
+]
+
 
 class DBManager:
-    def __init__(self):
+    def __init__(self, db_path=None):
         # Determine path to database file
         # Assuming we are in gatec/core/db_manager.py, db is in data/history.db
+        # GATEC_DB_PATH overrides the default, e.g. for services and batch jobs
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        self.db_path = os.path.join(base_dir, 'data', 'history.db')
+        self.db_path = db_path or os.environ.get('GATEC_DB_PATH') or os.path.join(base_dir, 'data', 'history.db')
+        self.subscribers = []
+        self.watch_conn = None
+        self.data_version = None
+        self.change_seq = None
         self.init_db()
 
     def get_connection(self):
         return sqlite3.connect(self.db_path)
 
     def init_db(self):
-        """Initialize the database schema if it doesn't exist"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS calculations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
-                plant_location TEXT,
-                fuel_type TEXT,
-                plant_efficiency REAL,
-                total_output REAL,
-                total_efficiency REAL,
-                efficiency_drop REAL,
-                total_emissions REAL,
-                inputs_json TEXT,
-                results_json TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Bring the database schema up to date; data backfills are left to run_backfills"""
+        conn = self.get_connection()
+        try:
+            # Only takes effect on a new database; apply_retention converts older ones
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            migrate(conn, MIGRATIONS)
+            conn.execute('DELETE FROM change_log WHERE seq <= (SELECT MAX(seq) FROM change_log) - ?',
+                         (CHANGE_LOG_KEEP,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def run_backfills(self, chunk_size=5000, progress=None):
+        """Finish pending data backfills now, e.g. before a batch job; returns True when all are done"""
+        return run_backfills(self.get_connection, MIGRATIONS, chunk_size=chunk_size, progress=progress)
+
+    def start_backfills(self):
+        """Run pending data backfills in a background thread, in small chunks"""
+        return start_backfills(self.get_connection, MIGRATIONS)
+
+    def schema_status(self):
+        """Schema version, latest known version and the unfinished backfills as (version, name, rows done)"""
+        conn = self.get_connection()
+        try:
+            rows = dict(conn.execute('SELECT version, rows FROM schema_backfills WHERE done = 0').fetchall())
+            return {
+                'version': schema_version(conn),
+                'latest': max(m['version'] for m in MIGRATIONS),
+                'backfills': [(m['version'], m['name'], rows[m['version']]) for m in MIGRATIONS if m['version'] in rows],
+            }
+        finally:
+            conn.close()
 
     def save_calculation(self, input_data, results):
         """Save calculation inputs and results to database"""
@@ -44,32 +316,9 @@ class DBManager:
             conn = self.get_connection()
             cursor = conn.cursor()
             
-            # Prepare data
-            timestamp = datetime.now()
-            
-            # Extract basic fields
-            plant_location = input_data.get('plant_location', '')
-            fuel_type = input_data.get('fuel_type', '')
-            plant_efficiency = float(input_data.get('plant_efficiency', 0))
-            total_output = float(input_data.get('total_output', 0))
-            
-            total_efficiency = results.get('total_efficiency', 0)
-            efficiency_drop = results.get('efficiency_drop', 0)
-            total_emissions = results.get('total_emissions', 0)
-            
-            # Serialize JSON columns
-            inputs_json = json.dumps(input_data)
-            results_json = json.dumps(results)
-            
-            cursor.execute('''
-                INSERT INTO calculations (
-                    timestamp, plant_location, fuel_type, plant_efficiency, total_output,
-                    total_efficiency, efficiency_drop, total_emissions, inputs_json, results_json
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timestamp, plant_location, fuel_type, plant_efficiency, total_output,
-                total_efficiency, efficiency_drop, total_emissions, inputs_json, results_json
-            ))
+            row = calculation_row(input_data, results, datetime.now())
+            register_plants(cursor, [row])
+            cursor.execute(UPSERT_CALCULATION, row)
             
             conn.commit()
             print(f"Calculation saved to DB at {self.db_path}")
@@ -82,18 +331,118 @@ class DBManager:
             if conn:
                 conn.close()
 
-    def get_history(self):
-        """Retrieve all calculation history ordered by newest first"""
+    def save_calculations(self, rows):
+        """
+        Save many (input_data, results, timestamp) rows in one transaction.
+        A None timestamp means now. Returns the number of rows written, or 0
+        if the transaction was rolled back.
+        """
+        now = datetime.now()
+        return self.save_calculation_rows([
+            calculation_row(input_data, results, timestamp or now) for input_data, results, timestamp in rows
+        ])
+
+    def save_calculation_rows(self, params):
+        """Save rows already built with calculation_row in one transaction"""
+        if not params:
+            return 0
+        conn = self.get_connection()
+        try:
+            register_plants(conn, params)
+            conn.executemany(UPSERT_CALCULATION, params)
+            conn.commit()
+            return len(params)
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            conn.rollback()
+            print(f"Database error: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def start_job(self, job_key, kind, source):
+        """
+        Open the batch job with job_key, creating it if needed.
+        Returns (job_id, status, chunks) where chunks lists the manifest rows
+        of the chunks already finished, in order.
+        """
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            now = datetime.now()
+            conn.execute('''
+                INSERT INTO batch_jobs (job_key, kind, source, created, updated) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(job_key) DO UPDATE SET updated = excluded.updated
+            ''', (job_key, kind, source, now, now))
+            conn.commit()
+            job = conn.execute('SELECT id, status FROM batch_jobs WHERE job_key = ?', (job_key,)).fetchone()
+            chunks = conn.execute(
+                'SELECT * FROM batch_job_chunks WHERE job_id = ? ORDER BY chunk', (job['id'],)).fetchall()
+            return job['id'], job['status'], [dict(chunk) for chunk in chunks]
+        finally:
+            conn.close()
+
+    def save_job_chunk(self, job_id, chunk, params):
+        """
+        Save a chunk's calculation rows and its manifest entry (a dict of
+        batch_job_chunks columns) in one transaction, so a chunk is either
+        fully saved and checkpointed or not at all. Returns True on success.
+        """
+        conn = self.get_connection()
+        try:
+            register_plants(conn, params)
+            conn.executemany(UPSERT_CALCULATION, params)
+            conn.execute('''
+                INSERT INTO batch_job_chunks (job_id, chunk, start_line, end_line, end_offset, rows, saved, errors_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, chunk['chunk'], chunk['start_line'], chunk['end_line'], chunk['end_offset'],
+                  chunk['rows'], len(params), json.dumps(chunk['errors'])))
+            conn.execute('UPDATE batch_jobs SET updated = ? WHERE id = ?', (datetime.now(), job_id))
+            conn.commit()
+            return True
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            conn.rollback()
+            print(f"Database error: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def finish_job(self, job_id):
+        conn = self.get_connection()
+        try:
+            conn.execute("UPDATE batch_jobs SET status = 'done', updated = ? WHERE id = ?", (datetime.now(), job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def delete_job(self, job_key):
+        """Forget a job's manifest so it starts over; returns True if one existed"""
+        conn = self.get_connection()
+        try:
+            conn.execute('DELETE FROM batch_job_chunks WHERE job_id IN (SELECT id FROM batch_jobs WHERE job_key = ?)',
+                         (job_key,))
+            removed = conn.execute('DELETE FROM batch_jobs WHERE job_key = ?', (job_key,)).rowcount
+            conn.commit()
+            return removed > 0
+        finally:
+            conn.close()
+
+    def get_history(self, limit=None, offset=0, ids=None):
+        """
+        Retrieve calculation history ordered by newest first (all rows unless
+        limit is given, or only the given ids)
+        """
         try:
             conn = self.get_connection()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT id, timestamp, plant_location, fuel_type, total_efficiency, efficiency_drop, inputs_json 
+            cursor.execute(f'''
+                SELECT id, timestamp, plant_location, fuel_type, total_efficiency, efficiency_drop, run_count, inputs_json 
                 FROM calculations 
+                {"WHERE id IN (SELECT value FROM json_each(?))" if ids is not None else ""}
                 ORDER BY timestamp DESC
-            ''')
+                LIMIT ? OFFSET ?
+            ''', ((json.dumps([int(i) for i in ids]),) if ids is not None else ()) + (limit if limit is not None else -1, offset))
             
             rows = cursor.fetchall()
             # Convert to list of dicts for easier handling
@@ -106,6 +455,201 @@ class DBManager:
             if conn:
                 conn.close()
 
+    def get_change_seq(self):
+        """Sequence number of the latest logged change (0 when nothing was ever written)"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+            return row[0] if row else 0
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def get_changes(self, since_seq, max_ids=5000):
+        """
+        Calculations changed since since_seq, as a dict with the latest
+        'seq', the 'changed' (inserted or updated) and 'deleted' ids, and
+        'complete', which is False when the log no longer reaches back to
+        since_seq or more than max_ids rows changed; callers then reload
+        everything instead.
+        """
+        changes = {'seq': since_seq, 'changed': [], 'deleted': [], 'complete': True}
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+            latest = row[0] if row else 0
+            if latest <= since_seq:
+                return changes
+            changes['seq'] = latest
+
+            oldest = conn.execute('SELECT MIN(seq) FROM change_log').fetchone()[0]
+            if oldest is None or oldest > since_seq + 1:
+                changes['complete'] = False
+                return changes
+
+            # The last logged operation per calculation decides whether it still exists
+            rows = conn.execute('''
+                SELECT calculation_id, op, MAX(seq) FROM change_log
+                WHERE seq > ? AND seq <= ?
+                GROUP BY calculation_id
+                LIMIT ?
+            ''', (since_seq, latest, max_ids + 1)).fetchall()
+            if len(rows) > max_ids:
+                changes['complete'] = False
+                return changes
+            for calculation_id, op, _ in rows:
+                changes['deleted' if op == 'delete' else 'changed'].append(calculation_id)
+            return changes
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            changes['complete'] = False
+            return changes
+        finally:
+            conn.close()
+
+    def subscribe(self, callback):
+        """
+        Call callback(changes) whenever poll_changes finds new writes, from
+        this or any other process. changes is a get_changes dict.
+        """
+        if self.change_seq is None:
+            self.change_seq = self.get_change_seq()
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def poll_changes(self):
+        """
+        Cheap check for new commits, meant to be called periodically.
+        PRAGMA data_version on a long-lived connection only changes when some
+        connection has committed, so the change log is read only then.
+        Returns the changes passed to subscribers, or None.
+        """
+        if not self.subscribers:
+            return None
+        try:
+            if self.watch_conn is None:
+                self.watch_conn = self.get_connection()
+            version = self.watch_conn.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return None
+        if version == self.data_version:
+            return None
+        self.data_version = version
+
+        changes = self.get_changes(self.change_seq)
+        if changes['seq'] == self.change_seq:
+            return None
+        self.change_seq = changes['seq']
+        for callback in list(self.subscribers):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"Error in change subscriber: {e}")
+        return changes
+
+    def get_calculations(self, ids):
+        """Fetch full rows for the given ids in one query, keeping the order of ids"""
+        if not ids:
+            return []
+        try:
+            conn = self.get_connection()
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+
+            # Pass the ids as one JSON array to avoid a placeholder per id
+            cursor.execute('''
+                SELECT id, timestamp, plant_location, fuel_type, total_efficiency, efficiency_drop,
+                       total_emissions, inputs_json, results_json
+                FROM calculations
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps([int(i) for i in ids]),))
+
+            rows = {row['id']: dict(row) for row in cursor.fetchall()}
+            return [rows[int(i)] for i in ids if int(i) in rows]
+
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return []
+        finally:
+            if conn:
+                conn.close()
+
+    def get_plants(self):
+        """All registered plants, by name"""
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(
+                'SELECT id, name, country, fuel, capacity FROM plants ORDER BY name, country')]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def find_plant(self, location):
+        """The registered plant for a "Name - Country" location, or None"""
+        key = plant_key(location)
+        if key is None:
+            return None
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute(
+                'SELECT id, name, country, fuel, capacity FROM plants WHERE name_key = ?', (key,)).fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def get_plant_history(self, plant_id, limit=None, offset=0):
+        """A plant's calculations, newest first, through the (plant_id, timestamp) index"""
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute('''
+                SELECT id, timestamp, plant_location, fuel_type, total_efficiency, efficiency_drop,
+                       total_emissions, run_count, inputs_json
+                FROM calculations
+                WHERE plant_id = ?
+                ORDER BY timestamp DESC
+                LIMIT ? OFFSET ?
+            ''', (plant_id, limit if limit is not None else -1, offset))]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def get_plant_latest(self, plant_id):
+        """A plant's most recent calculation, or None"""
+        history = self.get_plant_history(plant_id, limit=1)
+        return history[0] if history else None
+
+    def get_plant_trend(self, plant_id, since=None):
+        """(timestamp, total_efficiency, efficiency_drop, total_emissions) of a plant's runs, oldest first"""
+        conn = self.get_connection()
+        try:
+            return conn.execute('''
+                SELECT timestamp, total_efficiency, efficiency_drop, total_emissions
+                FROM calculations
+                WHERE plant_id = ? AND timestamp >= ?
+                ORDER BY timestamp
+            ''', (plant_id, since if since is not None else '')).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return []
+        finally:
+            conn.close()
+
     def delete_calculation(self, id):
         """Delete a calculation by ID"""
         try:
@@ -121,5 +665,177 @@ class DBManager:
             if conn:
                 conn.close()
 
+    def delete_calculations(self, ids):
+        """Delete many calculations in a single transaction; returns the number removed"""
+        if not ids:
+            return 0
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                'DELETE FROM calculations WHERE id IN (SELECT value FROM json_each(?))',
+                (json.dumps([int(i) for i in ids]),)
+            )
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return 0
+        finally:
+            if conn:
+                conn.close()
+
+    def apply_retention(self, max_age_days=None, max_rows=None, archive_dir=None, chunk_size=5000,
+                        full_vacuum=True):
+        """
+        Remove calculations older than max_age_days or beyond the newest
+        max_rows. Expired rows are first written to a gzip-compressed JSONL
+        archive in archive_dir (when given), then deleted in one transaction,
+        and the freed pages are returned with an incremental vacuum (see
+        vacuum for full_vacuum). Returns (rows_removed, archive_path).
+        """
+        if max_age_days is None and max_rows is None:
+            return 0, None
+
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        archive_path = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute('CREATE TEMP TABLE expired (id INTEGER PRIMARY KEY)')
+            if max_age_days is not None:
+                cutoff = datetime.now() - timedelta(days=max_age_days)
+                cursor.execute('INSERT OR IGNORE INTO expired SELECT id FROM calculations WHERE timestamp < ?', (cutoff,))
+            if max_rows is not None:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO expired
+                    SELECT id FROM calculations ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?
+                ''', (max_rows,))
+
+            count = cursor.execute('SELECT COUNT(*) FROM expired').fetchone()[0]
+            if count == 0:
+                conn.rollback()
+                return 0, None
+
+            # Archive before deleting so nothing is lost if the process dies in between
+            if archive_dir:
+                os.makedirs(archive_dir, exist_ok=True)
+                archive_path = os.path.join(
+                    archive_dir, f"calculations-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.jsonl.gz")
+                reader = conn.cursor()
+                reader.execute('SELECT c.* FROM calculations c JOIN expired e ON e.id = c.id ORDER BY c.id')
+                with gzip.open(archive_path, 'wt', encoding='utf-8') as f:
+                    while True:
+                        rows = reader.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        f.writelines(json.dumps(dict(row), default=str) + "\n" for row in rows)
+
+            cursor.execute('DELETE FROM calculations WHERE id IN (SELECT id FROM expired)')
+            removed = cursor.rowcount
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            conn.rollback()
+            print(f"Retention error: {e}")
+            return 0, None
+        finally:
+            conn.close()
+
+        self.vacuum(full=full_vacuum)
+        return removed, archive_path
+
+    def start_retention(self, max_age_days=None, max_rows=None, archive_dir=None):
+        """
+        Apply the retention policy in a daemon thread so start-up is not held
+        up. It never runs the one-off full VACUUM (that is left to gatec
+        prune), since it would lock the database for the whole rewrite.
+        """
+        def run():
+            removed, archive_path = self.apply_retention(max_age_days=max_age_days, max_rows=max_rows,
+                                                         archive_dir=archive_dir, full_vacuum=False)
+            if removed:
+                print(f"Retention removed {removed} calculations" +
+                      (f", archived to {archive_path}" if archive_path else ""))
+
+        thread = threading.Thread(target=run, name='gatec-retention', daemon=True)
+        thread.start()
+        return thread
+
+    def vacuum(self, full=True):
+        """
+        Return free pages to the OS. With full, older databases are switched
+        to incremental auto-vacuum once, which rewrites the whole file;
+        without it they are left as they are.
+        """
+        conn = self.get_connection()
+        try:
+            mode = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+            if mode != 2 and not full:
+                return
+            if mode != 2:
+                # Changing the mode only applies after a full VACUUM
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                conn.execute('VACUUM')
+            # The pragma frees one page per step; executescript steps it to completion
+            conn.executescript('PRAGMA incremental_vacuum;')
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        finally:
+            conn.close()
+
+    def compact_duplicates(self, chunk_size=5000):
+        """
+        One-off compaction for databases that predate input hashing.
+        Hashes every unhashed row, keeps the newest row of each identical
+        scenario with the summed run count, and deletes the rest in a single
+        transaction. Returns the number of rows removed.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('CREATE TEMP TABLE pending_hashes (id INTEGER PRIMARY KEY, input_hash TEXT)')
+
+            # Hash legacy rows chunk by chunk so large histories are not loaded at once
+            reader = conn.cursor()
+            reader.execute('SELECT id, inputs_json FROM calculations WHERE input_hash IS NULL')
+            while True:
+                rows = reader.fetchmany(chunk_size)
+                if not rows:
+                    break
+                cursor.executemany(
+                    'INSERT INTO pending_hashes (id, input_hash) VALUES (?, ?)',
+                    [(row_id, canonical_input_hash(json.loads(inputs_json or '{}'))) for row_id, inputs_json in rows]
+                )
+
+            cursor.execute('''
+                INSERT INTO pending_hashes (id, input_hash)
+                SELECT id, input_hash FROM calculations WHERE input_hash IS NOT NULL
+            ''')
+            cursor.execute('''
+                CREATE TEMP TABLE ranked AS
+                SELECT p.id, p.input_hash,
+                       ROW_NUMBER() OVER (PARTITION BY p.input_hash ORDER BY c.timestamp DESC, c.id DESC) AS rank,
+                       SUM(c.run_count) OVER (PARTITION BY p.input_hash) AS total_runs
+                FROM pending_hashes p JOIN calculations c ON c.id = p.id
+            ''')
+
+            cursor.execute('DELETE FROM calculations WHERE id IN (SELECT id FROM ranked WHERE rank > 1)')
+            removed = cursor.rowcount
+            cursor.execute('''
+                UPDATE calculations
+                SET input_hash = (SELECT input_hash FROM ranked WHERE ranked.id = calculations.id),
+                    run_count = (SELECT total_runs FROM ranked WHERE ranked.id = calculations.id)
+                WHERE id IN (SELECT id FROM ranked WHERE rank = 1)
+            ''')
+
+            conn.commit()
+            return removed
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Database error: {e}")
+            return 0
+        finally:
+            conn.close()
+
 # Singleton instance for easy access
 db = DBManager()
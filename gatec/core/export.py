@@ -0,0 +1,234 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from gatec.core.batch import NUMERIC_FIELDS, FLAG_FIELDS, STAGE_KEYS, inputs_to_columns
+
+TEXT_COLUMNS = ['timestamp', 'plant_location', 'fuel_type']
+RESULT_COLUMNS = ['total_efficiency', 'efficiency_drop', 'total_emissions', 'captured_emissions']
+SENSITIVITY_COLUMNS = ['ccs_sensitivity', 'ccs_sensitivity_percentages',
+                       'general_sensitivity', 'general_sensitivity_percentages']
+SENSITIVITY_POINTS = 5
+
+EXPORT_FORMATS = ['csv', 'jsonl', 'npy', 'arrow']
+
+
+def export_columns():
+    """Column names of the flattened export, in output order"""
+    return (['id', 'run_count'] + TEXT_COLUMNS + list(NUMERIC_FIELDS) + list(FLAG_FIELDS)
+            + RESULT_COLUMNS + [f'energy_{stage}' for stage in STAGE_KEYS]
+            + [f'emissions_{stage}' for stage in STAGE_KEYS] + SENSITIVITY_COLUMNS)
+
+
+def iter_calculation_chunks(conn, chunk_size=10000):
+    """
+    Stream the calculations table in chunks from one cursor.
+    SQLite steps the cursor lazily, so only chunk_size rows are in memory.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT id, run_count, {", ".join(TEXT_COLUMNS)}, inputs_json, results_json
+        FROM calculations ORDER BY id
+    ''')
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield flatten_chunk(rows)
+
+
+def flatten_chunk(rows):
+    """Turn raw calculation rows into a dict of column arrays"""
+    n = len(rows)
+    columns = {
+        'id': np.array([row[0] for row in rows], dtype=np.int64),
+        'run_count': np.array([row[1] or 1 for row in rows], dtype=np.int64),
+    }
+    for j, name in enumerate(TEXT_COLUMNS):
+        columns[name] = np.array([str(row[2 + j] or '') for row in rows], dtype=str)
+
+    inputs = [_load_json(row[-2]) for row in rows]
+    columns.update(inputs_to_columns(inputs))
+
+    results = [_load_json(row[-1]) for row in rows]
+    for name in RESULT_COLUMNS:
+        columns[name] = np.array([_number(r.get(name)) for r in results])
+    for stage in STAGE_KEYS:
+        columns[f'energy_{stage}'] = np.array([_number(r.get('energy_contributions', {}).get(stage)) for r in results])
+        columns[f'emissions_{stage}'] = np.array([_number(r.get('stage_emissions', {}).get(stage)) for r in results])
+
+    general = [r.get('general_sensitivity', {}) for r in results]
+    curves = {
+        'ccs_sensitivity': [r.get('ccs_sensitivity') for r in results],
+        'ccs_sensitivity_percentages': [r.get('ccs_sensitivity_percentages') for r in results],
+        'general_sensitivity': [g.get('efficiencies') for g in general],
+        'general_sensitivity_percentages': [g.get('percentages') for g in general],
+    }
+    for name, values in curves.items():
+        matrix = np.full((n, SENSITIVITY_POINTS), np.nan)
+        for i, curve in enumerate(values):
+            if curve and len(curve) == SENSITIVITY_POINTS:
+                matrix[i] = curve
+        columns[name] = matrix
+    return columns
+
+
+def _load_json(text):
+    try:
+        return json.loads(text) if text else {}
+    except (ValueError, TypeError):
+        return {}
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def export_history(db, path, fmt='csv', chunk_size=10000):
+    """
+    Export the calculations table to path as csv, jsonl, npy (a directory of
+    memory-mappable .npy columns) or arrow (IPC file, needs pyarrow).
+    Reads in chunks inside one read transaction, so memory stays constant and
+    the export is a consistent snapshot. Returns the number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    conn = db.get_connection()
+    try:
+        conn.execute('BEGIN')
+        writer = {
+            'csv': _export_csv,
+            'jsonl': _export_jsonl,
+            'npy': _export_npy,
+            'arrow': _export_arrow,
+        }[fmt]
+        return writer(conn, path, chunk_size)
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def _export_csv(conn, path, chunk_size):
+    header = []
+    for name in export_columns():
+        if name in SENSITIVITY_COLUMNS:
+            header.extend(f'{name}_{i}' for i in range(SENSITIVITY_POINTS))
+        else:
+            header.append(name)
+
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for chunk in iter_calculation_chunks(conn, chunk_size):
+            parts = [chunk[name] if chunk[name].ndim == 2 else chunk[name][:, None]
+                     for name in export_columns()]
+            matrix = np.concatenate([p.astype(object) for p in parts], axis=1)
+            writer.writerows(matrix.tolist())
+            count += len(matrix)
+    return count
+
+
+def _export_jsonl(conn, path, chunk_size):
+    names = export_columns()
+    count = 0
+    with open(path, 'w') as f:
+        for chunk in iter_calculation_chunks(conn, chunk_size):
+            lists = {name: chunk[name].tolist() for name in names}
+            for i in range(len(chunk['id'])):
+                record = {name: _json_value(lists[name][i]) for name in names}
+                f.write(json.dumps(record) + "\n")
+                count += 1
+    return count
+
+
+def _json_value(value):
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, list):
+        return [_json_value(v) for v in value]
+    return value
+
+
+def _export_npy(conn, path, chunk_size):
+    """One .npy file per column, preallocated and filled chunk by chunk"""
+    count = conn.execute('SELECT COUNT(*) FROM calculations').fetchone()[0]
+    widths = conn.execute(f'''
+        SELECT {", ".join(f"MAX(LENGTH({name}))" for name in TEXT_COLUMNS)} FROM calculations
+    ''').fetchone()
+
+    os.makedirs(path, exist_ok=True)
+    dtypes = {'id': np.int64, 'run_count': np.int64}
+    for name, width in zip(TEXT_COLUMNS, widths):
+        dtypes[name] = f'<U{max(1, width or 1)}'
+    for name in FLAG_FIELDS:
+        dtypes[name] = np.bool_
+
+    arrays = {}
+    for name in export_columns():
+        shape = (count, SENSITIVITY_POINTS) if name in SENSITIVITY_COLUMNS else (count,)
+        arrays[name] = np.lib.format.open_memmap(
+            os.path.join(path, f'{name}.npy'), mode='w+', dtype=dtypes.get(name, np.float64), shape=shape)
+
+    start = 0
+    for chunk in iter_calculation_chunks(conn, chunk_size):
+        # Rows added after COUNT(*) are not visible inside the read transaction
+        stop = start + len(chunk['id'])
+        for name, array in arrays.items():
+            array[start:stop] = chunk[name]
+        start = stop
+
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump({'rows': start, 'columns': export_columns()}, f, indent=2)
+    return start
+
+
+def _export_arrow(conn, path, chunk_size):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("Arrow export needs pyarrow; use the npy format instead")
+
+    writer = None
+    count = 0
+    try:
+        for chunk in iter_calculation_chunks(conn, chunk_size):
+            arrays = []
+            for name in export_columns():
+                values = chunk[name]
+                if values.ndim == 2:
+                    arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), SENSITIVITY_POINTS))
+                else:
+                    arrays.append(pa.array(values))
+            batch = pa.RecordBatch.from_arrays(arrays, names=export_columns())
+            if writer is None:
+                writer = pa.ipc.new_file(path, batch.schema)
+            writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def load_columnar(path):
+    """
+    Load an npy export as a dict of read-only memory-mapped arrays;
+    no data is copied until it is touched.
+    """
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    return {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        for name in manifest['columns']
+    }
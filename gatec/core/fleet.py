@@ -0,0 +1,120 @@
+import numpy as np
+
+from gatec.core.batch import NUMERIC_FIELDS, FLAG_FIELDS, STAGE_KEYS, inputs_to_columns, calculate_batch
+
+
+class Fleet:
+    """
+    Portfolio of plants evaluated with the batch calculator.
+
+    Per-plant results are kept as arrays and the fleet totals as running sums,
+    so changing one plant only re-evaluates that plant and adjusts the sums.
+    """
+    def __init__(self, plants=(), names=None, columns=None):
+        """
+        Build from a list of input dicts, or from names and calculator
+        columns (e.g. from gatec.core.spool.read_plants).
+        """
+        if columns is None:
+            self.names = [p.get('plant_location', '') for p in plants]
+            self.columns = inputs_to_columns(plants)
+        else:
+            self.names = list(names)
+            n = len(self.names)
+            self.columns = {field: np.array(np.broadcast_to(columns.get(field, default), (n,)),
+                                            dtype=bool if field in FLAG_FIELDS else float)
+                            for fields in (NUMERIC_FIELDS, FLAG_FIELDS) for field, default in fields.items()}
+        self.refresh()
+
+    def __len__(self):
+        return len(self.names)
+
+    def refresh(self):
+        """Re-evaluate every plant and rebuild the fleet sums from scratch"""
+        batch = calculate_batch(self.columns)
+        self.output = np.array(self.columns['total_output'], dtype=float)
+        self.energy = batch['total_energy']
+        self.efficiency = batch['total_efficiency']
+        self.emissions = batch['total_emissions']
+        self.stage_energy = np.column_stack([batch['energy_contributions'][s] for s in STAGE_KEYS])
+
+        self._output_sum = self.output.sum()
+        self._energy_sum = self.energy.sum()
+        self._weighted_efficiency_sum = (self.output * self.efficiency).sum()
+        self._emissions_sum = (self.output * self.emissions).sum()
+        self._stage_sums = self.stage_energy.sum(axis=0)
+
+    def update_plant(self, index, **changes):
+        """Apply input changes to one plant and update the fleet sums incrementally"""
+        for field, value in changes.items():
+            if field in NUMERIC_FIELDS:
+                self.columns[field][index] = float(value)
+            elif field in FLAG_FIELDS:
+                self.columns[field][index] = bool(value)
+            elif field == 'plant_location':
+                self.names[index] = value
+            else:
+                raise ValueError(f"Unknown plant field: {field}")
+
+        row = {field: column[index:index + 1] for field, column in self.columns.items()}
+        batch = calculate_batch(row)
+
+        old_output = self.output[index]
+        old_energy = self.energy[index]
+        old_efficiency = self.efficiency[index]
+        old_emissions = self.emissions[index]
+        old_stages = self.stage_energy[index].copy()
+
+        self.output[index] = self.columns['total_output'][index]
+        self.energy[index] = batch['total_energy'][0]
+        self.efficiency[index] = batch['total_efficiency'][0]
+        self.emissions[index] = batch['total_emissions'][0]
+        self.stage_energy[index] = [batch['energy_contributions'][s][0] for s in STAGE_KEYS]
+
+        self._output_sum += self.output[index] - old_output
+        self._energy_sum += self.energy[index] - old_energy
+        self._weighted_efficiency_sum += self.output[index] * self.efficiency[index] - old_output * old_efficiency
+        self._emissions_sum += self.output[index] * self.emissions[index] - old_output * old_emissions
+        self._stage_sums += self.stage_energy[index] - old_stages
+
+    def summary(self):
+        """Fleet-level figures"""
+        output_sum = self._output_sum
+        stage_total = self._stage_sums.sum()
+        return {
+            'plant_count': len(self),
+            'total_output': float(output_sum),
+            'total_energy': float(self._energy_sum),
+            # Capacity-weighted mean of the plants' total efficiencies
+            'total_efficiency': float(self._weighted_efficiency_sum / output_sum) if output_sum > 0 else 0.0,
+            # Output over energy for the fleet taken as a single system
+            'system_efficiency': float(output_sum / self._energy_sum * 100) if self._energy_sum > 0 else 0.0,
+            # Output-weighted emissions intensity (kg CO2/MWh) and absolute rate (kg CO2/h)
+            'emissions_intensity': float(self._emissions_sum / output_sum) if output_sum > 0 else 0.0,
+            'total_emissions': float(self._emissions_sum),
+            'stage_shares': {
+                stage: float(value / stage_total) if stage_total > 0 else 0.0
+                for stage, value in zip(STAGE_KEYS, self._stage_sums)
+            },
+        }
+
+    def marginal_contributions(self):
+        """
+        Each plant's contribution to the fleet total efficiency: the fleet figure
+        minus the figure the fleet would have without that plant.
+        """
+        fleet_efficiency = self.summary()['total_efficiency']
+        remaining_output = self._output_sum - self.output
+        with np.errstate(divide='ignore', invalid='ignore'):
+            without = np.where(
+                remaining_output > 0,
+                (self._weighted_efficiency_sum - self.output * self.efficiency) / remaining_output,
+                0.0
+            )
+            capacity_share = np.where(self._output_sum > 0, self.output / self._output_sum, 0.0)
+        return {
+            'names': list(self.names),
+            'capacity_share': capacity_share,
+            'efficiency_without': without,
+            'efficiency_contribution': fleet_efficiency - without,
+        }
@@ -0,0 +1,130 @@
+import numpy as np
+
+from gatec.core.batch import NUMERIC_FIELDS, CCS_FIELDS, calculate_batch
+from gatec.core.stages import stage_model
+
+# Variables that add directly to the total energy
+ENERGY_FIELDS = list(stage_model.fields)
+
+# Output metrics that can be targeted
+METRICS = ['total_efficiency', 'efficiency_drop', 'total_emissions']
+
+# Variables that can be solved for
+SOLVABLE_FIELDS = ENERGY_FIELDS + ['plant_efficiency', 'total_output', 'emissions_value']
+
+
+def solve(input_data, variable, target, metric='total_efficiency'):
+    """
+    Find the value of a single input that makes metric equal target.
+    Returns None when no positive value reaches the target.
+    """
+    value = solve_batch(input_data, variable, [target], metric=metric)[0]
+    return None if np.isnan(value) else float(value)
+
+
+def solve_batch(input_data, variable, targets, metric='total_efficiency'):
+    """
+    Solve for variable at every target at once.
+    Uses the closed-form inverse of the efficiency formulas where one exists
+    and a vectorized bisection over calculate_batch otherwise. Infeasible
+    targets come back as NaN.
+    """
+    if variable not in SOLVABLE_FIELDS:
+        raise ValueError(f"Cannot solve for {variable}")
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+
+    targets = np.asarray(targets, dtype=float)
+    base = _base_columns(input_data, variable)
+
+    analytic = _solve_analytic(base, variable, targets, metric)
+    if analytic is not None:
+        return analytic
+    return _solve_bisection(base, variable, targets, metric)
+
+
+def _base_columns(input_data, variable):
+    base = {k: v for k, v in input_data.items() if k in NUMERIC_FIELDS or k in ('ccs', 'include_emissions')}
+    # Generation follows plant efficiency and output unless it is the unknown itself
+    if variable in ('plant_efficiency', 'total_output'):
+        base.pop('generation', None)
+    if variable in CCS_FIELDS:
+        base['ccs'] = True
+    return base
+
+
+def _solve_analytic(base, variable, targets, metric):
+    """Closed-form solutions for efficiency targets; None when not invertible"""
+    plant_efficiency = float(base.get('plant_efficiency', 0) or 0)
+
+    if metric == 'efficiency_drop':
+        # drop = plant_efficiency - total_efficiency only while it is positive
+        if variable == 'plant_efficiency':
+            return None
+        targets = plant_efficiency - targets
+    elif metric != 'total_efficiency':
+        return None
+
+    if variable not in ENERGY_FIELDS + ['plant_efficiency', 'total_output']:
+        return None
+
+    current = calculate_batch(base, sensitivity=False)
+    total_output = float(base.get('total_output', 0) or 0)
+    total_energy = float(current['total_energy'][0])
+    generation = float(current['energy_contributions']['generation'][0])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if variable in ENERGY_FIELDS:
+            value = float(base.get(variable, 0) or 0) if variable != 'generation' else generation
+            weight = stage_model.weight(variable)
+            other_energy = total_energy - weight * value
+            solution = (100 * total_output / targets - other_energy) / weight
+            feasible = solution >= 0
+        elif variable == 'plant_efficiency':
+            other_energy = total_energy - generation
+            generation_needed = 100 * total_output / targets - other_energy
+            solution = 100 * total_output / generation_needed
+            feasible = (generation_needed > 0) & (solution > 0)
+        else:
+            # total_efficiency = O / (other + 100 * O / plant_efficiency)
+            other_energy = total_energy - generation
+            solution = targets * other_energy / (100 * (1 - targets / plant_efficiency))
+            feasible = (plant_efficiency > 0) & (targets < plant_efficiency) & (solution > 0)
+
+    feasible &= targets > 0
+    return np.where(feasible, solution, np.nan)
+
+
+def _solve_bisection(base, variable, targets, metric, iterations=80):
+    """Vectorized bracketing root-finder over calculate_batch"""
+    n = len(targets)
+
+    def residual(x):
+        columns = dict(base)
+        columns[variable] = x
+        return calculate_batch(columns, sensitivity=False)[metric] - targets
+
+    current = float(base.get(variable, 0) or 0)
+    lo = np.full(n, 1e-9)
+    hi = np.full(n, max(1.0, current * 2))
+    f_lo = residual(lo)
+    f_hi = residual(hi)
+
+    # Expand the upper bound until every target is bracketed (or give up)
+    for _ in range(60):
+        open_ = np.sign(f_lo) == np.sign(f_hi)
+        if not open_.any():
+            break
+        hi = np.where(open_, hi * 2, hi)
+        f_hi = np.where(open_, residual(hi), f_hi)
+    bracketed = np.sign(f_lo) != np.sign(f_hi)
+
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        f_mid = residual(mid)
+        left = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(left, mid, lo)
+        f_lo = np.where(left, f_mid, f_lo)
+        hi = np.where(left, hi, mid)
+
+    return np.where(bracketed, (lo + hi) / 2, np.nan)
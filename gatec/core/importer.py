@@ -0,0 +1,426 @@
+import csv
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from gatec.core.batch import NUMERIC_FIELDS, CCS_FIELDS, calculate_batch, row_results
+from gatec.core.db_manager import calculation_row
+from gatec.core.stages import stage_model
+from gatec.core.timeseries import TRUE_VALUES
+
+# Fields InputScreen.collect_data requires, with their display names.
+# All must be numeric and all but plant_efficiency greater than zero.
+REQUIRED_FIELDS = {
+    'plant_efficiency': "Efficiency",
+    'total_output': "Total Output",
+    'extraction': "Extraction",
+    'processing': "Processing",
+    'transportation': "Transportation",
+    'generation': "Generation",
+}
+NON_POSITIVE_ALLOWED = ['plant_efficiency']
+
+CCS_NAMES = {
+    'ccs_capture': "CCS Capture",
+    'ccs_compression': "CCS Compression",
+    'ccs_transportation': "CCS Transportation",
+    'ccs_storage': "CCS Storage",
+}
+TEXT_FIELDS = ['plant_location', 'fuel_type', 'region', 'route', 'year']
+
+# Column order of pasted tables that have no header row (the grid entry screen's order)
+PASTE_COLUMNS = (
+    ['plant_location', 'fuel_type', 'plant_efficiency', 'total_output']
+    + stage_model.fields_in('fuel')
+    + ['generation', 'ccs', 'ccs_capture_rate'] + list(CCS_FIELDS)
+    + ['include_emissions', 'emissions_value', 'upstream_emissions', 'sensitivity_value', 'ccs_sensitivity_value']
+)
+
+
+def read_import_chunks(path, chunk_size=20000, position=None, with_positions=False):
+    """
+    Read a CSV or JSONL file of past calculations in chunks.
+    Yields (line_numbers, records, errors): records are dicts of raw values
+    and errors lists (line, message) for lines that could not be parsed.
+    position is an (offset, line) pair from a previous read to continue
+    from; with_positions adds the (offset, line) where each chunk ends.
+    """
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        chunks = _read_jsonl(path, chunk_size, position)
+    else:
+        chunks = _read_csv(path, chunk_size, position)
+    for chunk in chunks:
+        yield chunk if with_positions else chunk[:3]
+
+
+def _read_lines(f):
+    # readline keeps f.tell() usable, unlike iterating over the file
+    while True:
+        text = f.readline()
+        if not text:
+            return
+        yield text
+
+
+def _read_csv(path, chunk_size, position):
+    with open(path, newline='') as f:
+        reader = csv.reader(_read_lines(f))
+        header = [name.strip().lower() for name in next(reader)]
+        first_line = 2
+        if position:
+            f.seek(position[0])
+            first_line = position[1]
+        # line_num counts physical lines, so quoted line breaks keep the numbering right
+        base = consumed = reader.line_num
+        lines, records = [], []
+        for row in reader:
+            line = first_line + consumed - base
+            consumed = reader.line_num
+            if not row:
+                continue
+            lines.append(line)
+            records.append(dict(zip(header, row)))
+            if len(records) == chunk_size:
+                yield lines, records, [], (f.tell(), first_line + consumed - base)
+                lines, records = [], []
+        if records:
+            yield lines, records, [], (f.tell(), first_line + consumed - base)
+
+
+def _read_jsonl(path, chunk_size, position):
+    with open(path) as f:
+        line = 0
+        if position:
+            f.seek(position[0])
+            line = position[1] - 1
+        lines, records, errors = [], [], []
+        for text in _read_lines(f):
+            line += 1
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+                if not isinstance(record, dict):
+                    raise ValueError
+            except ValueError:
+                errors.append((line, "Invalid JSON record"))
+                continue
+            lines.append(line)
+            records.append(record)
+            if len(records) == chunk_size:
+                yield lines, records, errors, (f.tell(), line + 1)
+                lines, records, errors = [], [], []
+        if records or errors:
+            yield lines, records, errors, (f.tell(), line + 1)
+
+
+def _raw_column(records, field):
+    return np.array(['' if r.get(field) is None else str(r.get(field)).strip() for r in records], dtype=str)
+
+
+def _coerce(raw):
+    """
+    Parse a column of strings to floats in one pass where possible.
+    Returns (values, blank, invalid); blank and invalid entries are NaN.
+    """
+    blank = raw == ''
+    filled = np.where(blank, 'nan', raw)
+    try:
+        values = filled.astype(float)
+        invalid = np.zeros(len(raw), dtype=bool)
+    except ValueError:
+        # Some entry is not a number: fall back to per-value parsing for this column
+        values = np.full(len(raw), np.nan)
+        invalid = np.zeros(len(raw), dtype=bool)
+        for i, value in enumerate(filled):
+            try:
+                values[i] = float(value)
+            except ValueError:
+                invalid[i] = True
+    invalid |= ~blank & ~np.isfinite(values)
+    return values, blank, invalid
+
+
+def _flag(records, field):
+    raw = np.array([str(r.get(field, '')).strip().lower() for r in records], dtype=str)
+    return np.isin(raw, TRUE_VALUES)
+
+
+def validate_chunk(records):
+    """
+    Validate a chunk of raw records with the InputScreen.collect_data rules,
+    one column at a time. Returns (columns, valid, messages) where columns
+    are calculate_batch inputs, valid is a boolean mask and messages holds a
+    list of error strings per record.
+    """
+    n = len(records)
+    columns = {}
+    problems = []  # (mask, message) pairs, checked in InputScreen order
+
+    for field, name in REQUIRED_FIELDS.items():
+        values, blank, invalid = _coerce(_raw_column(records, field))
+        if field == 'generation':
+            # A missing generation is derived like calculate_generation fills in the form
+            efficiency, output = columns['plant_efficiency'], columns['total_output']
+            with np.errstate(divide='ignore', invalid='ignore'):
+                derived = np.round(output / (efficiency / 100), 2)
+            values = np.where(blank, derived, values)
+            problems.append((invalid, f"Invalid {name} value"))
+            problems.append((~invalid & ~(values > 0), f"{name} must be greater than 0"))
+        else:
+            problems.append((blank | invalid, f"Invalid {name} value"))
+            if field not in NON_POSITIVE_ALLOWED:
+                problems.append((~blank & ~invalid & (values <= 0), f"{name} must be greater than 0"))
+        columns[field] = values
+
+    # Extra fuel-chain stages from the registry are optional and may be zero
+    for field in stage_model.fields_in('fuel'):
+        if field in columns:
+            continue
+        values, blank, invalid = _coerce(_raw_column(records, field))
+        label = stage_model.field_label(field)
+        problems.append((invalid, f"Invalid {label} value"))
+        problems.append((~invalid & (values < 0), f"{label} cannot be negative"))
+        columns[field] = np.where(blank | invalid, 0.0, values)
+
+    columns['ccs'] = _flag(records, 'ccs')
+    for field in CCS_FIELDS:
+        values, blank, invalid = _coerce(_raw_column(records, field))
+        problems.append((columns['ccs'] & invalid, f"Invalid {CCS_NAMES.get(field, field)} value"))
+        columns[field] = np.where(columns['ccs'] & ~blank & ~invalid, values, 0.0)
+
+    columns['include_emissions'] = _flag(records, 'include_emissions')
+    values, blank, invalid = _coerce(_raw_column(records, 'emissions_value'))
+    problems.append((columns['include_emissions'] & invalid, "Invalid Emissions value"))
+    columns['emissions_value'] = np.where(columns['include_emissions'] & ~blank & ~invalid, values, 0.0)
+    values, blank, invalid = _coerce(_raw_column(records, 'upstream_emissions'))
+    problems.append((columns['include_emissions'] & invalid, "Invalid Upstream Emissions value"))
+    columns['upstream_emissions'] = np.where(columns['include_emissions'] & ~blank & ~invalid, values, 0.0)
+    values, blank, invalid = _coerce(_raw_column(records, 'ccs_capture_rate'))
+    out_of_range = ~blank & ~invalid & ((values < 0) | (values > 1))
+    problems.append((columns['ccs'] & (invalid | out_of_range), "CCS Capture Rate must be between 0 and 1"))
+    columns['ccs_capture_rate'] = np.where(blank | invalid | out_of_range, NUMERIC_FIELDS['ccs_capture_rate'], values)
+
+    for field, name in (('sensitivity_value', "Sensitivity"), ('ccs_sensitivity_value', "CCS Sensitivity")):
+        values, blank, invalid = _coerce(_raw_column(records, field))
+        problems.append((invalid, f"Invalid {name} value"))
+        columns[field] = np.where(blank | invalid, 5.0, values)
+
+    valid = np.ones(n, dtype=bool)
+    for mask, _ in problems:
+        valid &= ~mask
+
+    messages = {}
+    for i in np.flatnonzero(~valid):
+        messages[int(i)] = [message for mask, message in problems if mask[i]]
+    return columns, valid, messages
+
+
+def _header_key(name):
+    return '_'.join(str(name).strip().lower().replace('-', ' ').split())
+
+
+# Header spellings accepted in pasted tables besides the field names themselves
+PASTE_HEADERS = {_header_key(name): field for field, name in {**REQUIRED_FIELDS, **CCS_NAMES}.items()}
+PASTE_HEADERS.update({_header_key(field): field for field in PASTE_COLUMNS + TEXT_FIELDS})
+PASTE_HEADERS.update({'location': 'plant_location', 'fuel': 'fuel_type', 'efficiency_(%)': 'plant_efficiency',
+                      'output': 'total_output', 'total_output_(mw)': 'total_output'})
+
+
+def parse_table(text, columns=None):
+    """
+    Read tabular text pasted from a spreadsheet (tab separated, or comma
+    separated when there is no tab) into records for validate_chunk.
+    A first row whose cells are all known headers names the columns;
+    otherwise columns (default PASTE_COLUMNS) gives the order.
+    Returns (lines, records, errors) like read_import_chunks.
+    """
+    delimiter = '\t' if '\t' in text else ','
+    table = [(number, cells) for number, cells in
+             enumerate(csv.reader(text.splitlines(), delimiter=delimiter), start=1) if any(c.strip() for c in cells)]
+    if not table:
+        return [], [], []
+
+    header = [_header_key(cell) for cell in table[0][1]]
+    if all(key in PASTE_HEADERS or not key for key in header):
+        fields = [PASTE_HEADERS.get(key) for key in header]
+        table = table[1:]
+    else:
+        fields = list(columns or PASTE_COLUMNS)
+
+    lines, records, errors = [], [], []
+    for number, cells in table:
+        if len(cells) > len(fields) and any(c.strip() for c in cells[len(fields):]):
+            errors.append((number, f"Row has {len(cells)} cells, expected at most {len(fields)}"))
+            continue
+        lines.append(number)
+        records.append({field: cell for field, cell in zip(fields, cells) if field})
+    return lines, records, errors
+
+
+def _input_records(records, columns, rows):
+    """Rebuild collect_data style input dicts for the valid rows"""
+    lists = {field: values[rows].tolist() for field, values in columns.items()}
+    inputs = []
+    for k, i in enumerate(rows):
+        record = records[i]
+        input_data = {field: values[k] for field, values in lists.items()}
+        for field in TEXT_FIELDS:
+            input_data[field] = '' if record.get(field) is None else str(record.get(field))
+        inputs.append(input_data)
+    return inputs
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def evaluate_records(records):
+    """
+    Validate records with the collect_data rules and evaluate the valid ones
+    in a single calculate_batch call. Returns (rows, inputs, batch, messages):
+    the indices of the valid records, their input dicts, the batch results
+    aligned with rows (None when no record is valid) and the messages of
+    the invalid records by index.
+    """
+    columns, valid, messages = validate_chunk(records)
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return rows, [], None, messages
+    batch = calculate_batch({field: values[rows] for field, values in columns.items()})
+    return rows, _input_records(records, columns, rows), batch, messages
+
+
+def prepare_chunk(chunk):
+    """
+    Validate and evaluate one chunk from read_import_chunks.
+    Returns (params, errors, row_count, saved_lines) where params are ready
+    for DBManager.save_calculation_rows. Runs in worker processes.
+    """
+    lines, records, errors = chunk
+    errors = list(errors)
+    if not records:
+        return [], errors, len(errors), []
+
+    rows, inputs, batch, messages = evaluate_records(records)
+    for i, row_messages in messages.items():
+        errors.extend((lines[i], message) for message in row_messages)
+    if len(rows) == 0:
+        return [], errors, len(records) + len(chunk[2]), []
+
+    now = datetime.now()
+    params = [
+        calculation_row(input_data, row_results(batch, k), _parse_timestamp(records[i].get('timestamp')) or now)
+        for k, (i, input_data) in enumerate(zip(rows, inputs))
+    ]
+    return params, errors, len(records) + len(chunk[2]), [lines[i] for i in rows]
+
+
+def import_job_key(path, chunk_size):
+    """Identifies one import of one version of a file, so running it again resumes it"""
+    stat = os.stat(path)
+    key = json.dumps(['import', os.path.abspath(path), stat.st_size, stat.st_mtime_ns, chunk_size])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def import_file(db, path, chunk_size=20000, report_path=None, workers=None, resume=True):
+    """
+    Import past calculations from a CSV or JSONL file.
+    Every chunk is validated column-wise and its valid rows are evaluated
+    with calculate_batch, in worker processes when more than one CPU is
+    available; each chunk is then saved in one transaction. Rows with a
+    timestamp column keep it; others are stamped now. Returns a summary
+    dict with the per-row errors as (line, message) pairs, also written as
+    CSV to report_path when given.
+
+    Each chunk's rows are saved together with its entry in the batch job
+    manifest (file offset, lines, counts and errors). Running the same
+    import again (unchanged file, same chunk size) skips the finished
+    chunks and continues after the last one; resume=False starts over.
+    summary['complete'] is False when the import stopped on a database
+    error and can be resumed.
+    """
+    job_key = import_job_key(path, chunk_size)
+    if not resume:
+        db.delete_job(job_key)
+    job_id, status, finished = db.start_job(job_key, 'import', os.path.abspath(path))
+
+    summary = {'rows': 0, 'imported': 0, 'rejected': 0, 'errors': [],
+               'resumed_chunks': len(finished), 'complete': status == 'done', 'already_done': status == 'done'}
+    for chunk in finished:
+        summary['rows'] += chunk['rows']
+        summary['imported'] += chunk['saved']
+        summary['errors'].extend(tuple(error) for error in json.loads(chunk['errors_json'] or '[]'))
+    position = (finished[-1]['end_offset'], finished[-1]['end_line']) if finished else None
+    progress = {'chunk': len(finished), 'line': position[1] if position else 1}
+
+    def save(prepared, end):
+        params, errors, count, saved_lines = prepared
+        manifest = {'chunk': progress['chunk'], 'start_line': progress['line'], 'end_line': end[1],
+                    'end_offset': end[0], 'rows': count, 'errors': errors}
+        if not db.save_job_chunk(job_id, manifest, params):
+            summary['errors'].extend((line, "Could not be saved") for line in saved_lines)
+            return False
+        summary['rows'] += count
+        summary['imported'] += len(params)
+        summary['errors'].extend(errors)
+        progress['chunk'] += 1
+        progress['line'] = end[1]
+        return True
+
+    if status != 'done':
+        chunks = read_import_chunks(path, chunk_size, position=position, with_positions=True)
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        saved = True
+        if workers > 1:
+            # Keep a bounded number of chunks in flight so memory stays flat;
+            # results are saved in file order so the checkpoint only moves forward
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((pool.submit(prepare_chunk, chunk[:3]), chunk[3]))
+                    if len(pending) >= workers * 2:
+                        future, end = pending.popleft()
+                        saved = save(future.result(), end)
+                        if not saved:
+                            break
+                while saved and pending:
+                    future, end = pending.popleft()
+                    saved = save(future.result(), end)
+                for future, _ in pending:
+                    future.cancel()
+        else:
+            for chunk in chunks:
+                saved = save(prepare_chunk(chunk[:3]), chunk[3])
+                if not saved:
+                    break
+        if saved:
+            db.finish_job(job_id)
+            summary['complete'] = True
+
+    summary['rejected'] = summary['rows'] - summary['imported']
+    summary['errors'].sort()
+    if report_path:
+        write_error_report(summary['errors'], report_path)
+    return summary
+
+
+def write_error_report(errors, path):
+    """Write (line, message) pairs as a CSV error report"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'error'])
+        writer.writerows(errors)
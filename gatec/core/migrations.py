@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+
+# A migration is a dict with
+#   version  - schema version it brings the database to (PRAGMA user_version)
+#   name     - short description
+#   schema   - function(conn) doing the quick DDL; it runs in one transaction
+#              together with the version bump
+#   backfill - optional function(conn, after_id, chunk_size) that updates one
+#              bounded chunk of rows after after_id and returns
+#              (last_id, rows), with last_id None once nothing is left
+# Backfills run after the schema is current, chunk by chunk, each chunk in its
+# own transaction with the saved cursor, so they can run in the background and
+# resume where they stopped.
+
+# Attempts at one backfill chunk while another writer holds the database
+BUSY_RETRIES = 20
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def add_column(conn, table, column, definition):
+    """ALTER TABLE ADD COLUMN unless the column exists (for databases that predate migrations)"""
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in existing:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+def migrate(conn, migrations):
+    """
+    Apply the schema steps newer than the database's user_version, in order.
+    Each step and its version bump commit together, so an interrupted run
+    continues with the first step not applied. Returns the versions applied.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_backfills (
+            version INTEGER PRIMARY KEY,
+            last_id INTEGER,
+            rows INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            updated REAL
+        )
+    ''')
+    conn.commit()
+
+    current = schema_version(conn)
+    latest = max(m['version'] for m in migrations)
+    if current > latest:
+        print(f"Database schema version {current} is newer than this version of GATEC ({latest})")
+        return []
+
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m['version']):
+        if migration['version'] <= current:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            migration['schema'](conn)
+            if migration.get('backfill'):
+                conn.execute(
+                    'INSERT OR IGNORE INTO schema_backfills (version, updated) VALUES (?, ?)',
+                    (migration['version'], time.time())
+                )
+            conn.execute(f"PRAGMA user_version = {int(migration['version'])}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(migration['version'])
+    return applied
+
+
+def pending_backfills(conn, migrations):
+    """Backfills not finished yet, as (migration, last_id) pairs in version order"""
+    state = {version: last_id for version, last_id in conn.execute(
+        'SELECT version, last_id FROM schema_backfills WHERE done = 0')}
+    return [(m, state[m['version']]) for m in sorted(migrations, key=lambda m: m['version'])
+            if m.get('backfill') and m['version'] in state]
+
+
+def is_busy(error):
+    """True for the OperationalErrors of a database held by another connection"""
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message or 'database table is locked' in message
+
+
+def run_backfill_chunk(conn, migration, last_id, chunk_size):
+    """
+    Run one chunk of a backfill and save its cursor in the same transaction.
+    Returns (last_id, rows, done).
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        new_last_id, rows = migration['backfill'](conn, last_id if last_id is not None else 0, chunk_size)
+        conn.execute('''
+            UPDATE schema_backfills SET last_id = ?, rows = rows + ?, done = ?, updated = ?
+            WHERE version = ?
+        ''', (new_last_id if new_last_id is not None else last_id, rows, int(new_last_id is None),
+              time.time(), migration['version']))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return new_last_id, rows, new_last_id is None
+
+
+def run_backfills(connect, migrations, chunk_size=5000, pause=0.0, stop=None, progress=None):
+    """
+    Run all pending backfills to completion, or until stop (a
+    threading.Event) is set. pause seconds between chunks leave room for
+    other writers. progress(migration, rows_so_far) is called per chunk.
+    Returns True when everything is done. A chunk that still finds the
+    database busy after BUSY_RETRIES attempts, or fails for any other
+    reason, raises; the saved cursor lets the next run resume.
+    """
+    conn = connect()
+    try:
+        for migration, last_id in pending_backfills(conn, migrations):
+            total = 0
+            done = False
+            attempts = 0
+            while not done:
+                if stop is not None and stop.is_set():
+                    return False
+                try:
+                    last_id, rows, done = run_backfill_chunk(conn, migration, last_id, chunk_size)
+                except sqlite3.OperationalError as e:
+                    attempts += 1
+                    if not is_busy(e) or attempts >= BUSY_RETRIES:
+                        raise
+                    # Busy with another writer: retry the same chunk shortly
+                    print(f"Backfill {migration['version']} waiting: {e}")
+                    time.sleep(max(pause, 0.5))
+                    continue
+                attempts = 0
+                total += rows
+                if progress is not None:
+                    progress(migration, total)
+                if pause:
+                    time.sleep(pause)
+        return True
+    finally:
+        conn.close()
+
+
+def start_backfills(connect, migrations, chunk_size=2000, pause=0.05):
+    """
+    Run pending backfills in a daemon thread so the application stays usable.
+    Returns the thread; set thread.stop to end it early (it resumes next time).
+    """
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=run_backfills, args=(connect, migrations),
+        kwargs={'chunk_size': chunk_size, 'pause': pause, 'stop': stop},
+        name='gatec-backfill', daemon=True
+    )
+    thread.stop = stop
+    thread.start()
+    return thread
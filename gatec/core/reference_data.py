@@ -0,0 +1,326 @@
+import sqlite3
+import os
+import csv
+import bisect
+
+import numpy as np
+
+from gatec.core.data_manager import load_data
+from gatec.core.migrations import migrate, add_column
+
+# Numeric columns stored for every (fuel, region, route, year) entry
+VALUE_FIELDS = [
+    'extraction',
+    'processing',
+    'transportation',
+    'emissions',
+    'upstream_emissions',
+    'ccs_capture_rate',
+    'ccs_capture',
+    'ccs_compression',
+    'ccs_transportation',
+    'ccs_storage',
+]
+
+DEFAULT_REGION = 'Global'
+DEFAULT_ROUTE = 'Default'
+# Year used for entries that are not tied to a specific year (e.g. data.json defaults)
+UNDATED = 0
+
+# Single lookups kept in memory; the oldest is dropped beyond this
+LOOKUP_CACHE_SIZE = 4096
+
+# Value columns that existed before the emission factors were added
+BASE_VALUE_FIELDS = [field for field in VALUE_FIELDS if field not in ('upstream_emissions', 'ccs_capture_rate')]
+
+
+def _schema_reference_values(conn):
+    columns = ",\n".join(f"{field} REAL" for field in BASE_VALUE_FIELDS)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS reference_values (
+            fuel TEXT NOT NULL,
+            region TEXT NOT NULL,
+            route TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            {columns}
+        )
+    ''')
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_reference_key
+        ON reference_values (fuel, region, route, year)
+    ''')
+
+
+def _schema_emission_factors(conn):
+    add_column(conn, 'reference_values', 'upstream_emissions', 'REAL')
+    add_column(conn, 'reference_values', 'ccs_capture_rate', 'REAL')
+
+
+# Schema versions of reference.db, see gatec.core.migrations
+REFERENCE_MIGRATIONS = [
+    {'version': 1, 'name': 'reference values', 'schema': _schema_reference_values},
+    {'version': 2, 'name': 'emission factor columns', 'schema': _schema_emission_factors},
+]
+
+
+class ReferenceCatalog:
+    """
+    Reference values indexed by (fuel, region, route, year).
+    Values are stored in SQLite and packed into NumPy arrays in memory, so
+    single and bulk lookups never touch the database.
+    """
+    def __init__(self, db_path=None):
+        # Reference data lives next to the history database in data/
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.db_path = db_path or os.path.join(base_dir, 'data', 'reference.db')
+        self._series = {}
+        self._cache = {}
+        self.init_db()
+        self.reload()
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_path)
+
+    def init_db(self):
+        """Bring the reference schema up to date and sync the undated defaults from data.json"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        migrate(conn, REFERENCE_MIGRATIONS)
+
+        # data.json stays the source of truth for the global defaults
+        predefined = load_data().get('predefined_values', {})
+        rows = [
+            (fuel, DEFAULT_REGION, DEFAULT_ROUTE, UNDATED) + tuple(_flatten_predefined(values))
+            for fuel, values in predefined.items()
+        ]
+        cursor.executemany(self._upsert_sql(), rows)
+
+        conn.commit()
+        conn.close()
+
+    def _upsert_sql(self):
+        fields = ", ".join(VALUE_FIELDS)
+        placeholders = ", ".join("?" for _ in range(4 + len(VALUE_FIELDS)))
+        return f'''
+            INSERT OR REPLACE INTO reference_values (fuel, region, route, year, {fields})
+            VALUES ({placeholders})
+        '''
+
+    def reload(self):
+        """Pack all reference rows into per-key year/value arrays"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT fuel, region, route, year, {", ".join(VALUE_FIELDS)}
+                FROM reference_values
+                ORDER BY fuel, region, route, year
+            ''')
+            grouped = {}
+            for row in cursor.fetchall():
+                grouped.setdefault(tuple(row[:3]), []).append(row[3:])
+        finally:
+            conn.close()
+
+        self._series = {}
+        for key, rows in grouped.items():
+            dated = [r for r in rows if r[0] != UNDATED]
+            # Dated entries take precedence; undated ones act as a flat series
+            rows = dated or rows
+            years = np.array([r[0] for r in rows], dtype=float)
+            values = np.array([[v if v is not None else np.nan for v in r[1:]] for r in rows], dtype=float)
+            self._series[key] = (years, values)
+
+        # Regional entries may only override some fields; fill the rest from the defaults
+        for (fuel, region, route), (years, values) in self._series.items():
+            default = self._series.get((fuel, DEFAULT_REGION, DEFAULT_ROUTE))
+            if default is None or default[1] is values:
+                continue
+            missing = np.isnan(values)
+            if missing.any():
+                values[missing] = np.broadcast_to(default[1][-1], values.shape)[missing]
+        self._cache = {}
+
+    def upsert(self, entries):
+        """
+        Insert or replace reference entries.
+        Each entry is a dict with fuel, region, route, year and any VALUE_FIELDS.
+        """
+        rows = []
+        for entry in entries:
+            rows.append((
+                entry['fuel'],
+                entry.get('region') or DEFAULT_REGION,
+                entry.get('route') or DEFAULT_ROUTE,
+                int(entry.get('year') or UNDATED),
+            ) + tuple(_to_float(entry.get(field)) for field in VALUE_FIELDS))
+
+        conn = self.get_connection()
+        try:
+            conn.executemany(self._upsert_sql(), rows)
+            conn.commit()
+        finally:
+            conn.close()
+        self.reload()
+        return len(rows)
+
+    def import_csv(self, path):
+        """Load reference entries from a CSV file with a header row"""
+        with open(path, newline='') as f:
+            return self.upsert(csv.DictReader(f))
+
+    def fuels(self):
+        return sorted({key[0] for key in self._series})
+
+    def regions(self, fuel=None):
+        return sorted({key[1] for key in self._series if fuel is None or key[0] == fuel})
+
+    def routes(self, fuel=None):
+        return sorted({key[2] for key in self._series if fuel is None or key[0] == fuel})
+
+    def _resolve_key(self, fuel, region, route):
+        """Find the most specific series, falling back to the global defaults"""
+        region = region or DEFAULT_REGION
+        route = route or DEFAULT_ROUTE
+        for key in ((fuel, region, route), (fuel, region, DEFAULT_ROUTE),
+                    (fuel, DEFAULT_REGION, route), (fuel, DEFAULT_REGION, DEFAULT_ROUTE)):
+            if key in self._series:
+                return key
+        return None
+
+    def lookup(self, fuel, region=None, year=None, route=None):
+        """
+        Return a dict of VALUE_FIELDS for a single key, linearly interpolated
+        between years and clamped to the first/last year. Returns None when
+        the fuel is unknown. Each call returns a new dict the caller may change.
+        """
+        cache_key = (fuel, region, year, route)
+        row = self._cache.get(cache_key)
+        if row is None:
+            key = self._resolve_key(fuel, region, route)
+            if key is None:
+                return None
+            years, values = self._series[key]
+            row = tuple(_interpolate_row(years, values, year).tolist())
+            if len(self._cache) >= LOOKUP_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[cache_key] = row
+        return dict(zip(VALUE_FIELDS, row))
+
+    def lookup_columns(self, fuels, regions=None, years=None, routes=None):
+        """
+        Vectorized lookup for batch paths.
+        Returns a dict mapping each VALUE_FIELD to an array aligned with fuels;
+        rows with unknown fuels are NaN.
+        """
+        fuels = np.asarray(fuels, dtype=object)
+        n = len(fuels)
+        regions = _broadcast_labels(regions, n)
+        routes = _broadcast_labels(routes, n)
+        if years is None:
+            years = np.full(n, np.nan)
+        else:
+            years = np.broadcast_to(np.asarray(years, dtype=float), (n,))
+
+        out = np.full((n, len(VALUE_FIELDS)), np.nan)
+
+        # Group rows that share a requested key and interpolate each group at once
+        groups = {}
+        for i, request in enumerate(zip(fuels, regions, routes)):
+            groups.setdefault(request, []).append(i)
+
+        for (fuel, region, route), idx in groups.items():
+            key = self._resolve_key(fuel, region, route)
+            if key is None:
+                continue
+            idx = np.asarray(idx)
+            series_years, series_values = self._series[key]
+            out[idx] = _interpolate_rows(series_years, series_values, years[idx])
+
+        return {field: out[:, j] for j, field in enumerate(VALUE_FIELDS)}
+
+    def as_predefined(self, fuel, region=None, year=None, route=None):
+        """Return values in the nested predefined_values shape used by data.json"""
+        values = self.lookup(fuel, region=region, year=year, route=route)
+        if values is None:
+            return None
+        return to_predefined(values)
+
+
+def to_predefined(values):
+    """Nest a dict of VALUE_FIELDS into the predefined_values shape used by data.json"""
+    return {
+        'extraction': values['extraction'],
+        'processing': values['processing'],
+        'transportation': values['transportation'],
+        'emissions': values['emissions'],
+        'upstream_emissions': values['upstream_emissions'],
+        'ccs': {
+            'capture_rate': values['ccs_capture_rate'],
+            'capture': values['ccs_capture'],
+            'compression': values['ccs_compression'],
+            'transportation': values['ccs_transportation'],
+            'storage': values['ccs_storage'],
+        }
+    }
+
+
+def _flatten_predefined(values):
+    ccs = values.get('ccs', {})
+    return [
+        _to_float(values.get('extraction')),
+        _to_float(values.get('processing')),
+        _to_float(values.get('transportation')),
+        _to_float(values.get('emissions')),
+        _to_float(values.get('upstream_emissions')),
+        _to_float(ccs.get('capture_rate')),
+        _to_float(ccs.get('capture')),
+        _to_float(ccs.get('compression')),
+        _to_float(ccs.get('transportation')),
+        _to_float(ccs.get('storage')),
+    ]
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _broadcast_labels(labels, n):
+    if labels is None or isinstance(labels, str):
+        return [labels] * n
+    return list(labels)
+
+
+def _interpolate_row(years, values, year):
+    """Interpolate a single year; None selects the latest entry"""
+    if year is None or len(years) == 1:
+        return values[-1]
+    year = float(year)
+    if year <= years[0]:
+        return values[0]
+    if year >= years[-1]:
+        return values[-1]
+    hi = bisect.bisect_right(years.tolist(), year)
+    lo = hi - 1
+    t = (year - years[lo]) / (years[hi] - years[lo])
+    return values[lo] + t * (values[hi] - values[lo])
+
+
+def _interpolate_rows(years, values, targets):
+    """Interpolate many years against one series (NaN selects the latest entry)"""
+    targets = np.where(np.isnan(targets), years[-1], targets)
+    if len(years) == 1:
+        return np.repeat(values, len(targets), axis=0)
+    clipped = np.clip(targets, years[0], years[-1])
+    hi = np.clip(np.searchsorted(years, clipped, side='right'), 1, len(years) - 1)
+    lo = hi - 1
+    t = ((clipped - years[lo]) / (years[hi] - years[lo]))[:, None]
+    return values[lo] + t * (values[hi] - values[lo])
+
+
+# Singleton instance for easy access
+catalog = ReferenceCatalog()
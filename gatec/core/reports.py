@@ -0,0 +1,157 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Reports never open a window; safe in worker processes
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from gatec.core.batch import legacy_emissions
+from gatec.core.calculator import calculate_results
+from gatec.core.stages import stage_model
+
+REPORT_FORMATS = ['pdf', 'png', 'svg']
+
+# Same palette as the ResultScreen pie chart
+STAGE_COLORS = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#edc948", "#b07aa1", "#ff9da7"]
+
+RESULT_KEYS = ['total_efficiency', 'efficiency_drop', 'total_emissions', 'energy_contributions',
+               'ccs_sensitivity', 'ccs_sensitivity_percentages', 'general_sensitivity']
+
+
+def render_report(input_data, results=None, path='report.pdf', title=None, dpi=150):
+    """
+    Render the key metrics, energy breakdown and both sensitivity charts of
+    one calculation to path; the format follows the file extension (pdf,
+    png or svg). Results are recalculated when missing or incomplete,
+    except the emissions of inputs with a legacy factor, which stay as saved.
+    Returns path.
+    """
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    if not results or 'error' in results or any(key not in results for key in RESULT_KEYS):
+        stored = results or {}
+        results = calculate_results(input_data)
+        if legacy_emissions(input_data) and 'total_emissions' in stored:
+            results['total_emissions'] = stored['total_emissions']
+
+    fig = Figure(figsize=(11.69, 8.27))  # A4 landscape
+    FigureCanvasAgg(fig)
+    fig.suptitle(title or input_data.get('plant_location') or "GATEC calculation report", fontsize=16, weight='bold')
+    grid = fig.add_gridspec(2, 2, hspace=0.35, wspace=0.25)
+
+    _draw_metrics(fig.add_subplot(grid[0, 0]), input_data, results)
+    _draw_pie(fig.add_subplot(grid[0, 1]), results)
+    ccs_ax = fig.add_subplot(grid[1, 0])
+    if input_data.get('ccs'):
+        _draw_sensitivity(ccs_ax, results.get('ccs_sensitivity_percentages', []),
+                          results.get('ccs_sensitivity', []), "CCS Sensitivity Analysis", "CCS Consumption (%)")
+    else:
+        ccs_ax.axis('off')
+        ccs_ax.set_title("CCS Sensitivity Analysis", weight='bold')
+        ccs_ax.text(0.5, 0.5, "CCS not included", ha='center', va='center', transform=ccs_ax.transAxes)
+    general = results.get('general_sensitivity', {})
+    _draw_sensitivity(fig.add_subplot(grid[1, 1]), general.get('percentages', []),
+                      general.get('efficiencies', []), "General Sensitivity Analysis", "Global Consumption (%)")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fig.savefig(path, format=fmt, dpi=dpi)
+    return path
+
+
+def _draw_metrics(ax, input_data, results):
+    ax.axis('off')
+    ax.set_title("Key Metrics", loc='left', weight='bold')
+    lines = [
+        f"Location: {input_data.get('plant_location') or '-'}",
+        f"Fuel: {input_data.get('fuel_type') or '-'}",
+        f"Plant efficiency: {float(input_data.get('plant_efficiency', 0) or 0):.2f}%",
+        f"Total output: {float(input_data.get('total_output', 0) or 0):.2f} MW",
+        f"Total efficiency: {results['total_efficiency']:.2f}%",
+        f"Efficiency drop: {results['efficiency_drop']:.2f}%",
+    ]
+    if input_data.get('include_emissions') and legacy_emissions(input_data):
+        lines.append(f"Total emissions: {results['total_emissions']:.2f} (legacy, factor in g CO2/kg fuel)")
+    elif input_data.get('include_emissions'):
+        lines.append(f"Total emissions: {results['total_emissions']:.2f} kg CO2/MWh")
+        if 'captured_emissions' in results:
+            lines.append(f"Captured by CCS: {results['captured_emissions']:.2f} kg CO2/MWh")
+    else:
+        lines.append("Emissions calculation not enabled")
+    lines.append(f"CCS: {'Yes' if input_data.get('ccs') else 'No'}")
+    ax.text(0.0, 1.0, "\n".join(lines), va='top', ha='left', fontsize=11, linespacing=1.6,
+            transform=ax.transAxes)
+
+
+def _draw_pie(ax, results):
+    ax.set_title("Energy Consumption by Stage", weight='bold')
+    contributions = results.get('energy_contributions', {})
+    data, labels = [], []
+    for stage in stage_model.chart_stages():
+        value = contributions.get(stage['key'], 0.0)
+        if value > 0:
+            data.append(value)
+            labels.append(stage['label'])
+    if not data:
+        ax.axis('off')
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center', transform=ax.transAxes)
+        return
+    ax.pie(data, labels=labels, colors=STAGE_COLORS[:len(data)], autopct='%1.1f%%', startangle=90,
+           counterclock=False, wedgeprops={'edgecolor': 'white'})
+    ax.axis('equal')
+
+
+def _draw_sensitivity(ax, percentages, efficiencies, title, x_label):
+    ax.set_title(title, weight='bold')
+    ax.set_xlabel(x_label)
+    ax.set_ylabel("Total Efficiency (%)")
+    if not percentages or not efficiencies:
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center', transform=ax.transAxes)
+        return
+    ax.plot(percentages, efficiencies, color="#007bff", marker='o', linewidth=2)
+    for x, y in zip(percentages, efficiencies):
+        ax.annotate(f"{y:.2f}%", (x, y), textcoords='offset points', xytext=(0, 8), ha='center', fontsize=8)
+    ax.grid(True, color="#e0e0e0")
+
+
+def render_calculation(row, out_dir, fmt='pdf'):
+    """
+    Worker entry point: render a saved calculation row (as returned by
+    DBManager.get_calculations) to out_dir/calculation-<id>.<fmt>.
+    Returns (id, path, error).
+    """
+    try:
+        input_data = json.loads(row.get('inputs_json') or '{}')
+        results = json.loads(row.get('results_json') or '{}')
+        title = f"Calculation {row['id']}" + (f" - {row['plant_location']}" if row.get('plant_location') else "")
+        path = os.path.join(out_dir, f"calculation-{row['id']}.{fmt}")
+        return row['id'], render_report(input_data, results, path, title=title), None
+    except Exception as e:
+        return row['id'], None, str(e)
+
+
+def render_reports(db, ids, out_dir, fmt='pdf', workers=None, chunk_size=200):
+    """
+    Render reports for many saved calculations in parallel worker processes.
+    Rows are fetched chunk by chunk so memory stays flat for long id lists.
+    Returns a list of (id, path, error) tuples in the order of ids; ids
+    with no saved calculation get the error "Calculation not found".
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    ids = list(ids)
+    outcomes = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            # Each calculation is rendered once even if its id is repeated
+            rows = db.get_calculations(list(dict.fromkeys(int(calc_id) for calc_id in chunk)))
+            rendered = {outcome[0]: outcome for outcome in
+                        pool.map(render_calculation, rows, [out_dir] * len(rows), [fmt] * len(rows))}
+            outcomes.extend(rendered.get(int(calc_id), (calc_id, None, "Calculation not found")) for calc_id in chunk)
+    return outcomes
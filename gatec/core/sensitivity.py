@@ -0,0 +1,37 @@
+import numpy as np
+
+from gatec.core.calculator import calculate_parts
+
+# Largest grid side offered for the two-factor surface
+MAX_RESOLUTION = 500
+
+
+def surface_axis(span=20.0, resolution=101):
+    """Factors in percent from 100 - span to 100 + span, resolution points (clamped to 2..MAX_RESOLUTION)"""
+    resolution = int(min(max(resolution, 2), MAX_RESOLUTION))
+    span = float(min(max(span, 0.0), 100.0))
+    return np.linspace(100 - span, 100 + span, resolution)
+
+
+def sensitivity_surface(input_data, ccs_percentages, general_percentages, state=None):
+    """
+    Total efficiency (%) for every pair of a CCS factor and a general
+    factor, both in percent of the entered consumptions. The general factor
+    scales every non-generation stage (CCS included), the CCS factor only
+    the CCS stages, so the row at 100 % general matches the CCS sensitivity
+    and the column at 100 % CCS the general sensitivity.
+
+    Returns a (len(general_percentages), len(ccs_percentages)) array built
+    by broadcasting. state from calculate_parts is reused when given.
+    """
+    if not state or 'total_energy' not in state:
+        _, state = calculate_parts(input_data, ['energy'])
+    total_output = float(input_data.get('total_output', 0) or 0)
+    ccs = np.asarray(ccs_percentages, dtype=float)[None, :] / 100
+    general = np.asarray(general_percentages, dtype=float)[:, None] / 100
+
+    fixed = state['total_energy'] - state['scaled_energy']
+    fuel = state['scaled_energy'] - state['ccs_energy']
+    total = fixed + general * (fuel + state['ccs_energy'] * ccs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, total_output / total * 100, 0.0)
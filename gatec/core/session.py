@@ -0,0 +1,94 @@
+from types import MappingProxyType
+
+from gatec.core.calculator import RESULT_PARTS, calculate_parts, dependent_parts
+
+
+class Snapshot:
+    """
+    One immutable set of inputs with the results computed for it.
+    inputs and results are read-only views; state keeps the intermediate
+    energy totals so the next edit can reuse them.
+    """
+    __slots__ = ('inputs', 'results', 'state', 'error')
+
+    def __init__(self, inputs, results, state, error=None):
+        self.inputs = MappingProxyType(dict(inputs))
+        self.results = MappingProxyType(results)
+        self.state = MappingProxyType(state)
+        self.error = error
+
+    def changed_fields(self, inputs):
+        """Input fields whose value differs from this snapshot"""
+        fields = set(self.inputs) | set(inputs)
+        return {field for field in fields if self.inputs.get(field) != inputs.get(field)}
+
+
+class InputSession:
+    """
+    Undo/redo history of input snapshots for the input screen.
+
+    record() stores a new snapshot and recomputes only the result parts
+    that depend on the fields that changed since the current one.
+    """
+    def __init__(self, max_history=100):
+        self.max_history = max_history
+        self.history = []
+        self.position = -1
+        self.last_parts = []
+
+    @property
+    def current(self):
+        return self.history[self.position] if self.position >= 0 else None
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.history) - 1
+
+    def record(self, inputs):
+        """
+        Snapshot inputs and return it. Recording the same inputs as the
+        current snapshot returns it unchanged; otherwise any redo history
+        is dropped.
+        """
+        previous = self.current
+        if previous is None or previous.error:
+            parts = RESULT_PARTS
+        else:
+            changed = previous.changed_fields(inputs)
+            if not changed:
+                self.last_parts = []
+                return previous
+            parts = dependent_parts(changed)
+
+        try:
+            base = previous if parts != RESULT_PARTS else None
+            results, state = calculate_parts(inputs, parts,
+                                             base.results if base else None,
+                                             base.state if base else None)
+            snapshot = Snapshot(inputs, results, state)
+        except Exception as e:
+            snapshot = Snapshot(inputs, {}, {}, error=str(e))
+        self.last_parts = parts
+
+        del self.history[self.position + 1:]
+        self.history.append(snapshot)
+        if len(self.history) > self.max_history:
+            del self.history[:len(self.history) - self.max_history]
+        self.position = len(self.history) - 1
+        return snapshot
+
+    def undo(self):
+        """Step back one snapshot; returns it, or None at the start"""
+        if not self.can_undo():
+            return None
+        self.position -= 1
+        return self.current
+
+    def redo(self):
+        """Step forward one snapshot; returns it, or None at the end"""
+        if not self.can_redo():
+            return None
+        self.position += 1
+        return self.current
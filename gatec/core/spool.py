@@ -0,0 +1,377 @@
+import hashlib
+import io
+import os
+import socket
+import sqlite3
+import time
+from multiprocessing import Process
+
+import numpy as np
+
+from gatec.core.batch import NUMERIC_FIELDS, calculate_batch
+from gatec.core.migrations import migrate, add_column
+
+SWEEP_OUTPUTS = ['total_efficiency', 'efficiency_drop', 'total_emissions']
+
+
+def pack_arrays(arrays):
+    """Compact binary block of named arrays, as stored in the spool"""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def unpack_arrays(blob):
+    with np.load(io.BytesIO(blob)) as data:
+        return {name: data[name] for name in data.files}
+
+
+def sweep_key(columns, field, values):
+    """Content hash of a sweep, so publishing the same sweep again finds the existing job"""
+    digest = hashlib.sha256(field.encode())
+    digest.update(np.asarray(values, dtype=float).tobytes())
+    for name in sorted(columns):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(columns[name]).tobytes())
+    return digest.hexdigest()
+
+
+def sweep_block(columns, field, values):
+    """
+    Evaluate every plant in columns at every value of field in one
+    calculate_batch call. Returns SWEEP_OUTPUTS as (plants, values) arrays.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(next(iter(columns.values())))
+    grid = {name: np.repeat(np.asarray(column), len(values)) for name, column in columns.items()}
+    if field in ('plant_efficiency', 'total_output'):
+        # Let generation follow the swept value, as calculate_sweep does
+        grid['generation'] = np.full(n * len(values), np.nan)
+    grid[field] = np.tile(values, n)
+    batch = calculate_batch(grid, sensitivity=False)
+    return {name: batch[name].reshape(n, len(values)) for name in SWEEP_OUTPUTS}
+
+
+def _schema_spool(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created REAL,
+            field TEXT NOT NULL,
+            sweep_values BLOB NOT NULL,
+            plants BLOB NOT NULL,
+            plant_count INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            job_id INTEGER NOT NULL,
+            chunk INTEGER NOT NULL,
+            start INTEGER NOT NULL,
+            stop INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            worker TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result BLOB,
+            error TEXT,
+            PRIMARY KEY (job_id, chunk)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, job_id, chunk)')
+
+
+def _schema_job_key(conn):
+    # Spools created before sweeps could be resumed lack the key
+    add_column(conn, 'jobs', 'job_key', 'TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs (job_key)')
+
+
+# Schema versions of the spool database, see gatec.core.migrations
+SPOOL_MIGRATIONS = [
+    {'version': 1, 'name': 'jobs and tasks', 'schema': _schema_spool},
+    {'version': 2, 'name': 'resumable sweeps', 'schema': _schema_job_key},
+]
+
+
+class Spool:
+    """
+    Work queue for distributed sweeps in a SQLite file.
+
+    The coordinator splits a sweep into chunks of plants; workers on any
+    machine that can open the file (a local disk, or a network share with
+    working file locks) lease one chunk at a time, compute it and store the
+    result block. A lease that is not completed within lease_seconds is
+    handed to another worker, up to max_attempts times.
+    """
+    def __init__(self, path, lease_seconds=60, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.init_db()
+
+    def get_connection(self):
+        # Workers wait on each other's short write transactions instead of failing
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def init_db(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.get_connection()
+        try:
+            migrate(conn, SPOOL_MIGRATIONS)
+        finally:
+            conn.close()
+
+    def submit_sweep(self, columns, field, values, chunk_size=1000, resume=True):
+        """
+        Publish a sweep of every plant in columns (calculate_batch inputs)
+        over values of field. Returns the job id. With resume, an identical
+        sweep published before is reused: its finished chunks are kept and
+        only the rest is computed.
+        """
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Cannot sweep {field}")
+        n = len(next(iter(columns.values())))
+        job_key = sweep_key(columns, field, values)
+        conn = self.get_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            if resume:
+                row = conn.execute('SELECT MAX(id) FROM jobs WHERE job_key = ?', (job_key,)).fetchone()
+                if row[0] is not None:
+                    # Chunks given up on get another chance; done ones are kept
+                    conn.execute('''
+                        UPDATE tasks SET status = 'pending', attempts = 0, error = NULL
+                        WHERE job_id = ? AND status = 'failed'
+                    ''', (row[0],))
+                    conn.execute('COMMIT')
+                    return row[0]
+            cursor = conn.execute(
+                'INSERT INTO jobs (created, field, sweep_values, plants, plant_count, job_key) VALUES (?, ?, ?, ?, ?, ?)',
+                (time.time(), field, pack_arrays({'values': np.asarray(values, dtype=float)}),
+                 pack_arrays({name: np.asarray(column) for name, column in columns.items()}), n, job_key)
+            )
+            job_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO tasks (job_id, chunk, start, stop) VALUES (?, ?, ?, ?)',
+                [(job_id, k, start, min(start + chunk_size, n)) for k, start in enumerate(range(0, n, chunk_size))]
+            )
+            conn.execute('COMMIT')
+            return job_id
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def lease(self, worker):
+        """
+        Take the next pending or abandoned chunk for worker.
+        Returns (job_id, chunk, start, stop), or None when there is no work.
+        """
+        now = time.time()
+        conn = self.get_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Chunks whose workers keep disappearing are given up on
+            conn.execute('''
+                UPDATE tasks SET status = 'failed', error = 'Lease expired too many times'
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+            ''', (now, self.max_attempts))
+            row = conn.execute('''
+                SELECT job_id, chunk, start, stop FROM tasks
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY job_id, chunk LIMIT 1
+            ''', (now,)).fetchone()
+            if row is not None:
+                conn.execute('''
+                    UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1
+                    WHERE job_id = ? AND chunk = ?
+                ''', (worker, now + self.lease_seconds, row[0], row[1]))
+            conn.execute('COMMIT')
+            return row
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def complete(self, worker, job_id, chunk, arrays):
+        """
+        Store a chunk's result block. Returns False if the lease was lost to
+        another worker meanwhile, in which case the result is dropped.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute('''
+                UPDATE tasks SET status = 'done', result = ?, lease_expires = NULL
+                WHERE job_id = ? AND chunk = ? AND status = 'leased' AND worker = ?
+            ''', (pack_arrays(arrays), job_id, chunk, worker))
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def fail(self, worker, job_id, chunk, error):
+        """Mark a chunk failed for good; calculation errors would repeat on any worker"""
+        conn = self.get_connection()
+        try:
+            conn.execute('''
+                UPDATE tasks SET status = 'failed', error = ?, lease_expires = NULL
+                WHERE job_id = ? AND chunk = ? AND status = 'leased' AND worker = ?
+            ''', (str(error), job_id, chunk, worker))
+        finally:
+            conn.close()
+
+    def load_job(self, job_id):
+        """(field, values, columns) of a job"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute('SELECT field, sweep_values, plants FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise ValueError(f"Unknown job: {job_id}")
+        return row[0], unpack_arrays(row[1])['values'], unpack_arrays(row[2])
+
+    def progress(self, job_id):
+        """Chunk counts per status"""
+        conn = self.get_connection()
+        try:
+            counts = dict(conn.execute(
+                'SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status', (job_id,)).fetchall())
+        finally:
+            conn.close()
+        return {status: counts.get(status, 0) for status in ('pending', 'leased', 'done', 'failed')}
+
+    def has_work(self):
+        """True while any chunk is pending or leased, including leases that may still expire"""
+        conn = self.get_connection()
+        try:
+            return conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM tasks WHERE status IN ('pending', 'leased'))").fetchone()[0] == 1
+        finally:
+            conn.close()
+
+    def wait(self, job_id, timeout=None, poll_interval=0.5):
+        """Block until no chunk of the job is pending or leased; returns the final progress"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            progress = self.progress(job_id)
+            if progress['pending'] == 0 and progress['leased'] == 0:
+                return progress
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Sweep job {job_id} not finished: {progress}")
+            time.sleep(poll_interval)
+
+    def collect(self, job_id):
+        """
+        Assemble the result blocks of a job into (plants, values) arrays.
+        Rows of failed or unfinished chunks are NaN. Also returns the values
+        and the (start, stop, error) of every failed chunk.
+        """
+        field, values, _ = self.load_job(job_id)
+        conn = self.get_connection()
+        try:
+            n = conn.execute('SELECT plant_count FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+            results = {name: np.full((n, len(values)), np.nan) for name in SWEEP_OUTPUTS}
+            failed = []
+            cursor = conn.execute('SELECT start, stop, status, result, error FROM tasks WHERE job_id = ?', (job_id,))
+            for start, stop, status, result, error in cursor:
+                if status == 'done':
+                    for name, block in unpack_arrays(result).items():
+                        results[name][start:stop] = block
+                elif status == 'failed':
+                    failed.append((start, stop, error))
+        finally:
+            conn.close()
+        results.update({'field': field, 'values': values, 'failed': failed})
+        return results
+
+
+def read_plants(path):
+    """
+    Plants to sweep from a CSV or JSONL file in the import format, validated
+    like an import. Returns (names, columns, errors) for the valid rows.
+    """
+    from gatec.core.importer import read_import_chunks, validate_chunk
+
+    names, blocks, errors = [], [], []
+    for lines, records, chunk_errors in read_import_chunks(path):
+        errors.extend(chunk_errors)
+        if not records:
+            continue
+        columns, valid, messages = validate_chunk(records)
+        for i, row_messages in messages.items():
+            errors.extend((lines[i], message) for message in row_messages)
+        rows = np.flatnonzero(valid)
+        names.extend(str(records[i].get('plant_location') or '') for i in rows)
+        blocks.append({name: column[rows] for name, column in columns.items()})
+    if not blocks:
+        return names, {}, errors
+    columns = {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+    return names, columns, errors
+
+
+def run_worker(path, worker=None, idle_exit=False, poll_interval=1.0, lease_seconds=60, max_attempts=3):
+    """
+    Worker loop: lease chunks, compute them with sweep_block and store the
+    results. With idle_exit the worker stops once no chunk is pending or
+    leased (so it stays to pick up leases of lost workers); otherwise it
+    keeps polling. Returns the number of chunks completed.
+    """
+    spool = Spool(path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    jobs = {}
+    completed = 0
+    while True:
+        task = spool.lease(worker)
+        if task is None:
+            if idle_exit and not spool.has_work():
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        job_id, chunk, start, stop = task
+        try:
+            if job_id not in jobs:
+                jobs[job_id] = spool.load_job(job_id)
+            field, values, columns = jobs[job_id]
+            block = sweep_block({name: column[start:stop] for name, column in columns.items()}, field, values)
+        except (ValueError, TypeError) as e:
+            spool.fail(worker, job_id, chunk, e)
+            continue
+        if spool.complete(worker, job_id, chunk, block):
+            completed += 1
+
+
+def start_local_workers(path, count, **kwargs):
+    """Start count worker processes on this machine, standing in for remote nodes"""
+    processes = []
+    for i in range(count):
+        process = Process(target=run_worker, args=(path,),
+                          kwargs=dict(kwargs, worker=f"{socket.gethostname()}-local-{i}"), daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def run_sweep(path, columns, field, values, workers=None, chunk_size=1000, timeout=None, resume=True):
+    """
+    Publish a sweep to the spool at path and wait for it. workers local
+    processes are started to help (default: CPU count; 0 relies on workers
+    started elsewhere with `gatec sweep-worker`). Rerunning an interrupted
+    sweep picks up its finished chunks unless resume is False.
+    Returns Spool.collect().
+    """
+    spool = Spool(path)
+    job_id = spool.submit_sweep(columns, field, values, chunk_size=chunk_size, resume=resume)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    processes = start_local_workers(path, workers, idle_exit=True)
+    try:
+        spool.wait(job_id, timeout=timeout)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+    return spool.collect(job_id)
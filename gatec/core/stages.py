@@ -0,0 +1,143 @@
+import numpy as np
+
+from gatec.core.data_manager import load_data
+
+# Built-in lifecycle stages in display order. The group decides how a stage
+# takes part in the calculation:
+#   fuel       - fuel chain energy, scaled by the general sensitivity
+#   generation - plant generation, never scaled
+#   ccs        - only counted when CCS is enabled, scaled by both sensitivities
+# fields are the input fields summed (times weight) into the stage energy;
+# input_label marks fuel stages that get an entry on the input screen.
+# A stage's CO2 comes from the upstream factor (fuel stages) or the fuel's
+# combustion factor (generation, CCS) unless it sets its own emission_factor
+# in kg CO2/MWh.
+DEFAULT_STAGES = [
+    {'key': 'extraction', 'label': "Extraction", 'group': 'fuel',
+     'fields': ['extraction'], 'input_label': "Extraction consumption"},
+    {'key': 'processing', 'label': "Processing", 'group': 'fuel',
+     'fields': ['processing'], 'input_label': "Processing consumption"},
+    {'key': 'transportation', 'label': "Transportation", 'group': 'fuel',
+     'fields': ['transportation'], 'input_label': "Transportation consumption"},
+    {'key': 'generation', 'label': "Generation", 'group': 'generation',
+     'fields': ['generation'], 'chart': False},
+    {'key': 'ccs', 'label': "CCS", 'group': 'ccs',
+     'fields': ['ccs_capture', 'ccs_compression', 'ccs_transportation', 'ccs_storage']},
+]
+
+GROUPS = ['fuel', 'generation', 'ccs']
+
+
+def load_stages():
+    """
+    Built-in stages plus any extra ones listed under "stages" in data.json,
+    e.g. {"key": "water_treatment", "label": "Water treatment", "group": "fuel"}.
+    An extra stage reads the input field named after its key unless it
+    lists its own fields. Stages are ordered by group.
+    """
+    stages = [dict(stage) for stage in DEFAULT_STAGES]
+    known = {stage['key'] for stage in stages}
+    for extra in load_data().get('stages', []):
+        if extra.get('key') in known or extra.get('group', 'fuel') not in GROUPS:
+            print(f"Ignoring invalid stage definition: {extra}")
+            continue
+        stage = {'group': 'fuel', 'fields': [extra['key']], 'label': extra['key'].replace('_', ' ').capitalize()}
+        stage.update(extra)
+        if stage['group'] == 'fuel':
+            stage.setdefault('input_label', f"{stage['label']} consumption")
+        stages.append(stage)
+        known.add(stage['key'])
+    return sorted(stages, key=lambda stage: GROUPS.index(stage['group']))
+
+
+class StageModel:
+    """
+    Stage registry compiled for the calculators.
+
+    Energy inputs are laid out as one vector over all stage fields; the
+    stage matrix maps it to per-stage energy, and the coefficient matrix
+    gives total, CCS and sensitivity-scaled energy in a single product.
+    """
+    def __init__(self, stages):
+        self.stages = stages
+        self.keys = [stage['key'] for stage in stages]
+        self.fields = [field for stage in stages for field in stage['fields']]
+        self.generation_index = self.fields.index('generation')
+
+        self.stage_matrix = np.zeros((len(stages), len(self.fields)))
+        groups = []
+        column = 0
+        for row, stage in enumerate(stages):
+            for _ in stage['fields']:
+                self.stage_matrix[row, column] = float(stage.get('weight', 1.0))
+                groups.append(stage['group'])
+                column += 1
+        groups = np.array(groups)
+
+        # Per-stage emission settings: plant stages burn the fuel (and are captured by CCS)
+        self.combustion_stages = np.array([stage['group'] != 'fuel' for stage in stages])
+        self.emission_factors = np.array([float(stage.get('emission_factor', np.nan)) for stage in stages])
+
+        weights = self.stage_matrix.sum(axis=0)
+        self.ccs_mask = groups == 'ccs'
+        # Columns: total energy, CCS energy, energy scaled by the general sensitivity
+        self.coefficients = np.column_stack([
+            weights,
+            np.where(self.ccs_mask, weights, 0.0),
+            np.where(groups != 'generation', weights, 0.0),
+        ])
+
+    def weight(self, field):
+        """Energy per unit of an input field"""
+        return float(self.stage_matrix[:, self.fields.index(field)].sum())
+
+    def field_label(self, field):
+        """Display name of an input field: its stage label, plus the field when the stage has several"""
+        for stage in self.stages:
+            if field in stage['fields']:
+                if len(stage['fields']) == 1:
+                    return stage['label']
+                return f"{stage['label']} ({field.replace('_', ' ')})"
+        return field.replace('_', ' ').capitalize()
+
+    def fields_in(self, group):
+        return [field for stage in self.stages if stage['group'] == group for field in stage['fields']]
+
+    def input_stages(self):
+        """Stages with an entry on the input screen"""
+        return [stage for stage in self.stages if stage.get('input_label')]
+
+    def chart_stages(self):
+        """Stages shown in the energy breakdown chart"""
+        return [stage for stage in self.stages if stage.get('chart', True)]
+
+    def emissions(self, stage_energy, total_output, combustion_factor, upstream_factor, capture_rate, ccs_enabled):
+        """
+        Lifecycle CO2 per stage for an (n, stages) energy matrix, in kg per
+        MWh of output. Fuel stages emit at the upstream factor and plant
+        stages at the combustion factor, less the captured fraction when CCS
+        is on. Returns (stage_emissions, captured_emissions).
+        """
+        factors = np.where(self.combustion_stages, combustion_factor[:, None], upstream_factor[:, None])
+        factors = np.where(np.isnan(self.emission_factors), factors, self.emission_factors)
+        gross = stage_energy * factors
+
+        capture = np.where(ccs_enabled, np.clip(capture_rate, 0.0, 1.0), 0.0)
+        captured = gross * (capture[:, None] * self.combustion_stages)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_output = np.where(total_output > 0, 1 / total_output, 0.0)
+        return (gross - captured) * per_output[:, None], captured.sum(axis=1) * per_output
+
+    def input_vector(self, input_data, generation, ccs_enabled):
+        """Energy inputs of one scenario in field order; CCS fields are zero when CCS is off"""
+        vector = np.array([
+            float(input_data.get(field, 0)) if ccs_enabled or not is_ccs else 0.0
+            for field, is_ccs in zip(self.fields, self.ccs_mask)
+        ])
+        vector[self.generation_index] = generation
+        return vector
+
+
+# Compiled once at import; the calculators only do matrix products with it
+stage_model = StageModel(load_stages())
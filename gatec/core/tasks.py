@@ -0,0 +1,151 @@
+import multiprocessing
+import queue
+import threading
+
+import numpy as np
+
+from gatec.core.batch import calculate_sweep
+
+
+class TaskCancelled(Exception):
+    """Raised inside a job by TaskContext.check once cancellation was requested"""
+
+
+class TaskContext:
+    """
+    Handed to a job as its first argument: report progress, send partial
+    results and check for cancellation. Works the same in a thread or a
+    worker process.
+    """
+    def __init__(self, events, cancel_event):
+        self._events = events
+        self._cancel = cancel_event
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+    def progress(self, done, total=None, message=None):
+        self._events.put(('progress', (done, total, message)))
+
+    def partial(self, data):
+        self._events.put(('partial', data))
+
+
+def _run_job(fn, args, kwargs, events, cancel_event):
+    context = TaskContext(events, cancel_event)
+    try:
+        result = fn(context, *args, **kwargs)
+    except TaskCancelled:
+        events.put(('cancelled', None))
+        return
+    except Exception as e:
+        events.put(('error', f"{type(e).__name__}: {e}"))
+        return
+    # A job that returns early on cancelled() still counts as cancelled
+    events.put(('cancelled', result) if cancel_event.is_set() else ('done', result))
+
+
+class Task:
+    """
+    One background job: fn(context, *args, **kwargs) runs in a daemon thread,
+    or in a worker process when process is True (fn and its arguments must
+    then be picklable; the process is spawned, never forked, so it does not
+    inherit the GUI's threads and locks). Events are collected by poll() from the caller's
+    thread, so a GUI can drain them from its main loop.
+    """
+    FINAL_STATES = ('done', 'error', 'cancelled')
+
+    def __init__(self, fn, args=(), kwargs=None, process=False):
+        self.process = process
+        if process:
+            context = multiprocessing.get_context('spawn')
+            self.events = context.Queue()
+            self.cancel_event = context.Event()
+            worker_class = context.Process
+        else:
+            self.events = queue.Queue()
+            self.cancel_event = threading.Event()
+            worker_class = threading.Thread
+        self.worker = worker_class(target=_run_job, args=(fn, args, kwargs or {}, self.events, self.cancel_event),
+                                   daemon=True)
+        self.state = 'pending'
+        self.terminated = False
+        self.result = None
+        self.error = None
+        self.progress = (0, None, None)
+
+    @property
+    def finished(self):
+        return self.state in self.FINAL_STATES
+
+    def start(self):
+        self.worker.start()
+        self.state = 'running'
+        return self
+
+    def cancel(self):
+        """Ask the job to stop at its next check(); its partial results so far stay valid"""
+        self.cancel_event.set()
+
+    def terminate(self):
+        """
+        Stop a worker process that does not react to cancel(). The next
+        poll() ends with a cancelled event, after whatever the worker sent.
+        """
+        if self.process and self.worker.is_alive():
+            self.cancel_event.set()
+            self.terminated = True
+            self.worker.terminate()
+            self.worker.join()
+
+    def poll(self, max_events=200):
+        """
+        Collect up to max_events pending events without blocking, as a list
+        of (kind, data) with kind progress, partial, done, error or
+        cancelled, and update state, result, error and progress.
+        """
+        collected = []
+        while len(collected) < max_events and not self.finished:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                if self.state == 'running' and not self.worker.is_alive():
+                    # The worker is gone: take what it flushed last, else report it
+                    # cancelled (terminated) or lost
+                    try:
+                        event = self.events.get(timeout=0.1)
+                    except queue.Empty:
+                        event = ('cancelled', None) if self.terminated else ('error', "Worker exited unexpectedly")
+                else:
+                    break
+            kind, data = event
+            if kind == 'progress':
+                self.progress = data
+            elif kind == 'done':
+                self.state, self.result = 'done', data
+            elif kind == 'cancelled':
+                self.state, self.result = 'cancelled', data
+            elif kind == 'error':
+                self.state, self.error = 'error', data
+            collected.append(event)
+        return collected
+
+
+def sweep_task(task, input_data, field, start, stop, points, chunk_size=20000):
+    """
+    Job: evaluate input_data with field at points values from start to stop,
+    chunk by chunk. Each chunk is sent as a partial (offset, values,
+    total_efficiency, total_emissions). Returns the number of points done.
+    """
+    values = np.linspace(start, stop, int(points))
+    for offset in range(0, len(values), chunk_size):
+        task.check()
+        chunk = values[offset:offset + chunk_size]
+        results = calculate_sweep(input_data, field, chunk)
+        task.partial((offset, chunk, results['total_efficiency'], results['total_emissions']))
+        task.progress(offset + len(chunk), len(values))
+    return len(values)
@@ -0,0 +1,229 @@
+import csv
+
+import numpy as np
+
+from gatec.core.batch import calculate_batch
+
+# Accepted CSV header names for each operating column
+COLUMN_ALIASES = {
+    'total_output': ('total_output', 'output'),
+    'plant_efficiency': ('plant_efficiency', 'efficiency'),
+    'ccs': ('ccs', 'ccs_on'),
+}
+
+TRUE_VALUES = ('1', '1.0', 'true', 'yes', 'on')
+
+# Per-interval arrays returned by TimeSeriesCalculator.process
+SERIES_OUTPUTS = ('total_efficiency', 'efficiency_drop', 'total_emissions', 'rolling_efficiency', 'rolling_emissions')
+
+
+def read_timeseries_chunks(path, chunk_size=8760):
+    """
+    Read an operating-data CSV in chunks of chunk_size rows.
+    Yields dicts with total_output, plant_efficiency and ccs arrays, so only
+    one chunk is held in memory at a time. Blank numbers mean the plant was
+    offline; rows with invalid or non-finite numbers are left out and listed
+    under 'errors' as (line, message).
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader)]
+
+        indexes = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in header:
+                    indexes[field] = header.index(alias)
+                    break
+        if 'total_output' not in indexes or 'plant_efficiency' not in indexes:
+            raise ValueError("Time series needs output and efficiency columns")
+
+        lines, rows = [], []
+        # line_num counts physical lines, so this is the line the row started on
+        line = reader.line_num + 1
+        for row in reader:
+            if row:
+                lines.append(line)
+                rows.append(row)
+            line = reader.line_num + 1
+            if len(rows) == chunk_size:
+                yield _rows_to_chunk(lines, rows, indexes)
+                lines, rows = [], []
+        if rows:
+            yield _rows_to_chunk(lines, rows, indexes)
+
+
+def _rows_to_chunk(lines, rows, indexes):
+    # A missing ccs cell reads as off; output and efficiency must be there
+    width = max(indexes['total_output'], indexes['plant_efficiency']) + 1
+    short = np.array([len(row) < width for row in rows])
+    full = max(indexes.values()) + 1
+    rows = [row if len(row) >= full else row + [''] * (full - len(row)) for row in rows]
+
+    output, bad_output = _parse_numbers([row[indexes['total_output']] for row in rows])
+    efficiency, bad_efficiency = _parse_numbers([row[indexes['plant_efficiency']] for row in rows])
+    problems = [(short, "Missing columns"), (bad_output, "Invalid output value"),
+                (bad_efficiency, "Invalid efficiency value")]
+    rejected = short | bad_output | bad_efficiency
+    keep = ~rejected
+
+    chunk = {
+        'total_output': output[keep],
+        'plant_efficiency': efficiency[keep],
+        'errors': [(lines[i], message) for i in np.flatnonzero(rejected) for mask, message in problems if mask[i]],
+    }
+    if 'ccs' in indexes:
+        flags = np.char.lower(np.char.strip(np.array([row[indexes['ccs']] for row in rows], dtype=str)))
+        chunk['ccs'] = np.isin(flags, TRUE_VALUES)[keep]
+    return chunk
+
+
+def _parse_numbers(values):
+    """
+    Convert strings to floats; blanks count as zero (plant offline).
+    Returns (numbers, invalid) where invalid marks unparseable or non-finite entries.
+    """
+    raw = np.char.strip(np.array(values, dtype=str))
+    blank = raw == ''
+    numbers = np.zeros(len(raw))
+    invalid = np.zeros(len(raw), dtype=bool)
+    try:
+        numbers[~blank] = raw[~blank].astype(float)
+    except ValueError:
+        for i in np.flatnonzero(~blank):
+            try:
+                numbers[i] = float(raw[i])
+            except ValueError:
+                invalid[i] = True
+    invalid |= ~np.isfinite(numbers)
+    numbers[invalid] = 0.0
+    return numbers, invalid
+
+
+def _array_chunks(source, chunk_size):
+    n = len(source['total_output'])
+    for start in range(0, n, chunk_size):
+        yield {field: np.asarray(values)[start:start + chunk_size] for field, values in source.items()}
+
+
+class TimeSeriesCalculator:
+    """
+    Streaming evaluation of a plant over a sequence of operating intervals.
+
+    The plant dict carries the static inputs (stage consumptions, CCS
+    components, emissions value); each chunk supplies per-interval output,
+    plant efficiency and CCS on/off. Only the last window of intervals is
+    carried between chunks.
+    """
+    def __init__(self, plant, window_hours=24, step_hours=1.0):
+        self.plant = {k: v for k, v in plant.items() if k != 'generation'}
+        self.step_hours = float(step_hours)
+        self.window = max(1, int(round(window_hours / self.step_hours)))
+
+        self.errors = []
+
+        self._tail_output = np.zeros(0)
+        self._tail_energy = np.zeros(0)
+        self._tail_emissions = np.zeros(0)
+
+        self.intervals = 0
+        self.ccs_intervals = 0
+        self._output_sum = 0.0
+        self._energy_sum = 0.0
+        self._plant_efficiency_sum = 0.0
+        self._emissions_sum = 0.0
+
+    def process(self, chunk):
+        """Evaluate one chunk and return per-interval and rolling results"""
+        self.errors.extend(chunk.get('errors', []))
+        output = np.asarray(chunk['total_output'], dtype=float)
+        columns = dict(self.plant)
+        columns['total_output'] = output
+        columns['plant_efficiency'] = np.asarray(chunk['plant_efficiency'], dtype=float)
+        if 'ccs' in chunk:
+            columns['ccs'] = np.asarray(chunk['ccs'], dtype=bool)
+        ccs = np.broadcast_to(np.asarray(columns.get('ccs', False), dtype=bool), output.shape)
+
+        batch = calculate_batch(columns, sensitivity=False)
+        # Offline intervals (no output) consume nothing
+        energy = np.where(output > 0, batch['total_energy'], 0.0)
+        emissions = output * batch['total_emissions']
+
+        rolling_output = self._rolling(self._tail_output, output)
+        rolling_energy = self._rolling(self._tail_energy, energy)
+        rolling_emissions = self._rolling(self._tail_emissions, emissions)
+
+        self._tail_output = self._keep_tail(self._tail_output, output)
+        self._tail_energy = self._keep_tail(self._tail_energy, energy)
+        self._tail_emissions = self._keep_tail(self._tail_emissions, emissions)
+
+        self.intervals += len(output)
+        self.ccs_intervals += int(ccs[output > 0].sum())
+        self._output_sum += output.sum()
+        self._energy_sum += energy.sum()
+        self._plant_efficiency_sum += (output * columns['plant_efficiency']).sum()
+        self._emissions_sum += emissions.sum()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rolling_efficiency = np.where(rolling_energy > 0, rolling_output / rolling_energy * 100, 0.0)
+            rolling_intensity = np.where(rolling_output > 0, rolling_emissions / rolling_output, 0.0)
+
+        return {
+            'total_efficiency': batch['total_efficiency'],
+            'efficiency_drop': batch['efficiency_drop'],
+            'total_emissions': batch['total_emissions'],
+            'rolling_efficiency': rolling_efficiency,
+            'rolling_emissions': rolling_intensity,
+        }
+
+    def _rolling(self, tail, values):
+        """Window sums ending at each value, using the tail carried from the previous chunk"""
+        joined = np.concatenate([tail, values])
+        cumulative = np.concatenate([[0.0], np.cumsum(joined)])
+        end = np.arange(len(tail), len(joined)) + 1
+        start = np.maximum(end - self.window, 0)
+        return cumulative[end] - cumulative[start]
+
+    def _keep_tail(self, tail, values):
+        """Keep the last window - 1 values for the next chunk"""
+        if self.window == 1:
+            return np.zeros(0)
+        return np.concatenate([tail, values])[-(self.window - 1):]
+
+    def summary(self):
+        """Annual (whole-series) figures"""
+        total_efficiency = float(self._output_sum / self._energy_sum * 100) if self._energy_sum > 0 else 0.0
+        plant_efficiency = float(self._plant_efficiency_sum / self._output_sum) if self._output_sum > 0 else 0.0
+        return {
+            'intervals': self.intervals,
+            'rejected': len({line for line, _ in self.errors}),
+            'hours': self.intervals * self.step_hours,
+            'ccs_hours': self.ccs_intervals * self.step_hours,
+            'energy_output': float(self._output_sum * self.step_hours),
+            'total_efficiency': total_efficiency,
+            'plant_efficiency': plant_efficiency,
+            'efficiency_drop': max(0.0, plant_efficiency - total_efficiency),
+            # Output-weighted intensity (kg CO2/MWh) and total over the series (kg CO2)
+            'total_emissions': float(self._emissions_sum / self._output_sum) if self._output_sum > 0 else 0.0,
+            'emissions_mass': float(self._emissions_sum * self.step_hours),
+        }
+
+
+def stream_timeseries(source, plant, window_hours=24, step_hours=1.0, chunk_size=8760):
+    """
+    Stream a time series through a TimeSeriesCalculator.
+    source is a CSV path or a dict of arrays. Yields (calculator, chunk_results)
+    so callers can read calculator.summary() once the stream is exhausted.
+    """
+    calculator = TimeSeriesCalculator(plant, window_hours=window_hours, step_hours=step_hours)
+    chunks = read_timeseries_chunks(source, chunk_size) if isinstance(source, str) else _array_chunks(source, chunk_size)
+    for chunk in chunks:
+        yield calculator, calculator.process(chunk)
+
+
+def summarize_timeseries(source, plant, window_hours=24, step_hours=1.0, chunk_size=8760):
+    """Run a whole time series and return only the annual summary"""
+    calculator = None
+    for calculator, _ in stream_timeseries(source, plant, window_hours, step_hours, chunk_size):
+        pass
+    return calculator.summary() if calculator else TimeSeriesCalculator(plant).summary()
@@ -1,15 +1,22 @@
 import tkinter as tk
 import ttkbootstrap as ttk
-from gatec.gui.frames import HomeScreen, InputScreen, ResultScreen, HistoryScreen
+from gatec.core.data_manager import get_retention_policy
+from gatec.core.db_manager import db
+from gatec.gui.frames import HomeScreen, InputScreen, GridInputScreen, ResultScreen, HistoryScreen, ComparisonScreen
 
 class App(ttk.Window):
+    CHANGE_POLL_MS = 1000
+
     def __init__(self):
         super().__init__(themename='flatly')
         self.title("Total Efficiency Computation")
         self.system_font = "Roboto"
         
-        # Maximize window
-        self.state('zoomed')
+        # Maximize window ('zoomed' is Windows/macOS only; X11 uses the attribute)
+        try:
+            self.state('zoomed')
+        except tk.TclError:
+            self.attributes('-zoomed', True)
 
         # Contenedor principal para las pantallas
         self.container = tk.Frame(self)
@@ -22,7 +29,7 @@ class App(ttk.Window):
 
         # Initialize frames
         self.frames = {}
-        for FrameClass in (HomeScreen, InputScreen, ResultScreen, HistoryScreen):
+        for FrameClass in (HomeScreen, InputScreen, GridInputScreen, ResultScreen, HistoryScreen, ComparisonScreen):
             frame = FrameClass(self.container, self)
             self.frames[FrameClass] = frame  # Store with class as key, not class name
             frame.grid(row=0, column=0, sticky="nsew")
@@ -30,6 +37,9 @@ class App(ttk.Window):
         # Show home screen
         self.show_frame(HomeScreen)
 
+        # Watch the history database for writes from this or other processes
+        self.after(self.CHANGE_POLL_MS, self.poll_db_changes)
+
     def show_frame(self, frame_class):
         """Display a specific frame"""
         # Call lifecycle methods
@@ -37,13 +47,26 @@ class App(ttk.Window):
             self.current_frame.on_hide()
             
         frame = self.frames[frame_class]
-        
-        # Reset input screen if we're navigating to it
-        if frame_class == InputScreen:
-            frame.reset_form()
-            
         frame.tkraise()
         frame.on_show()
         self.current_frame = frame
         
         return frame
+
+    def poll_db_changes(self):
+        """Notify subscribed screens of new database writes"""
+        db.poll_changes()
+        self.after(self.CHANGE_POLL_MS, self.poll_db_changes)
+
+
+def run():
+    """Launch the desktop application"""
+    # Apply the configured retention policy behind the UI; history screens refresh when rows go
+    policy = get_retention_policy()
+    if policy['max_age_days'] is not None or policy['max_rows'] is not None:
+        db.start_retention(**policy)
+
+    # Data backfills of new schema versions run in small chunks behind the UI
+    db.start_backfills()
+    app = App()
+    app.mainloop()
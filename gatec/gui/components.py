@@ -1,5 +1,8 @@
+import tkinter as tk
 import ttkbootstrap as ttk
 
+import numpy as np
+
 class Card(ttk.Frame):
     def __init__(self, parent, controller, title, fuel, efficiency_drop, total_efficiency, on_click=None, width=None, height=None, item_width=15):
         super().__init__(parent, relief="solid", padding=(10,10))
@@ -55,3 +58,130 @@ class Card(ttk.Frame):
         # Configure grid weights
         self.column_frame.grid_columnconfigure(0, weight=1)
         self.column_frame.grid_columnconfigure(1, weight=0) # 0 weight for fixed width part
+
+
+# Viridis-like colour ramp from low to high values
+HEATMAP_COLORS = np.array([
+    (68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)
+], dtype=float)
+HEATMAP_LUT = np.column_stack([
+    np.interp(np.linspace(0, 1, 256), np.linspace(0, 1, len(HEATMAP_COLORS)), HEATMAP_COLORS[:, channel])
+    for channel in range(3)
+]).astype(np.uint8)
+
+
+# Cells without a finite value (e.g. NaN from a failed evaluation)
+HEATMAP_MISSING = np.array([200, 200, 200], dtype=np.uint8)
+
+
+def value_range(grid):
+    """(vmin, vmax) over the finite values of grid; (0.0, 0.0) when there are none"""
+    finite = grid[np.isfinite(grid)]
+    if finite.size == 0:
+        return 0.0, 0.0
+    return float(finite.min()), float(finite.max())
+
+
+def heatmap_ppm(grid, width, height, vmin, vmax):
+    """
+    Binary PPM of grid resampled (nearest neighbour) to width x height
+    pixels, first row at the bottom, coloured through HEATMAP_LUT.
+    Non-finite cells are drawn in HEATMAP_MISSING.
+    """
+    rows = (np.arange(height)[::-1] * grid.shape[0] // height)
+    cols = (np.arange(width) * grid.shape[1] // width)
+    values = grid[rows[:, None], cols[None, :]]
+    missing = ~np.isfinite(values)
+    span = vmax - vmin if np.isfinite(vmax - vmin) and vmax > vmin else 1.0
+    scaled = np.nan_to_num((values - vmin) / span, nan=0.0, posinf=1.0, neginf=0.0)
+    pixels = HEATMAP_LUT[np.clip(scaled * 255, 0, 255).astype(np.uint8)]
+    pixels[missing] = HEATMAP_MISSING
+    return f"P6 {width} {height} 255\n".encode() + pixels.tobytes()
+
+
+class Heatmap(tk.Canvas):
+    """
+    Raster heatmap of a 2D array on a canvas: the cells are one PhotoImage
+    rather than canvas items, with axis labels, a colorbar and a hover
+    readout, so large grids redraw quickly.
+    """
+    PAD_LEFT = 70
+    PAD_RIGHT = 90
+    PAD_TOP = 20
+    PAD_BOTTOM = 50
+
+    def __init__(self, parent, x_label, y_label, value_label, **kwargs):
+        super().__init__(parent, bg="white", highlightthickness=0, **kwargs)
+        self.x_label = x_label
+        self.y_label = y_label
+        self.value_label = value_label
+        self.grid_values = None
+        self.x_values = None
+        self.y_values = None
+        self.image = None
+        self.colorbar = None
+        self.plot_box = None
+        self.hover_text = None
+        self.bind("<Configure>", lambda e: self.redraw())
+        self.bind("<Motion>", self.on_hover)
+        self.bind("<Leave>", lambda e: self.itemconfig(self.hover_text, text="") if self.hover_text else None)
+
+    def set_data(self, grid, x_values, y_values):
+        """grid has one row per y value and one column per x value"""
+        self.grid_values = np.asarray(grid, dtype=float)
+        self.x_values = np.asarray(x_values, dtype=float)
+        self.y_values = np.asarray(y_values, dtype=float)
+        self.redraw()
+
+    def redraw(self):
+        self.delete("all")
+        self.hover_text = None
+        width = self.winfo_width()
+        height = self.winfo_height()
+        plot_w = width - self.PAD_LEFT - self.PAD_RIGHT
+        plot_h = height - self.PAD_TOP - self.PAD_BOTTOM
+        if self.grid_values is None or plot_w < 10 or plot_h < 10:
+            self.plot_box = None
+            return
+
+        x0, y0 = self.PAD_LEFT, self.PAD_TOP
+        vmin, vmax = value_range(self.grid_values)
+        self.image = tk.PhotoImage(data=heatmap_ppm(self.grid_values, plot_w, plot_h, vmin, vmax), format='PPM')
+        self.create_image(x0, y0, image=self.image, anchor="nw")
+        self.plot_box = (x0, y0, plot_w, plot_h)
+
+        # Axes: first, middle and last value of each factor
+        for fraction in (0.0, 0.5, 1.0):
+            x_value = self.x_values[int(round(fraction * (len(self.x_values) - 1)))]
+            y_value = self.y_values[int(round(fraction * (len(self.y_values) - 1)))]
+            self.create_text(x0 + fraction * plot_w, y0 + plot_h + 12, text=f"{x_value:g}%", font=("Arial", 8))
+            self.create_text(x0 - 6, y0 + (1 - fraction) * plot_h, text=f"{y_value:g}%", anchor="e",
+                             font=("Arial", 8))
+        self.create_text(x0 + plot_w / 2, y0 + plot_h + 32, text=self.x_label, font=("Arial", 9, "bold"))
+        self.create_text(18, y0 + plot_h / 2, text=self.y_label, angle=90, font=("Arial", 9, "bold"))
+
+        # Colorbar
+        bar_x = x0 + plot_w + 15
+        ramp = np.linspace(vmin, vmax, plot_h)[:, None]
+        self.colorbar = tk.PhotoImage(data=heatmap_ppm(ramp, 16, plot_h, vmin, vmax), format='PPM')
+        self.create_image(bar_x, y0, image=self.colorbar, anchor="nw")
+        for fraction in (0.0, 0.5, 1.0):
+            self.create_text(bar_x + 20, y0 + (1 - fraction) * plot_h, anchor="w", font=("Arial", 8),
+                             text=f"{vmin + fraction * (vmax - vmin):.2f}")
+
+        self.hover_text = self.create_text(x0 + plot_w, 4, anchor="ne", text="", font=("Arial", 9))
+
+    def on_hover(self, event):
+        if self.plot_box is None or self.hover_text is None:
+            return
+        x0, y0, plot_w, plot_h = self.plot_box
+        if not (x0 <= event.x < x0 + plot_w and y0 <= event.y < y0 + plot_h):
+            self.itemconfig(self.hover_text, text="")
+            return
+        col = int((event.x - x0) * len(self.x_values) // plot_w)
+        row = int((y0 + plot_h - 1 - event.y) * len(self.y_values) // plot_h)
+        value = self.grid_values[row, col]
+        self.itemconfig(self.hover_text, text=(
+            f"{self.x_label} {self.x_values[col]:.1f}%, {self.y_label} {self.y_values[row]:.1f}%: "
+            f"{self.value_label} " + (f"{value:.2f}%" if np.isfinite(value) else "n/a")
+        ))
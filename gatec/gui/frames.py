@@ -3,11 +3,38 @@ import ttkbootstrap as ttk
 from ttkbootstrap.tableview import Tableview
 from ttkbootstrap.constants import *
 from tkinter import StringVar, BooleanVar, DoubleVar
+import time
+from datetime import datetime
 
-from gatec.gui.components import Card
+import numpy as np
+
+from gatec.gui.components import Card, Heatmap
 from gatec.core.data_manager import load_data
 from gatec.core.calculator import calculate_generation, calculate_results
-from gatec.core.db_manager import db
+from gatec.core.db_manager import db, calculation_row
+from gatec.core.reference_data import catalog, VALUE_FIELDS
+from gatec.core.blending import parse_blend, blend_label, resolve_blend
+from gatec.core.stages import stage_model
+from gatec.core.goal_seek import solve, METRICS, SOLVABLE_FIELDS
+from gatec.core.comparison import compare_scenarios
+from gatec.core.reports import render_report, render_calculation, REPORT_FORMATS
+from gatec.core.session import InputSession
+from gatec.core.importer import PASTE_COLUMNS, TEXT_FIELDS, parse_table, evaluate_records
+from gatec.core.batch import row_results, legacy_emissions
+from gatec.core.sensitivity import sensitivity_surface, surface_axis, MAX_RESOLUTION
+from gatec.core.tasks import sweep_task
+from gatec.gui.tasks import TaskRunner
+
+_report_pool = None
+
+
+def get_report_pool():
+    """Worker processes for report rendering, started on first use"""
+    global _report_pool
+    if _report_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _report_pool = ProcessPoolExecutor()
+    return _report_pool
 
 class FrameManager(ttk.Frame):
     """Base class for all frames with common functionality"""
@@ -57,23 +84,31 @@ class HomeScreen(FrameManager):
         parent.grid_columnconfigure(0, weight=1)
 
         self.cards = []
+
+        # Cards are rebuilt only after the history changed
+        self.stale = True
+        db.subscribe(self.on_db_change)
     
     def on_show(self):
-        """Reload cards when screen is shown"""
-        self.load_cards()
+        """Reload cards when screen is shown and the history changed"""
+        if self.stale:
+            self.load_cards()
+
+    def on_db_change(self, changes):
+        self.stale = True
+        if self.controller.current_frame is self:
+            self.load_cards()
 
     def load_cards(self):
         # Clear existing cards
         for card in self.cards:
             card.destroy()
         self.cards = []
+        self.stale = False
 
-        # Fetch history from DB
-        history = db.get_history()
-
-        # Limit to a maximum of 8 cards
+        # Fetch history from DB, limited to a maximum of 8 cards
         max_cards = 8
-        history = history[:max_cards]
+        history = db.get_history(limit=max_cards)
         
         # Calculate max char width based on content
         # We look at both the fuel types AND the word "View" (or a minimum safe width)
@@ -149,6 +184,7 @@ class InputScreen(FrameManager):
         # Load predefined values
         self.data_store = load_data()
         self.predefined_values = self.data_store.get('predefined_values', {})
+        self.catalog = catalog
 
         # Variables for storing input values
         self.plant_efficiency = tk.DoubleVar()
@@ -157,6 +193,10 @@ class InputScreen(FrameManager):
         self.total_output.trace_add('write', lambda *args: self.calculate_from_inputs())
         self.plant_location = StringVar()
         self.fuel_type = StringVar()
+        self.blend = StringVar()
+        self.region = StringVar()
+        self.route = StringVar()
+        self.year = StringVar()
         self.extraction = tk.DoubleVar()
         self.processing = tk.DoubleVar()
         self.transportation = tk.DoubleVar()
@@ -166,18 +206,33 @@ class InputScreen(FrameManager):
         self.ccs = BooleanVar()
         self.include_emissions = BooleanVar()
         self.emissions_value = tk.DoubleVar()
+        self.upstream_emissions = tk.DoubleVar()
+        self.ccs_capture_rate = tk.DoubleVar(value=0.9)
         self.sensitivity_value = tk.StringVar()
         self.ccs_sensitivity_value = tk.StringVar()
         
         # Variable to track if using predefined values
         self.use_predefined = BooleanVar(value=True)
 
+        # Snapshots of every run, for undo/redo
+        self.session = InputSession()
+
         # Add CCS variables
         self.use_predefined_ccs = BooleanVar(value=True)
         self.ccs_capture = tk.DoubleVar()
         self.ccs_compression = tk.DoubleVar()
         self.ccs_transportation = tk.DoubleVar()
         self.ccs_storage = tk.DoubleVar()
+
+        # Fuel-chain stage inputs from the stage registry; extra stages get their own variables
+        self.stage_vars = {
+            'extraction': self.extraction,
+            'processing': self.processing,
+            'transportation': self.transportation,
+        }
+        for stage in stage_model.input_stages():
+            for field in stage['fields']:
+                self.stage_vars.setdefault(field, tk.DoubleVar())
         
         # Power Plant Information Frame
         power_plant_frame = ttk.LabelFrame(self.main_frame, text="Power Plant Information")
@@ -226,12 +281,36 @@ class InputScreen(FrameManager):
         fuel_select_frame.pack(fill="x", padx=5)
         
         tk.Label(fuel_select_frame, text="Select Fuel").pack(side="left")
-        fuel_options = list(self.predefined_values.keys())
+        fuel_options = self.catalog.fuels()
         fuel_dropdown = ttk.Combobox(fuel_select_frame,
                                     values=fuel_options,
                                     textvariable=self.fuel_type,
                                     bootstyle='primary')
         fuel_dropdown.pack(side="left", padx=5, pady=5)
+
+        # Region, supply route and year select the reference data entry
+        tk.Label(fuel_select_frame, text="Region").pack(side="left")
+        self.region_dropdown = ttk.Combobox(fuel_select_frame,
+                                           values=self.catalog.regions(),
+                                           textvariable=self.region,
+                                           width=12)
+        self.region_dropdown.pack(side="left", padx=5, pady=5)
+
+        tk.Label(fuel_select_frame, text="Route").pack(side="left")
+        self.route_dropdown = ttk.Combobox(fuel_select_frame,
+                                          values=self.catalog.routes(),
+                                          textvariable=self.route,
+                                          width=12)
+        self.route_dropdown.pack(side="left", padx=5, pady=5)
+
+        tk.Label(fuel_select_frame, text="Year").pack(side="left")
+        year_entry = ttk.Entry(fuel_select_frame, textvariable=self.year, width=6)
+        year_entry.pack(side="left", padx=5, pady=5)
+
+        # Co-firing: fuel shares such as "Coal 80%, Biomass 20%" replace the single fuel
+        tk.Label(fuel_select_frame, text="Blend").pack(side="left")
+        blend_entry = ttk.Entry(fuel_select_frame, textvariable=self.blend, width=24)
+        blend_entry.pack(side="left", padx=5, pady=5)
         
         # Add predefined values toggle
         ttk.Checkbutton(fuel_select_frame, text="Use predefined values", 
@@ -239,13 +318,14 @@ class InputScreen(FrameManager):
                        command=self.toggle_input_fields,
                        bootstyle='round-toggle').pack(side="right")
 
-        # Consumption inputs
+        # Consumption inputs, one per fuel-chain stage field
         self.consumption_entries = []
+        self.stage_entries = []
         
         consumption_fields = [
-            ("Extraction consumption", self.extraction),
-            ("Processing consumption", self.processing),
-            ("Transportation consumption", self.transportation)
+            (stage['input_label'] if len(stage['fields']) == 1 else f"{stage['input_label']} ({field})", field)
+            for stage in stage_model.input_stages()
+            for field in stage['fields']
         ]
         
         left_column = tk.Frame(fuel_prelim_frame)
@@ -254,15 +334,19 @@ class InputScreen(FrameManager):
         right_column.pack(side="left", fill="both", expand=True)
 
         columns = [left_column, right_column]
-        for i, (label_text, variable) in enumerate(consumption_fields):
+        for i, (label_text, field) in enumerate(consumption_fields):
             parent = columns[i % 2]
             frame = tk.Frame(parent)
             frame.pack(fill="x", padx=5, pady=5)
             label = tk.Label(frame, text=label_text, width=25, anchor="w")
             label.pack(side="left")
-            entry = ttk.Entry(frame, textvariable=variable)
+            entry = ttk.Entry(frame, textvariable=self.stage_vars[field])
             entry.pack(side="left", padx=20)
-            self.consumption_entries.append(entry)
+            # Only catalogued fields are filled (and locked) by the predefined values
+            if field in VALUE_FIELDS:
+                self.consumption_entries.append(entry)
+            else:
+                self.stage_entries.append(entry)
         
         # CCS frame
         fuel_other_frame = ttk.LabelFrame(self.main_frame, text="Carbon Capture and Storage (CCS)")
@@ -318,15 +402,22 @@ class InputScreen(FrameManager):
         ttk.Checkbutton(emissions_frame, text="Include Emissions Estimation",
                         variable=self.include_emissions,
                         bootstyle='round-toggle').pack(anchor="w")
-        ttk.Label(emissions_frame, text="Emissions (g CO2/kg fuel)").pack(anchor="w")
+        ttk.Label(emissions_frame, text="Combustion emission factor (kg CO2/MWh fuel)").pack(anchor="w")
         self.emissions_entry = self.create_entry_with_placeholder(
             emissions_frame,
             var=self.emissions_value,
-            placeholder="e.g. 2.42",
+            placeholder="e.g. 341",
             width=15
         )
         self.emissions_entry.pack(fill="x", padx=5, pady=5)
 
+        factors_row = ttk.Frame(emissions_frame)
+        factors_row.pack(fill="x")
+        ttk.Label(factors_row, text="Upstream factor (kg CO2/MWh)").pack(side="left")
+        ttk.Entry(factors_row, textvariable=self.upstream_emissions, width=10).pack(side="left", padx=5, pady=5)
+        ttk.Label(factors_row, text="CCS capture rate (0-1)").pack(side="left", padx=(20, 0))
+        ttk.Entry(factors_row, textvariable=self.ccs_capture_rate, width=10).pack(side="left", padx=5, pady=5)
+
         # Sensitivity Analysis
         sensitivity_frame = tk.LabelFrame(self.main_frame, text="Sensitivity Analysis (Interval %)", font=(self.controller.system_font, 14, "bold"))
         sensitivity_frame.pack(fill="x", padx=20, pady=10)
@@ -367,6 +458,18 @@ class InputScreen(FrameManager):
         back_button = ttk.Button(button_frame, text="Back", padding=(10,10), command=lambda: self.controller.show_frame(HomeScreen))
         back_button.pack(side="left", expand=True, fill="x", padx=(0, 10))
 
+        # Undo/Redo Buttons
+        self.undo_button = ttk.Button(button_frame, text="Undo", padding=(10,10), command=self.undo,
+                                      bootstyle=SECONDARY, state='disabled')
+        self.undo_button.pack(side="left", padx=5)
+        self.redo_button = ttk.Button(button_frame, text="Redo", padding=(10,10), command=self.redo,
+                                      bootstyle=SECONDARY, state='disabled')
+        self.redo_button.pack(side="left", padx=5)
+
+        # Many scenarios at once
+        ttk.Button(button_frame, text="Grid Entry", padding=(10,10), command=lambda: self.controller.show_frame(GridInputScreen),
+                   bootstyle=SECONDARY).pack(side="left", padx=5)
+
         # Run Button
         run_button = ttk.Button(button_frame, text="RUN", padding=(10,10), command=self.collect_data, bootstyle='success')
         run_button.pack(side="right", expand=True, fill="x", padx=(10, 0))
@@ -376,7 +479,13 @@ class InputScreen(FrameManager):
         self.error_label.pack()
 
         # Bind fuel selection to update predefined values
-        fuel_dropdown.bind('<<ComboboxSelected>>', self.update_predefined_values)
+        fuel_dropdown.bind('<<ComboboxSelected>>', self.on_fuel_selected)
+        self.region_dropdown.bind('<<ComboboxSelected>>', self.update_predefined_values)
+        self.route_dropdown.bind('<<ComboboxSelected>>', self.update_predefined_values)
+        year_entry.bind('<FocusOut>', self.update_predefined_values)
+        year_entry.bind('<Return>', self.update_predefined_values)
+        blend_entry.bind('<FocusOut>', self.update_predefined_values)
+        blend_entry.bind('<Return>', self.update_predefined_values)
         
         # Initial setup of fields
         self.toggle_input_fields()
@@ -461,19 +570,52 @@ class InputScreen(FrameManager):
         for entry in self.consumption_entries:
             entry.configure(state=state)
         
-        if self.use_predefined.get() and self.fuel_type.get():
+        if self.use_predefined.get() and self.has_fuel():
             self.update_predefined_values()
 
+    def on_fuel_selected(self, event=None):
+        # Only offer the regions and routes catalogued for the selected fuel
+        fuel = self.fuel_type.get()
+        self.region_dropdown.configure(values=self.catalog.regions(fuel))
+        self.route_dropdown.configure(values=self.catalog.routes(fuel))
+        self.update_predefined_values()
+
+    def get_reference_year(self):
+        try:
+            return int(self.year.get()) if self.year.get().strip() else None
+        except ValueError:
+            return None
+
+    def has_fuel(self):
+        return bool(self.fuel_type.get() or self.blend.get().strip())
+
+    def get_predefined(self):
+        """Resolve predefined values for the selected fuel or blend, region, route and year"""
+        if self.blend.get().strip():
+            try:
+                return resolve_blend(self.blend.get(), region=self.region.get() or None,
+                                     year=self.get_reference_year(), route=self.route.get() or None,
+                                     reference=self.catalog)
+            except ValueError as e:
+                self.error_label.config(text=f"Invalid blend: {e}")
+                return None
+        return self.catalog.as_predefined(
+            self.fuel_type.get(),
+            region=self.region.get() or None,
+            year=self.get_reference_year(),
+            route=self.route.get() or None
+        )
+
     def update_predefined_values(self, event=None):
-        if self.use_predefined.get() and self.fuel_type.get():
-            fuel = self.fuel_type.get()
-            if fuel in self.predefined_values:
-                values = self.predefined_values[fuel]
+        if self.use_predefined.get() and self.has_fuel():
+            values = self.get_predefined()
+            if values is not None:
                 self.extraction.set(values["extraction"])
                 self.processing.set(values["processing"])
                 self.transportation.set(values["transportation"])
                 self.calculate_from_inputs()
                 self.emissions_value.set(values["emissions"])
+                self.upstream_emissions.set(values["upstream_emissions"])
                 
                 if self.ccs.get() and self.use_predefined_ccs.get():
                     self.update_predefined_ccs_values()
@@ -487,73 +629,194 @@ class InputScreen(FrameManager):
             for entry in self.ccs_entries:
                 entry.configure(state=state)
             
-            if self.use_predefined_ccs.get() and self.fuel_type.get():
+            if self.use_predefined_ccs.get() and self.has_fuel():
                 self.update_predefined_ccs_values()
         else:
             self.ccs_frame.pack_forget()
             self.ccs_predefined_check.pack_forget()
 
     def update_predefined_ccs_values(self):
-        if self.fuel_type.get() in self.predefined_values:
-            ccs_values = self.predefined_values[self.fuel_type.get()]["ccs"]
+        values = self.get_predefined()
+        if values is not None:
+            ccs_values = values["ccs"]
             self.ccs_capture.set(ccs_values["capture"])
             self.ccs_compression.set(ccs_values["compression"])
             self.ccs_transportation.set(ccs_values["transportation"])
             self.ccs_storage.set(ccs_values["storage"])
+            self.ccs_capture_rate.set(ccs_values["capture_rate"])
+
+    def read_inputs(self):
+        """Read and validate the form. Returns (input_data, errors)."""
+        required_fields = {
+            'plant_efficiency': (self.plant_efficiency, "Efficiency"),
+            'total_output': (self.total_output, "Total Output"),
+            'extraction': (self.extraction, "Extraction"),
+            'processing': (self.processing, "Processing"),
+            'transportation': (self.transportation, "Transportation"),
+            'generation': (self.generation, "Generation")
+        }
+        
+        input_data = {}
+        errors = []
+        
+        for field, (var, name) in required_fields.items():
+            try:
+                value = float(var.get())
+                if value <= 0 and field not in ['plant_efficiency']:
+                    errors.append(f"{name} must be greater than 0")
+                input_data[field] = value
+            except (ValueError, tk.TclError):
+                errors.append(f"Invalid {name} value")
+        
+        # Extra registry stages may be zero but must be numeric
+        for field, var in self.stage_vars.items():
+            if field in input_data:
+                continue
+            try:
+                value = float(var.get())
+                if value < 0:
+                    errors.append(f"{stage_model.field_label(field)} cannot be negative")
+                input_data[field] = value
+            except (ValueError, tk.TclError):
+                errors.append(f"Invalid {stage_model.field_label(field)} value")
+        
+        fuel_type = self.fuel_type.get()
+        blend = None
+        if self.blend.get().strip():
+            try:
+                blend = parse_blend(self.blend.get())
+                fuel_type = blend_label(blend)
+            except ValueError as e:
+                errors.append(f"Invalid blend: {e}")
+
+        if errors:
+            return input_data, errors
+            
+        input_data.update({
+            'plant_location': self.plant_location.get(),
+            'ccs': self.ccs.get(),
+            'ccs_capture': float(self.ccs_capture.get()) if self.ccs.get() else 0,
+            'ccs_compression': float(self.ccs_compression.get()) if self.ccs.get() else 0,
+            'ccs_transportation': float(self.ccs_transportation.get()) if self.ccs.get() else 0,
+            'ccs_storage': float(self.ccs_storage.get()) if self.ccs.get() else 0,
+            'include_emissions': self.include_emissions.get(),
+            'emissions_value': float(self.emissions_value.get()) if self.include_emissions.get() else 0,
+            'upstream_emissions': float(self.upstream_emissions.get()) if self.include_emissions.get() else 0,
+            'ccs_capture_rate': min(1.0, max(0.0, float(self.ccs_capture_rate.get()))),
+            'sensitivity_value': float(self.sensitivity_value.get()) if self.sensitivity_value.get() and self.sensitivity_value.get().strip() else 5,
+            'ccs_sensitivity_value': float(self.ccs_sensitivity_value.get()) if self.ccs_sensitivity_value.get() and self.ccs_sensitivity_value.get().strip() else 5,
+            'fuel_type': fuel_type,
+            'region': self.region.get(),
+            'route': self.route.get(),
+            'year': self.get_reference_year()
+        })
+        if blend:
+            # Only blends carry the key, so single-fuel inputs hash as before
+            input_data['blend'] = blend
+        return input_data, []
 
     def collect_data(self):
         try:
-            required_fields = {
-                'plant_efficiency': (self.plant_efficiency, "Efficiency"),
-                'total_output': (self.total_output, "Total Output"),
-                'extraction': (self.extraction, "Extraction"),
-                'processing': (self.processing, "Processing"),
-                'transportation': (self.transportation, "Transportation"),
-                'generation': (self.generation, "Generation")
-            }
-            
-            input_data = {}
-            errors = []
-            
-            for field, (var, name) in required_fields.items():
-                try:
-                    value = float(var.get())
-                    if value <= 0 and field not in ['plant_efficiency']:
-                        errors.append(f"{name} must be greater than 0")
-                    input_data[field] = value
-                except (ValueError, tk.TclError):
-                    errors.append(f"Invalid {name} value")
-            
+            input_data, errors = self.read_inputs()
             if errors:
                 self.error_label.config(text="\n".join(errors))
                 return
-                
-            input_data.update({
-                'plant_location': self.plant_location.get(),
-                'ccs': self.ccs.get(),
-                'ccs_capture': float(self.ccs_capture.get()) if self.ccs.get() else 0,
-                'ccs_compression': float(self.ccs_compression.get()) if self.ccs.get() else 0,
-                'ccs_transportation': float(self.ccs_transportation.get()) if self.ccs.get() else 0,
-                'ccs_storage': float(self.ccs_storage.get()) if self.ccs.get() else 0,
-                'include_emissions': self.include_emissions.get(),
-                'emissions_value': float(self.emissions_value.get()) if self.include_emissions.get() else 0,
-                'emissions_value': float(self.emissions_value.get()) if self.include_emissions.get() else 0,
-                'sensitivity_value': float(self.sensitivity_value.get()) if self.sensitivity_value.get() and self.sensitivity_value.get().strip() else 5,
-                'ccs_sensitivity_value': float(self.ccs_sensitivity_value.get()) if self.ccs_sensitivity_value.get() and self.ccs_sensitivity_value.get().strip() else 5,
-                'fuel_type': self.fuel_type.get()
-            })
-            
-            self.controller.frames[ResultScreen].display_results(input_data)
+
+            # Only the result parts that depend on the edited fields are recomputed
+            snapshot = self.session.record(input_data)
+            self.update_history_buttons()
+            results = None if snapshot.error else dict(snapshot.results)
+            self.controller.frames[ResultScreen].display_results(input_data, results=results)
             self.controller.show_frame(ResultScreen)
             
         except Exception as e:
             self.error_label.config(text=f"Error: {str(e)}")
 
+    def undo(self, event=None):
+        # Keep unsaved edits as a snapshot so redo can bring them back
+        input_data, errors = self.read_inputs()
+        if not errors:
+            self.session.record(input_data)
+        snapshot = self.session.undo()
+        if snapshot is not None:
+            self.load_inputs(snapshot.inputs)
+        self.update_history_buttons()
+
+    def redo(self, event=None):
+        snapshot = self.session.redo()
+        if snapshot is not None:
+            self.load_inputs(snapshot.inputs)
+        self.update_history_buttons()
+
+    def update_history_buttons(self):
+        self.undo_button.configure(state='normal' if self.session.can_undo() else 'disabled')
+        self.redo_button.configure(state='normal' if self.session.can_redo() else 'disabled')
+
+    def duplicate(self, input_data):
+        """Fill the form from a past calculation and make it the current snapshot"""
+        self.load_inputs(input_data)
+        input_data, errors = self.read_inputs()
+        if not errors:
+            self.session.record(input_data)
+        self.update_history_buttons()
+
+    def load_inputs(self, input_data):
+        """Fill the form with saved inputs, as entered rather than predefined"""
+        self.use_predefined.set(False)
+        self.use_predefined_ccs.set(False)
+        self.plant_location.set(input_data.get('plant_location') or '')
+        blend = input_data.get('blend')
+        self.fuel_type.set('' if blend else input_data.get('fuel_type') or '')
+        self.blend.set(blend_label(blend) if blend else '')
+        self.region.set(input_data.get('region') or '')
+        self.route.set(input_data.get('route') or '')
+        self.year.set('' if input_data.get('year') is None else str(input_data.get('year')))
+        self.plant_efficiency.set(input_data.get('plant_efficiency', 0.0))
+        self.total_output.set(input_data.get('total_output', 0.0))
+        for field, var in self.stage_vars.items():
+            var.set(input_data.get(field, 0.0))
+        self.ccs.set(bool(input_data.get('ccs')))
+        self.ccs_capture.set(input_data.get('ccs_capture', 0.0))
+        self.ccs_compression.set(input_data.get('ccs_compression', 0.0))
+        self.ccs_transportation.set(input_data.get('ccs_transportation', 0.0))
+        self.ccs_storage.set(input_data.get('ccs_storage', 0.0))
+        self.ccs_capture_rate.set(input_data.get('ccs_capture_rate', 0.9))
+        self.include_emissions.set(bool(input_data.get('include_emissions')))
+        # A legacy factor is in g CO2/kg fuel; it must be entered again in kg CO2/MWh
+        legacy = legacy_emissions(input_data)
+        self.emissions_value.set(0.0 if legacy else input_data.get('emissions_value', 0.0))
+        self.upstream_emissions.set(input_data.get('upstream_emissions', 0.0))
+        self.sensitivity_value.set(str(input_data.get('sensitivity_value', '')))
+        self.ccs_sensitivity_value.set(str(input_data.get('ccs_sensitivity_value', '')))
+        # Efficiency and output traces recompute generation, so restore it last
+        self.generation.set(input_data.get('generation', 0.0))
+
+        for entry in [self.efficiency_entry, self.output_entry,
+                    self.emissions_entry, self.sensitivity_entry, self.ccs_sensitivity_entry]:
+            entry.configure(foreground=entry.default_fg)
+        self.error_label.config(text="Emission factor was saved in g CO2/kg fuel; enter it in kg CO2/MWh of fuel"
+                                if legacy and input_data.get('include_emissions') else "")
+
+        self.toggle_ccs_fields()
+        self.toggle_input_fields()
+
+    def on_show(self):
+        self.controller.bind('<Control-z>', self.undo)
+        self.controller.bind('<Control-y>', self.redo)
+
+    def on_hide(self):
+        self.controller.unbind('<Control-z>')
+        self.controller.unbind('<Control-y>')
+
     def reset_form(self):
         self.plant_efficiency.set(0.0)
         self.total_output.set(0.0)
         self.plant_location.set('')
         self.fuel_type.set('')
+        self.blend.set('')
+        self.region.set('')
+        self.route.set('')
+        self.year.set('')
         self.extraction.set(0.0)
         self.processing.set(0.0)
         self.transportation.set(0.0)
@@ -561,12 +824,16 @@ class InputScreen(FrameManager):
         self.ccs.set(False)
         self.include_emissions.set(False)
         self.emissions_value.set(0.0)
+        self.upstream_emissions.set(0.0)
+        self.ccs_capture_rate.set(0.9)
         self.sensitivity_value.set('')
         self.ccs_sensitivity_value.set('')
         self.ccs_capture.set(0.0)
         self.ccs_compression.set(0.0)
         self.ccs_transportation.set(0.0)
         self.ccs_storage.set(0.0)
+        for var in self.stage_vars.values():
+            var.set(0.0)
         
         self.use_predefined.set(True)
         self.use_predefined_ccs.set(True)
@@ -632,6 +899,28 @@ class ResultScreen(FrameManager):
                                              font=(self.controller.system_font, 12))
         self.total_emissions_label.pack(anchor="nw", padx=10, pady=5)
 
+        # Goal seek: solve for one input given a target metric
+        self.goal_seek_frame = ttk.LabelFrame(self.scrollable_frame, text="Goal Seek")
+        self.goal_seek_frame.pack(fill="x", padx=20, pady=10, ipadx=10, ipady=5)
+
+        self.goal_metric = StringVar(value='total_efficiency')
+        self.goal_variable = StringVar(value='plant_efficiency')
+        self.goal_target = StringVar()
+
+        ttk.Label(self.goal_seek_frame, text="Target").pack(side="left", padx=(10, 5))
+        ttk.Combobox(self.goal_seek_frame, values=METRICS, textvariable=self.goal_metric,
+                     state="readonly", width=18).pack(side="left", padx=5)
+        ttk.Label(self.goal_seek_frame, text="=").pack(side="left")
+        ttk.Entry(self.goal_seek_frame, textvariable=self.goal_target, width=10).pack(side="left", padx=5)
+        ttk.Label(self.goal_seek_frame, text="by changing").pack(side="left", padx=5)
+        ttk.Combobox(self.goal_seek_frame, values=SOLVABLE_FIELDS, textvariable=self.goal_variable,
+                     state="readonly", width=18).pack(side="left", padx=5)
+        ttk.Button(self.goal_seek_frame, text="Solve", command=self.run_goal_seek,
+                   bootstyle='info').pack(side="left", padx=5)
+        self.goal_result_label = ttk.Label(self.goal_seek_frame, text="",
+                                           font=(self.controller.system_font, 11))
+        self.goal_result_label.pack(side="left", padx=10)
+
         self.graphs_container = ttk.Frame(self.scrollable_frame)
         self.graphs_container.pack(fill="both", expand=True, padx=20, pady=10)
 
@@ -663,23 +952,92 @@ class ResultScreen(FrameManager):
         self.general_chart_canvas.pack(fill="both", expand=True, padx=10, pady=10)
         self.general_chart_canvas.bind("<Configure>", lambda e: self.draw_general_sensitivity_chart())
 
+        # 4. CCS x general sensitivity surface - Bottom
+        self.surface_frame = ttk.LabelFrame(self.graphs_container, text="Combined Sensitivity (CCS x General)")
+        self.surface_frame.grid(row=2, column=0, columnspan=2, sticky="nsew", padx=15, pady=15)
+
+        surface_controls = ttk.Frame(self.surface_frame)
+        surface_controls.pack(fill="x", padx=10, pady=(5, 0))
+        self.surface_span = StringVar(value="20")
+        self.surface_resolution = StringVar(value="200")
+        ttk.Label(surface_controls, text="Range \u00b1 (%)").pack(side="left")
+        ttk.Entry(surface_controls, textvariable=self.surface_span, width=6).pack(side="left", padx=5)
+        ttk.Label(surface_controls, text=f"Resolution (max {MAX_RESOLUTION})").pack(side="left", padx=(10, 0))
+        ttk.Entry(surface_controls, textvariable=self.surface_resolution, width=6).pack(side="left", padx=5)
+        ttk.Button(surface_controls, text="Update", command=self.update_surface,
+                   bootstyle=SECONDARY).pack(side="left", padx=5)
+        self.surface_label = ttk.Label(surface_controls, text="")
+        self.surface_label.pack(side="left", padx=10)
+
+        self.surface_map = Heatmap(self.surface_frame, x_label="CCS", y_label="General",
+                                   value_label="Efficiency", height=360, width=800)
+        self.surface_map.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # 5. Dense sweep of one input, computed in a worker process and drawn as it arrives
+        self.sweep_frame = ttk.LabelFrame(self.graphs_container, text="Dense Sweep")
+        self.sweep_frame.grid(row=3, column=0, columnspan=2, sticky="nsew", padx=15, pady=15)
+
+        sweep_controls = ttk.Frame(self.sweep_frame)
+        sweep_controls.pack(fill="x", padx=10, pady=(5, 0))
+        self.sweep_field = StringVar(value='extraction')
+        self.sweep_start = StringVar(value="0")
+        self.sweep_stop = StringVar(value="100")
+        self.sweep_points = StringVar(value="200000")
+        ttk.Combobox(sweep_controls, values=SOLVABLE_FIELDS, textvariable=self.sweep_field,
+                     state="readonly", width=18).pack(side="left")
+        for label, var in (("From", self.sweep_start), ("To", self.sweep_stop), ("Points", self.sweep_points)):
+            ttk.Label(sweep_controls, text=label).pack(side="left", padx=(10, 0))
+            ttk.Entry(sweep_controls, textvariable=var, width=9).pack(side="left", padx=5)
+        ttk.Button(sweep_controls, text="Run", command=self.start_sweep, bootstyle=SECONDARY).pack(side="left", padx=5)
+        self.sweep_cancel_button = ttk.Button(sweep_controls, text="Cancel", command=self.cancel_sweep,
+                                              bootstyle=DANGER, state='disabled')
+        self.sweep_cancel_button.pack(side="left", padx=5)
+        self.sweep_progress = ttk.Progressbar(sweep_controls, maximum=100, length=160)
+        self.sweep_progress.pack(side="left", padx=10)
+        self.sweep_label = ttk.Label(sweep_controls, text="")
+        self.sweep_label.pack(side="left")
+
+        self.sweep_canvas = tk.Canvas(self.sweep_frame, height=260, width=800, bg="white")
+        self.sweep_canvas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.sweep_canvas.bind("<Configure>", lambda e: self.draw_sweep_chart())
+
+        self.task_runner = TaskRunner(self)
+        self.sweep_task = None
+        self.sweep_run = 0
+        self.sweep_values = None
+        self.sweep_efficiency = None
+        self.sweep_filled = 0
+        self.sweep_started = None
+
         button_frame = ttk.Frame(self.scrollable_frame)
         button_frame.pack(fill="x", pady=20)
         back_button = ttk.Button(button_frame, 
                                text="Back to Home", 
                                command=lambda: controller.show_frame(HomeScreen))
         back_button.pack(anchor="center")
-
-        self.stages = ["Extraction", "Processing", "Transportation", "CCS"]
-        self.energy_values = [0, 0, 0, 0]
+        ttk.Button(button_frame, text="Edit Inputs", command=lambda: controller.show_frame(InputScreen),
+                   bootstyle=SECONDARY).pack(anchor="center", pady=5)
+        ttk.Button(button_frame, text="Save Report", command=self.save_report,
+                   bootstyle=SECONDARY).pack(anchor="center", pady=5)
+        self.report_label = ttk.Label(button_frame, text="")
+        self.report_label.pack(anchor="center")
+
+        self.stage_keys = [stage['key'] for stage in stage_model.chart_stages()]
+        self.stages = [stage['label'] for stage in stage_model.chart_stages()]
+        self.energy_values = [0] * len(self.stages)
         self.ccs_percentages = [80, 85, 90, 95, 100]
         self.efficiency_values = [0, 0, 0, 0, 0]
         self.general_sens_percentages = []
         self.general_sens_efficiencies = []
+        self.last_input_data = None
 
-    def display_results(self, input_data, save_to_db=True):
-        """Calculate and display all results with error handling"""
-        results = calculate_results(input_data)
+    def display_results(self, input_data, save_to_db=True, results=None):
+        """Calculate (unless results are given) and display all results with error handling"""
+        if results is None:
+            results = calculate_results(input_data)
+        self.last_input_data = input_data
+        self.goal_result_label.config(text="")
+        self.reset_sweep()
         
         if 'error' in results:
             self.total_efficiency_label.config(
@@ -697,21 +1055,20 @@ class ResultScreen(FrameManager):
         self.efficiency_drop_label.config(
             text=f"Efficiency drop: {results['efficiency_drop']:.2f}%"
         )
-        self.total_emissions_label.config(
-            text=f"Total emissions: {results['total_emissions']:.2f} kg CO2/MWh" 
-            if results['total_emissions'] > 0 else "Emissions calculation not enabled"
-        )
+        if not input_data.get('include_emissions'):
+            emissions_text = "Emissions calculation not enabled"
+        elif legacy_emissions(input_data):
+            emissions_text = "Total emissions: not recalculated (factor saved in g CO2/kg fuel)"
+        else:
+            emissions_text = (f"Total emissions: {results['total_emissions']:.2f} kg CO2/MWh "
+                              f"({results['captured_emissions']:.2f} captured)")
+        self.total_emissions_label.config(text=emissions_text)
         
         # Save to database
         if save_to_db:
             db.save_calculation(input_data, results)
         
-        self.energy_values = [
-            results['energy_contributions']['extraction'],
-            results['energy_contributions']['processing'],
-            results['energy_contributions']['transportation'],
-            results['energy_contributions']['ccs']
-        ]
+        self.energy_values = [results['energy_contributions'].get(key, 0.0) for key in self.stage_keys]
         
         self.efficiency_values = results['ccs_sensitivity']
         self.ccs_percentages = results.get('ccs_sensitivity_percentages', [80, 85, 90, 95, 100])
@@ -727,6 +1084,177 @@ class ResultScreen(FrameManager):
         self.draw_pie_chart()
         self.draw_line_chart()
         self.draw_general_sensitivity_chart()
+        self.update_surface()
+
+    def update_surface(self):
+        """Recompute the CCS x general efficiency surface at the chosen range and resolution"""
+        if not self.last_input_data:
+            return
+        try:
+            span = float(self.surface_span.get())
+            resolution = int(self.surface_resolution.get())
+        except ValueError:
+            self.surface_label.config(text="Invalid range or resolution", foreground='red')
+            return
+        axis = surface_axis(span, resolution)
+        try:
+            grid = sensitivity_surface(self.last_input_data, axis, axis)
+        except ValueError as e:
+            self.surface_label.config(text=str(e), foreground='red')
+            return
+        self.surface_label.config(
+            text=f"{len(axis)} x {len(axis)} points" + ("" if self.last_input_data.get('ccs') else " (CCS not included)"),
+            foreground='black'
+        )
+        self.surface_map.set_data(grid, axis, axis)
+
+    def start_sweep(self):
+        """Sweep the chosen input over many points in a worker process, drawing the curve as chunks arrive"""
+        if not self.last_input_data:
+            return
+        try:
+            start = float(self.sweep_start.get())
+            stop = float(self.sweep_stop.get())
+            points = int(self.sweep_points.get())
+        except ValueError:
+            self.sweep_label.config(text="Invalid range or points", foreground='red')
+            return
+        if not 2 <= points <= 5000000:
+            self.sweep_label.config(text="Points must be between 2 and 5,000,000", foreground='red')
+            return
+
+        self.cancel_sweep()
+        # Events of a cancelled earlier run may still arrive; they carry its run number
+        self.sweep_run += 1
+        run = self.sweep_run
+        self.sweep_values = np.linspace(start, stop, points)
+        self.sweep_efficiency = np.full(points, np.nan)
+        self.sweep_filled = 0
+        self.sweep_started = time.perf_counter()
+        self.sweep_progress['value'] = 0
+        self.sweep_label.config(text="Starting...", foreground='black')
+        self.sweep_cancel_button.configure(state='normal')
+        self.draw_sweep_chart()
+        self.sweep_task = self.task_runner.submit(
+            sweep_task, dict(self.last_input_data), self.sweep_field.get(), start, stop, points,
+            process=True,
+            on_progress=lambda done, total, message: self.on_sweep_progress(run, done, total),
+            on_partial=lambda data: self.on_sweep_partial(run, data),
+            on_done=lambda count: self.finish_sweep(run, f"{count:,} points"),
+            on_cancel=lambda _: self.finish_sweep(run, f"Cancelled after {self.sweep_filled:,} points"),
+            on_error=lambda message: self.finish_sweep(run, message, error=True),
+        )
+
+    def cancel_sweep(self):
+        if self.sweep_task is not None and not self.sweep_task.finished:
+            self.sweep_task.cancel()
+
+    def reset_sweep(self):
+        """Stop and clear the sweep of the previous scenario"""
+        self.cancel_sweep()
+        self.sweep_run += 1
+        self.sweep_filled = 0
+        self.sweep_progress['value'] = 0
+        self.sweep_label.config(text="")
+        self.sweep_cancel_button.configure(state='disabled')
+        self.draw_sweep_chart()
+
+    def on_sweep_progress(self, run, done, total):
+        if run != self.sweep_run:
+            return
+        self.sweep_progress['value'] = done / total * 100 if total else 0
+        self.sweep_label.config(text=f"{done:,} / {total:,} points")
+
+    def on_sweep_partial(self, run, data):
+        if run != self.sweep_run:
+            return
+        offset, values, efficiency, _ = data
+        self.sweep_efficiency[offset:offset + len(values)] = efficiency
+        self.sweep_filled = max(self.sweep_filled, offset + len(values))
+        self.draw_sweep_chart()
+
+    def finish_sweep(self, run, text, error=False):
+        if run != self.sweep_run:
+            return
+        self.sweep_cancel_button.configure(state='disabled')
+        if not error:
+            text += f" in {time.perf_counter() - self.sweep_started:.1f} s"
+        self.sweep_label.config(text=text, foreground='red' if error else 'black')
+
+    def draw_sweep_chart(self):
+        """Draw the computed part of the sweep as one polyline of at most two points per pixel"""
+        canvas = self.sweep_canvas
+        canvas.delete("all")
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        PAD_LEFT, PAD_RIGHT, PAD_TOP, PAD_BOTTOM = 70, 30, 20, 45
+        chart_w = width - PAD_LEFT - PAD_RIGHT
+        chart_h = height - PAD_TOP - PAD_BOTTOM
+        if chart_w < 10 or chart_h < 10 or not self.sweep_filled:
+            return
+
+        x_min, x_max = self.sweep_values[0], self.sweep_values[-1]
+        filled = self.sweep_efficiency[:self.sweep_filled]
+        y_min, y_max = float(np.nanmin(filled)), float(np.nanmax(filled))
+        x_range = (x_max - x_min) or 1.0
+        y_range = (y_max - y_min) or 1.0
+
+        canvas.create_line(PAD_LEFT, height - PAD_BOTTOM, width - PAD_RIGHT, height - PAD_BOTTOM)
+        canvas.create_line(PAD_LEFT, PAD_TOP, PAD_LEFT, height - PAD_BOTTOM)
+        canvas.create_text(PAD_LEFT, height - PAD_BOTTOM + 12, text=f"{x_min:g}", font=("Arial", 8))
+        canvas.create_text(width - PAD_RIGHT, height - PAD_BOTTOM + 12, text=f"{x_max:g}", font=("Arial", 8))
+        canvas.create_text(PAD_LEFT + chart_w / 2, height - 12, text=self.sweep_field.get(),
+                           font=("Arial", 9, "bold"))
+        canvas.create_text(PAD_LEFT - 5, PAD_TOP, text=f"{y_max:.2f}", anchor="e", font=("Arial", 8))
+        canvas.create_text(PAD_LEFT - 5, height - PAD_BOTTOM, text=f"{y_min:.2f}", anchor="e", font=("Arial", 8))
+        canvas.create_text(18, PAD_TOP + chart_h / 2, text="Efficiency (%)", angle=90, font=("Arial", 9, "bold"))
+
+        index = np.unique(np.linspace(0, self.sweep_filled - 1, min(self.sweep_filled, 2 * chart_w)).astype(int))
+        xs = PAD_LEFT + (self.sweep_values[index] - x_min) / x_range * chart_w
+        ys = height - PAD_BOTTOM - (filled[index] - y_min) / y_range * chart_h
+        if len(index) > 1:
+            canvas.create_line(*np.column_stack([xs, ys]).ravel().tolist(), fill="#007bff", width=2)
+
+    def run_goal_seek(self):
+        """Solve for the selected input so the selected metric reaches the target"""
+        if not self.last_input_data:
+            return
+        try:
+            target = float(self.goal_target.get())
+        except ValueError:
+            self.goal_result_label.config(text="Invalid target value", foreground='red')
+            return
+
+        variable = self.goal_variable.get()
+        value = solve(self.last_input_data, variable, target, metric=self.goal_metric.get())
+        if value is None:
+            self.goal_result_label.config(text="Target not reachable", foreground='red')
+        else:
+            self.goal_result_label.config(text=f"{variable} = {value:.2f}", foreground='black')
+
+    def save_report(self):
+        """Render the current result to PDF/PNG/SVG in a background process"""
+        if not self.last_input_data:
+            return
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            filetypes=[(fmt.upper(), f"*.{fmt}") for fmt in REPORT_FORMATS]
+        )
+        if not path:
+            return
+        future = get_report_pool().submit(render_report, self.last_input_data, None, path)
+        self.report_label.config(text="Rendering report...", foreground='black')
+        self.after(100, self.poll_report, future)
+
+    def poll_report(self, future):
+        if not future.done():
+            self.after(100, self.poll_report, future)
+            return
+        try:
+            self.report_label.config(text=f"Report saved to {future.result()}", foreground='black')
+        except Exception as e:
+            self.report_label.config(text=f"Report failed: {e}", foreground='red')
 
     def draw_pie_chart(self):
         self.pie_chart_canvas.delete("all")
@@ -751,7 +1279,7 @@ class ResultScreen(FrameManager):
         total = sum(data)
         
         # Colors for pie chart
-        colors = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2"]
+        colors = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#edc948", "#b07aa1", "#ff9da7"]
         
         # Draw Pie
         x_center, y_center = width / 2 - 50, height / 2  # Shift left to make room for legend
@@ -1013,6 +1541,201 @@ class ResultScreen(FrameManager):
         self.draw_pie_chart()
         self.draw_line_chart()
         self.draw_general_sensitivity_chart()
+        self.surface_map.redraw()
+        self.draw_sweep_chart()
+
+class GridInputScreen(FrameManager):
+    """Spreadsheet-style entry of many scenarios: paste rows, run them all as one batch"""
+    RESULT_COLUMNS = [
+        ('total_efficiency', "Total Eff. (%)"),
+        ('efficiency_drop', "Drop (%)"),
+        ('total_emissions', "Emissions"),
+        ('status', "Status"),
+    ]
+
+    def __init__(self, parent, controller):
+        super().__init__(parent, controller)
+        self.controller = controller
+
+        ttk.Label(self, text="Grid Entry", font=(self.controller.system_font, 24, "bold")).pack(pady=(20, 5))
+        ttk.Label(self, text="Paste rows from a spreadsheet (Ctrl+V). A header row with field names is optional; "
+                             "without one the columns are read in the order shown. Double-click a cell to edit it.",
+                  wraplength=900, justify="center").pack(pady=(0, 10))
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill="x", padx=20)
+        ttk.Button(toolbar, text="Paste", command=self.paste, bootstyle=SECONDARY).pack(side="left", padx=(0, 5))
+        ttk.Button(toolbar, text="Add Row", command=self.add_row, bootstyle=SECONDARY).pack(side="left", padx=5)
+        ttk.Button(toolbar, text="Remove Selected", command=self.remove_selected,
+                   bootstyle=DANGER).pack(side="left", padx=5)
+        ttk.Button(toolbar, text="Clear", command=self.clear, bootstyle=SECONDARY).pack(side="left", padx=5)
+        ttk.Button(toolbar, text="Run All", command=self.run_all, bootstyle='success').pack(side="right")
+        ttk.Button(toolbar, text="Show Result", command=self.show_selected,
+                   bootstyle=INFO).pack(side="right", padx=5)
+
+        # Input columns in PASTE_COLUMNS order, then the results of the last run
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        columns = PASTE_COLUMNS + [key for key, _ in self.RESULT_COLUMNS]
+        self.table = ttk.Treeview(table_frame, columns=columns, show="headings", selectmode="extended")
+        for field in PASTE_COLUMNS:
+            self.table.heading(field, text=field)
+            self.table.column(field, width=150 if field in ('plant_location', 'fuel_type') else 90, stretch=False)
+        for key, label in self.RESULT_COLUMNS:
+            self.table.heading(key, text=label)
+            self.table.column(key, width=300 if key == 'status' else 100, stretch=False)
+        self.table.tag_configure('error', foreground='red')
+        y_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.table.yview)
+        x_scroll = ttk.Scrollbar(table_frame, orient="horizontal", command=self.table.xview)
+        self.table.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        self.table.grid(row=0, column=0, sticky="nsew")
+        y_scroll.grid(row=0, column=1, sticky="ns")
+        x_scroll.grid(row=1, column=0, sticky="ew")
+        table_frame.rowconfigure(0, weight=1)
+        table_frame.columnconfigure(0, weight=1)
+        self.table.bind("<Double-1>", self.edit_cell)
+
+        bottom = ttk.Frame(self)
+        bottom.pack(fill="x", padx=20, pady=(0, 20))
+        ttk.Button(bottom, text="Back", command=lambda: controller.show_frame(InputScreen)).pack(side="left")
+        self.summary_label = ttk.Label(bottom, text="")
+        self.summary_label.pack(side="left", padx=20)
+
+        # Pasted text fields the grid does not show (region, route, year) and the last results, by row
+        self.row_extras = {}
+        self.row_results = {}
+        self.editor = None
+
+    def on_show(self):
+        self.controller.bind('<Control-v>', self.paste)
+
+    def on_hide(self):
+        self.controller.unbind('<Control-v>')
+        self.close_editor()
+
+    def paste(self, event=None):
+        if event is not None and isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return  # Pasting into the cell editor
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return
+        lines, records, errors = parse_table(text)
+        for record in records:
+            row_id = self.table.insert('', 'end', values=[record.get(field, '') for field in PASTE_COLUMNS]
+                                       + [''] * len(self.RESULT_COLUMNS))
+            self.row_extras[row_id] = {field: record[field] for field in TEXT_FIELDS
+                                       if field in record and field not in PASTE_COLUMNS}
+        message = f"Pasted {len(records)} rows"
+        if errors:
+            message += f"; skipped {len(errors)}: " + "; ".join(f"line {line}: {text}" for line, text in errors[:3])
+        self.summary_label.config(text=message, foreground='red' if errors else 'black')
+        return "break"
+
+    def add_row(self):
+        row_id = self.table.insert('', 'end', values=[''] * (len(PASTE_COLUMNS) + len(self.RESULT_COLUMNS)))
+        self.table.see(row_id)
+
+    def remove_selected(self):
+        for row_id in self.table.selection():
+            self.table.delete(row_id)
+            self.row_extras.pop(row_id, None)
+            self.row_results.pop(row_id, None)
+
+    def clear(self):
+        self.close_editor()
+        self.table.delete(*self.table.get_children())
+        self.row_extras = {}
+        self.row_results = {}
+        self.summary_label.config(text="")
+
+    def edit_cell(self, event):
+        """Edit one input cell in place; results of the row are cleared until the next run"""
+        if self.table.identify_region(event.x, event.y) != 'cell':
+            return
+        row_id = self.table.identify_row(event.y)
+        column = self.table.identify_column(event.x)
+        index = int(column[1:]) - 1
+        if not row_id or index >= len(PASTE_COLUMNS):
+            return
+        self.close_editor()
+        x, y, width, height = self.table.bbox(row_id, column)
+        value = StringVar(value=self.table.set(row_id, PASTE_COLUMNS[index]))
+        self.editor = ttk.Entry(self.table, textvariable=value)
+        self.editor.place(x=x, y=y, width=width, height=height)
+        self.editor.focus_set()
+        self.editor.select_range(0, 'end')
+
+        def commit(event=None):
+            self.table.set(row_id, PASTE_COLUMNS[index], value.get())
+            for key, _ in self.RESULT_COLUMNS:
+                self.table.set(row_id, key, '')
+            self.table.item(row_id, tags=())
+            self.row_results.pop(row_id, None)
+            self.close_editor()
+
+        self.editor.bind('<Return>', commit)
+        self.editor.bind('<FocusOut>', commit)
+        self.editor.bind('<Escape>', lambda e: self.close_editor())
+
+    def close_editor(self):
+        if self.editor is not None:
+            self.editor.destroy()
+            self.editor = None
+
+    def run_all(self):
+        """Validate every row, evaluate the valid ones in one batch and save them in one transaction"""
+        self.close_editor()
+        row_ids = self.table.get_children()
+        if not row_ids:
+            return
+        started = time.perf_counter()
+        records = []
+        for row_id in row_ids:
+            values = self.table.item(row_id, 'values')
+            record = {field: values[i] for i, field in enumerate(PASTE_COLUMNS) if i < len(values)}
+            record.update(self.row_extras.get(row_id, {}))
+            records.append(record)
+
+        rows, inputs, batch, messages = evaluate_records(records)
+        for i, row_messages in messages.items():
+            row_id = row_ids[i]
+            self.table.set(row_id, 'total_efficiency', '')
+            self.table.set(row_id, 'efficiency_drop', '')
+            self.table.set(row_id, 'total_emissions', '')
+            self.table.set(row_id, 'status', "; ".join(row_messages))
+            self.table.item(row_id, tags=('error',))
+            self.row_results.pop(row_id, None)
+
+        now = datetime.now()
+        params = []
+        for k, (i, input_data) in enumerate(zip(rows, inputs)):
+            row_id = row_ids[i]
+            results = row_results(batch, k)
+            self.row_results[row_id] = (input_data, results)
+            params.append(calculation_row(input_data, results, now))
+            self.table.set(row_id, 'total_efficiency', f"{results['total_efficiency']:.2f}")
+            self.table.set(row_id, 'efficiency_drop', f"{results['efficiency_drop']:.2f}")
+            self.table.set(row_id, 'total_emissions', f"{results['total_emissions']:.2f}")
+            self.table.set(row_id, 'status', "OK")
+            self.table.item(row_id, tags=())
+
+        saved = db.save_calculation_rows(params)
+        db.poll_changes()
+        self.summary_label.config(
+            text=f"{len(rows)} of {len(records)} rows calculated, {saved} saved, {len(messages)} with errors "
+                 f"({time.perf_counter() - started:.2f} s)",
+            foreground='red' if messages or saved != len(params) else 'black'
+        )
+
+    def show_selected(self):
+        selection = [row_id for row_id in self.table.selection() if row_id in self.row_results]
+        if not selection:
+            return
+        input_data, results = self.row_results[selection[0]]
+        result_screen = self.controller.show_frame(ResultScreen)
+        result_screen.display_results(input_data, save_to_db=False, results=results)
+
 
 class HistoryScreen(FrameManager):
     def __init__(self, parent, controller):
@@ -1033,6 +1756,7 @@ class HistoryScreen(FrameManager):
             {"text": "Fuel", "stretch": True},
             {"text": "Efficiency", "stretch": True},
             {"text": "Drop", "stretch": True},
+            {"text": "Runs", "stretch": False, "width": 60},
             {"text": "Date", "stretch": True},
         ]
         
@@ -1054,16 +1778,51 @@ class HistoryScreen(FrameManager):
         
         ttk.Button(button_frame, text="Back", command=lambda: controller.show_frame(HomeScreen)).pack(side="left")
         ttk.Button(button_frame, text="View Selected", command=self.view_selected, bootstyle=INFO).pack(side="right", padx=5)
+        ttk.Button(button_frame, text="Compare Selected", command=self.compare_selected, bootstyle=SECONDARY).pack(side="right", padx=5)
+        ttk.Button(button_frame, text="Duplicate", command=self.duplicate_selected, bootstyle=SECONDARY).pack(side="right", padx=5)
         ttk.Button(button_frame, text="Delete Selected", command=self.delete_selected, bootstyle=DANGER).pack(side="right", padx=5)
+        ttk.Button(button_frame, text="Export Reports", command=self.export_reports, bootstyle=SECONDARY).pack(side="right", padx=5)
+        self.report_label = ttk.Label(button_frame, text="")
+        self.report_label.pack(side="right", padx=10)
+
+        # Rows by id, kept in step with the database through change notifications
+        self.map_id_to_data = {}
+        self.loaded = False
+        self.stale = False
+        db.subscribe(self.on_db_change)
 
     def on_show(self):
-        self.load_data()
+        if not self.loaded:
+            self.load_data()
+        elif self.stale:
+            self.refresh_table()
+
+    def on_db_change(self, changes):
+        """Apply only the inserted, updated and deleted rows"""
+        if not self.loaded:
+            return
+        if not changes['complete']:
+            self.loaded = False
+            if self.controller.current_frame is self:
+                self.load_data()
+            return
+        for calc_id in changes['deleted']:
+            self.map_id_to_data.pop(calc_id, None)
+        for item in db.get_history(ids=changes['changed']):
+            self.map_id_to_data[item['id']] = item
+        self.stale = True
+        if self.controller.current_frame is self:
+            self.refresh_table()
 
     def load_data(self):
-        history = db.get_history()
-        
+        self.map_id_to_data = {item['id']: item for item in db.get_history()}
+        self.loaded = True
+        self.refresh_table()
+
+    def refresh_table(self):
+        history = sorted(self.map_id_to_data.values(), key=lambda item: str(item['timestamp'] or ''), reverse=True)
         rowdata = []
-        self.map_id_to_data = {} 
+        self.stale = False
         
         for item in history:
             timestamp = item['timestamp']
@@ -1084,10 +1843,9 @@ class HistoryScreen(FrameManager):
             total_eff = f"{item['total_efficiency']:.2f}%"
             eff_drop = f"{item['efficiency_drop']:.2f}%"
             
-            # Reordered to match columns: ID, Location, Fuel, Eff, Drop, Date
-            row = (item['id'], item['plant_location'], item['fuel_type'], total_eff, eff_drop, timestamp)
+            # Reordered to match columns: ID, Location, Fuel, Eff, Drop, Runs, Date
+            row = (item['id'], item['plant_location'], item['fuel_type'], total_eff, eff_drop, item['run_count'], timestamp)
             rowdata.append(row)
-            self.map_id_to_data[item['id']] = item
 
         self.table.build_table_data(self.columns, rowdata)
         self.table.load_table_data()
@@ -1104,6 +1862,60 @@ class HistoryScreen(FrameManager):
                 self.load_history_result(item['inputs_json'])
                 break # View only one
 
+    def duplicate_selected(self):
+        """Open the selected calculation's inputs on the input screen for editing"""
+        selected_rows = self.table.get_rows(selected=True)
+        if not selected_rows:
+            return
+        item = self.map_id_to_data.get(selected_rows[0].values[0])
+        if item is None:
+            return
+        try:
+            import json
+            input_data = json.loads(item['inputs_json'])
+        except Exception as e:
+            print(f"Error loading history: {e}")
+            return
+        self.controller.frames[InputScreen].duplicate(input_data)
+        self.controller.show_frame(InputScreen)
+
+    def compare_selected(self):
+        selected_rows = self.table.get_rows(selected=True)
+        if len(selected_rows) < 2:
+            return
+
+        ids = [row.values[0] for row in selected_rows]
+        self.controller.frames[ComparisonScreen].display_comparison(ids)
+        self.controller.show_frame(ComparisonScreen)
+
+    def export_reports(self):
+        """Render a PDF report per selected calculation in parallel background processes"""
+        selected_rows = self.table.get_rows(selected=True)
+        if not selected_rows:
+            return
+        from tkinter import filedialog
+        out_dir = filedialog.askdirectory(title="Save reports to")
+        if not out_dir:
+            return
+
+        rows = db.get_calculations([row.values[0] for row in selected_rows])
+        pool = get_report_pool()
+        futures = [pool.submit(render_calculation, row, out_dir, 'pdf') for row in rows]
+        self.report_label.config(text=f"Rendering 0/{len(futures)} reports...")
+        self.after(200, self.poll_reports, futures, out_dir)
+
+    def poll_reports(self, futures, out_dir):
+        done = sum(future.done() for future in futures)
+        if done < len(futures):
+            self.report_label.config(text=f"Rendering {done}/{len(futures)} reports...")
+            self.after(200, self.poll_reports, futures, out_dir)
+            return
+        failed = [future.result()[0] for future in futures if future.result()[2]]
+        text = f"Saved {len(futures) - len(failed)} reports to {out_dir}"
+        if failed:
+            text += f" ({len(failed)} failed)"
+        self.report_label.config(text=text)
+
     def delete_selected(self):
         selected_rows = self.table.get_rows(selected=True)
         if not selected_rows:
@@ -1113,14 +1925,9 @@ class HistoryScreen(FrameManager):
         if not messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected calculations?"):
             return
 
-        deleted_ids = []
-        for row in selected_rows:
-            calc_id = row.values[0]
-            if db.delete_calculation(calc_id):
-                deleted_ids.append(calc_id)
-        
-        if deleted_ids:
-             self.load_data()
+        ids = [row.values[0] for row in selected_rows]
+        if db.delete_calculations(ids):
+             db.poll_changes()
         
     def load_history_result(self, inputs_json):
         try:
@@ -1131,3 +1938,179 @@ class HistoryScreen(FrameManager):
         except Exception as e:
             print(f"Error loading history: {e}")
 
+
+class ComparisonScreen(FrameManager):
+    """Overlay of N saved calculations: metrics with deltas, stage mix and sensitivity curves"""
+    COLORS = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f",
+              "#edc948", "#b07aa1", "#ff9da7", "#9c755f", "#bab0ac"]
+    STAGE_COLORS = ["#4e79a7", "#f28e2b", "#e15759", "#bab0ac", "#76b7b2",
+                    "#59a14f", "#edc948", "#b07aa1", "#ff9da7", "#9c755f"]
+
+    def __init__(self, parent, controller):
+        super().__init__(parent, controller)
+        self.controller = controller
+        self.comparison = None
+
+        ttk.Label(self, text="Scenario Comparison", font=(self.controller.system_font, 24, "bold")).pack(pady=20)
+
+        # Metrics table; each row uses its scenario colour and doubles as the chart legend
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill="x", padx=20, pady=5)
+        columns = ("scenario", "efficiency", "efficiency_delta", "drop", "drop_delta", "emissions", "emissions_delta")
+        headings = ("Scenario", "Total efficiency", "\u0394", "Efficiency drop", "\u0394", "Emissions", "\u0394")
+        self.metrics_table = ttk.Treeview(table_frame, columns=columns, show="headings", height=8)
+        for column, heading in zip(columns, headings):
+            self.metrics_table.heading(column, text=heading)
+            self.metrics_table.column(column, width=260 if column == "scenario" else 100, stretch=column == "scenario")
+        table_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.metrics_table.yview)
+        self.metrics_table.configure(yscrollcommand=table_scroll.set)
+        self.metrics_table.pack(side="left", fill="x", expand=True)
+        table_scroll.pack(side="right", fill="y")
+
+        charts = ttk.Frame(self)
+        charts.pack(fill="both", expand=True, padx=20, pady=10)
+        charts.columnconfigure(0, weight=1)
+        charts.columnconfigure(1, weight=1)
+        charts.rowconfigure(0, weight=1)
+        charts.rowconfigure(1, weight=1)
+
+        stage_frame = ttk.LabelFrame(charts, text="Energy Contribution (Share)")
+        stage_frame.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=10, pady=5)
+        self.stage_canvas = tk.Canvas(stage_frame, height=200, bg="white")
+        self.stage_canvas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.stage_canvas.bind("<Configure>", lambda e: self.draw_stage_chart())
+
+        ccs_frame = ttk.LabelFrame(charts, text="CCS Efficiency Sensitivity Analysis")
+        ccs_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
+        self.ccs_canvas = tk.Canvas(ccs_frame, height=250, bg="white")
+        self.ccs_canvas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.ccs_canvas.bind("<Configure>", lambda e: self.draw_sensitivity_charts())
+
+        general_frame = ttk.LabelFrame(charts, text="General Sensitivity Analysis")
+        general_frame.grid(row=1, column=1, sticky="nsew", padx=10, pady=5)
+        self.general_canvas = tk.Canvas(general_frame, height=250, bg="white")
+        self.general_canvas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.general_canvas.bind("<Configure>", lambda e: self.draw_sensitivity_charts())
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x", padx=20, pady=10)
+        ttk.Button(button_frame, text="Back", command=lambda: controller.show_frame(HistoryScreen)).pack(side="left")
+
+    def color(self, index):
+        return self.COLORS[index % len(self.COLORS)]
+
+    def display_comparison(self, ids):
+        """Load the selected calculations in one query and draw them together"""
+        rows = db.get_calculations(ids)
+        self.comparison = compare_scenarios(rows)
+
+        self.metrics_table.delete(*self.metrics_table.get_children())
+        if not self.comparison:
+            return
+
+        metrics = self.comparison['metrics']
+        deltas = self.comparison['metric_deltas']
+        for i, label in enumerate(self.comparison['labels']):
+            tag = f"scenario{i}"
+            self.metrics_table.tag_configure(tag, foreground=self.color(i))
+            if self.comparison['recomputed'][i]:
+                # Stored results lacked figures, so these come from the current calculator
+                label += " (recomputed)"
+            if self.comparison['legacy_emissions'][i]:
+                # Saved before per-stage emissions, in the old factor units
+                label += " (legacy emissions)"
+            self.metrics_table.insert("", "end", tags=(tag,), values=(
+                label,
+                f"{metrics['total_efficiency'][i]:.2f}%", f"{deltas['total_efficiency'][i]:+.2f}",
+                f"{metrics['efficiency_drop'][i]:.2f}%", f"{deltas['efficiency_drop'][i]:+.2f}",
+                f"{metrics['total_emissions'][i]:.2f}", f"{deltas['total_emissions'][i]:+.2f}",
+            ))
+
+        self.draw_stage_chart()
+        self.draw_sensitivity_charts()
+
+    def draw_stage_chart(self):
+        """One stacked horizontal bar per scenario"""
+        canvas = self.stage_canvas
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width < 10 or height < 10 or not self.comparison:
+            return
+
+        PAD_LEFT, PAD_RIGHT, PAD_TOP, PAD_BOTTOM = 60, 20, 10, 30
+        shares = self.comparison['stage_shares']
+        n = len(shares)
+        bar_h = (height - PAD_TOP - PAD_BOTTOM) / n
+        chart_w = width - PAD_LEFT - PAD_RIGHT
+
+        for i, row in enumerate(shares):
+            y0 = PAD_TOP + i * bar_h
+            x = PAD_LEFT
+            for j, share in enumerate(row):
+                color = self.STAGE_COLORS[j % len(self.STAGE_COLORS)]
+                if share > 0:
+                    canvas.create_rectangle(x, y0, x + share * chart_w, y0 + bar_h * 0.8, fill=color, outline="")
+                    x += share * chart_w
+            if bar_h >= 10:
+                canvas.create_text(PAD_LEFT - 5, y0 + bar_h * 0.4, text=f"#{self.comparison['ids'][i]}",
+                                   anchor="e", font=("Arial", 8), fill=self.color(i))
+
+        # Stage legend along the bottom
+        labels = {stage['key']: stage['label'] for stage in stage_model.stages}
+        legend_x = PAD_LEFT
+        for j, stage in enumerate(self.comparison['stage_keys']):
+            color = self.STAGE_COLORS[j % len(self.STAGE_COLORS)]
+            canvas.create_rectangle(legend_x, height - 20, legend_x + 12, height - 8, fill=color, outline="")
+            canvas.create_text(legend_x + 16, height - 14, text=labels.get(stage, stage), anchor="w", font=("Arial", 9))
+            legend_x += 120
+
+    def draw_sensitivity_charts(self):
+        if not self.comparison:
+            return
+        self.draw_overlay(self.ccs_canvas,
+                          self.comparison['ccs_sensitivity_percentages'],
+                          self.comparison['ccs_sensitivity'],
+                          "CCS Percentage (%)")
+        self.draw_overlay(self.general_canvas,
+                          self.comparison['general_sensitivity_percentages'],
+                          self.comparison['general_sensitivity'],
+                          "Contrib. Percentage (Gener. const.) (%)")
+
+    def draw_overlay(self, canvas, percentages, efficiencies, x_title):
+        """Draw every scenario's curve on shared axes, one polyline per scenario"""
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width < 10 or height < 10:
+            return
+
+        PAD_LEFT, PAD_RIGHT, PAD_TOP, PAD_BOTTOM = 70, 20, 20, 50
+        chart_w = width - PAD_LEFT - PAD_RIGHT
+        chart_h = height - PAD_TOP - PAD_BOTTOM
+
+        min_p, max_p = float(percentages.min()), float(percentages.max())
+        min_eff, max_eff = float(efficiencies.min()), float(efficiencies.max())
+        range_p = max_p - min_p if max_p != min_p else 1
+        range_eff = max_eff - min_eff if max_eff != min_eff else 1
+
+        # Axes and labels
+        canvas.create_line(PAD_LEFT, height - PAD_BOTTOM, width - PAD_RIGHT, height - PAD_BOTTOM)
+        canvas.create_line(PAD_LEFT, PAD_TOP, PAD_LEFT, height - PAD_BOTTOM)
+        canvas.create_text(PAD_LEFT + chart_w // 2, height - PAD_BOTTOM // 3, text=x_title,
+                           anchor="center", font=("Arial", 9, "bold"))
+        canvas.create_text(PAD_LEFT // 3, PAD_TOP + chart_h // 2, text="Efficiency (%)",
+                           anchor="center", angle=90, font=("Arial", 9, "bold"))
+        canvas.create_text(PAD_LEFT - 5, PAD_TOP, text=f"{max_eff:.1f}", anchor="e", font=("Arial", 8))
+        canvas.create_text(PAD_LEFT - 5, height - PAD_BOTTOM, text=f"{min_eff:.1f}", anchor="e", font=("Arial", 8))
+        canvas.create_text(PAD_LEFT, height - PAD_BOTTOM + 12, text=f"{min_p:g}%", anchor="center", font=("Arial", 8))
+        canvas.create_text(width - PAD_RIGHT, height - PAD_BOTTOM + 12, text=f"{max_p:g}%", anchor="center", font=("Arial", 8))
+
+        xs = PAD_LEFT + (percentages - min_p) / range_p * chart_w
+        ys = height - PAD_BOTTOM - (efficiencies - min_eff) / range_eff * chart_h
+        for i, (x_row, y_row) in enumerate(zip(xs, ys)):
+            coords = np.column_stack([x_row, y_row]).ravel().tolist()
+            if len(coords) >= 4:
+                canvas.create_line(*coords, fill=self.color(i), width=2)
+
+    def on_show(self):
+        self.draw_stage_chart()
+        self.draw_sensitivity_charts()
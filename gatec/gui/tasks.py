@@ -0,0 +1,51 @@
+from gatec.core.tasks import Task
+
+
+class TaskRunner:
+    """
+    Runs background Tasks for a Tk widget and hands their events to
+    callbacks on the main loop, polling with after() only while a task is
+    running. Progress is coalesced to the latest value per poll; partial
+    results are delivered in order.
+    """
+    POLL_MS = 50
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.tasks = {}
+        self.after_id = None
+
+    def submit(self, fn, *args, process=False, on_progress=None, on_partial=None,
+               on_done=None, on_error=None, on_cancel=None, **kwargs):
+        """
+        Start fn(context, *args, **kwargs) in a thread (or a worker process)
+        and return its Task. Callbacks: on_progress(done, total, message),
+        on_partial(data), on_done(result), on_error(message), on_cancel(result).
+        """
+        task = Task(fn, args, kwargs, process=process).start()
+        self.tasks[task] = {
+            'progress': on_progress, 'partial': on_partial, 'done': on_done,
+            'error': on_error, 'cancelled': on_cancel,
+        }
+        if self.after_id is None:
+            self.after_id = self.widget.after(self.POLL_MS, self.poll)
+        return task
+
+    def cancel_all(self):
+        for task in self.tasks:
+            task.cancel()
+
+    def poll(self):
+        self.after_id = None
+        for task, callbacks in list(self.tasks.items()):
+            events = task.poll()
+            updates = [data for kind, data in events if kind == 'progress']
+            if updates and callbacks['progress'] is not None:
+                callbacks['progress'](*updates[-1])
+            for kind, data in events:
+                if kind != 'progress' and callbacks[kind] is not None:
+                    callbacks[kind](data)
+            if task.finished:
+                del self.tasks[task]
+        if self.tasks:
+            self.after_id = self.widget.after(self.POLL_MS, self.poll)
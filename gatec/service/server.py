@@ -0,0 +1,344 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from gatec.core.batch import NUMERIC_FIELDS, calculate_batch, calculate_sweep, row_results
+from gatec.core.importer import validate_chunk
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Largest /sweep; each point counts as one pending calculation
+MAX_SWEEP_POINTS = 10000
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def calculate_many(inputs):
+    """
+    Worker-process entry point: validate many scenarios with the input form
+    rules (as an import does) and evaluate the valid ones in one batch call.
+    Invalid scenarios get {'error': ...} in their place, so one malformed
+    request does not fail the others.
+    """
+    results = [{'error': "Expected a JSON object of inputs"} for _ in inputs]
+    positions = [i for i, item in enumerate(inputs) if isinstance(item, dict)]
+    if not positions:
+        return results
+
+    columns, valid, messages = validate_chunk([inputs[i] for i in positions])
+    for k, row_messages in messages.items():
+        results[positions[k]] = {'error': "; ".join(row_messages)}
+    rows = np.flatnonzero(valid)
+    if len(rows):
+        batch = calculate_batch({field: values[rows] for field, values in columns.items()})
+        for k, row in enumerate(rows):
+            results[positions[row]] = row_results(batch, k)
+    return results
+
+
+def sweep(input_data, field, values=None, start=None, stop=None, steps=None):
+    """Worker-process entry point for one-field sweeps over values, or steps points from start to stop"""
+    if values is None:
+        values = np.linspace(start, stop, steps)
+    batch = calculate_sweep(input_data, field, values)
+    return {
+        'field': field,
+        'values': np.asarray(values, dtype=float).tolist(),
+        'total_efficiency': batch['total_efficiency'].tolist(),
+        'efficiency_drop': batch['efficiency_drop'].tolist(),
+        'total_emissions': batch['total_emissions'].tolist(),
+    }
+
+
+class CalculationService:
+    """
+    Local HTTP/JSON API over the calculator.
+
+    Runs on asyncio; CPU work goes to a process pool. Single /calculate
+    requests are collected for a few milliseconds and evaluated together,
+    and new work is refused with 503 once max_pending requests are queued
+    (413 for a single batch larger than max_pending).
+    """
+    def __init__(self, host='127.0.0.1', port=8765, workers=None, max_pending=10000,
+                 batch_window=0.002, max_batch=512, db=None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.db = db
+        self.pool = None
+        self.server = None
+        self._queue = None
+        self._pending = 0
+        self._batcher = None
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batcher())
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        print(f"GATEC service listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._batcher:
+            self._batcher.cancel()
+        if self.server:
+            self.server.close()
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # -- Request batching --
+
+    async def _run_batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            asyncio.create_task(self._dispatch(items))
+
+    async def _dispatch(self, items):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, calculate_many, [item for item, _ in items])
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _admit(self, cost=1):
+        """Backpressure: reject work once too many requests are in flight"""
+        if cost > self.max_pending:
+            # Could never be admitted, so retrying would not help
+            raise HTTPError(413, f"Too many scenarios in one request (limit {self.max_pending})")
+        if self._pending + cost > self.max_pending:
+            raise HTTPError(503, "Server busy, retry later")
+        self._pending += cost
+
+    # -- HTTP handling --
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self._route(method, target, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            self._write_response(writer, e.status, {'error': e.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode() + b"\r\n" + body)
+
+    async def _route(self, method, target, body):
+        url = urlsplit(target)
+        routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/calculate'): self.calculate,
+            ('POST', '/batch'): self.batch,
+            ('POST', '/sweep'): self.sweep,
+            ('GET', '/history'): self.history,
+        }
+        handler = routes.get((method, url.path))
+        if handler is None:
+            known = [path for _, path in routes]
+            return (405, {'error': 'Method not allowed'}) if url.path in known else (404, {'error': 'Not found'})
+
+        try:
+            data = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            return 400, {'error': 'Invalid JSON body'}
+
+        try:
+            return 200, await handler(data, parse_qs(url.query))
+        except HTTPError as e:
+            return e.status, {'error': e.message}
+        except (ValueError, TypeError, KeyError) as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    # -- Endpoints --
+
+    async def health(self, data, query):
+        return {'status': 'ok', 'pending': self._pending, 'workers': self.workers}
+
+    async def calculate(self, data, query):
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Expected a JSON object of inputs")
+        self._admit()
+        try:
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait((data, future))
+            result = await future
+        finally:
+            self._pending -= 1
+        if 'error' in result:
+            raise HTTPError(400, result['error'])
+        return result
+
+    async def batch(self, data, query):
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Expected {\"inputs\": [...]}")
+        inputs = data.get('inputs')
+        if not isinstance(inputs, list):
+            raise HTTPError(400, "Expected {\"inputs\": [...]}")
+        self._admit(len(inputs))
+        try:
+            loop = asyncio.get_running_loop()
+            return {'results': await loop.run_in_executor(self.pool, calculate_many, inputs)}
+        finally:
+            self._pending -= len(inputs)
+
+    async def sweep(self, data, query):
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Expected a JSON object")
+        field = data.get('field')
+        if field not in NUMERIC_FIELDS:
+            raise HTTPError(400, f"Cannot sweep {field}")
+        input_data = data.get('input', {})
+        if not isinstance(input_data, dict):
+            raise HTTPError(400, "Expected \"input\" to be a JSON object of inputs")
+        columns, valid, messages = validate_chunk([input_data])
+        if not valid[0]:
+            raise HTTPError(400, "; ".join(messages[0]))
+        input_data = {name: values[0].item() for name, values in columns.items()}
+
+        # Only the size is checked here; the grid itself is built in the worker
+        if 'values' in data:
+            if not isinstance(data['values'], list):
+                raise HTTPError(400, "Expected \"values\" to be a list")
+            points = len(data['values'])
+            grid = (data['values'], None, None, None)
+        else:
+            points = int(data.get('steps', 50))
+            grid = (None, float(data['start']), float(data['stop']), points)
+            if not (np.isfinite(grid[1]) and np.isfinite(grid[2])):
+                raise HTTPError(400, "start and stop must be finite numbers")
+        if not 1 <= points <= MAX_SWEEP_POINTS:
+            raise HTTPError(400, f"A sweep takes 1 to {MAX_SWEEP_POINTS} points")
+        if grid[0] is not None:
+            values = [float(v) for v in grid[0]]
+            if not all(np.isfinite(values)):
+                raise HTTPError(400, "Sweep values must be finite numbers")
+            grid = (values, None, None, None)
+
+        self._admit(points)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, sweep, input_data, field, *grid)
+        finally:
+            self._pending -= points
+
+    async def history(self, data, query):
+        limit = int(query.get('limit', ['50'])[0])
+        offset = int(query.get('offset', ['0'])[0])
+        loop = asyncio.get_running_loop()
+        # SQLite calls block, so keep them off the event loop
+        rows = await loop.run_in_executor(None, lambda: self._get_db().get_history(limit=limit, offset=offset))
+        for row in rows:
+            row['inputs'] = json.loads(row.pop('inputs_json') or '{}')
+        return {'history': rows}
+
+    def _get_db(self):
+        if self.db is None:
+            from gatec.core.db_manager import db
+            self.db = db
+        return self.db
+
+
+def serve(host='127.0.0.1', port=8765, workers=None, max_pending=10000):
+    """Run the calculation service until interrupted"""
+    service = CalculationService(host=host, port=port, workers=workers, max_pending=max_pending)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
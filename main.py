@@ -1,5 +1,4 @@
-from gatec.gui.app import App
+from gatec.cli import main
 
 if __name__ == "__main__":
-    app = App()
-    app.mainloop()
+    main()
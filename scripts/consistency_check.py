@@ -0,0 +1,166 @@
+"""
+Consistency checks for the GATEC fast paths.
+
+Each check compares an optimised code path with the straightforward way of
+computing the same figures on random data, and fails with exit code 1 when
+they disagree:
+
+    fleet       Fleet.update_plant (incremental sums) vs a full Fleet.refresh
+    timeseries  TimeSeriesCalculator fed in small chunks vs the whole series at once
+    ccs         optimize_ccs (pruned, vectorized search) vs brute force over every combination
+
+    python scripts/consistency_check.py
+    python scripts/consistency_check.py fleet --seed 7
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_plant(index, rng):
+    efficiency = rng.uniform(30, 60)
+    ccs = rng.random() < 0.5
+    return {
+        'plant_location': f"Plant {index} - Testland",
+        'total_output': rng.uniform(100, 1000),
+        'plant_efficiency': efficiency,
+        'extraction': rng.uniform(5, 20),
+        'processing': rng.uniform(5, 15),
+        'transportation': rng.uniform(5, 15),
+        'ccs': ccs,
+        'ccs_capture': 20 if ccs else 0,
+        'ccs_compression': 15 if ccs else 0,
+        'ccs_transportation': 45 if ccs else 0,
+        'ccs_storage': 5 if ccs else 0,
+        'ccs_capture_rate': 0.9 if ccs else 0.0,
+        'include_emissions': True,
+        'emissions_value': rng.uniform(200, 400),
+        'upstream_emissions': rng.uniform(10, 50),
+    }
+
+
+def close(a, b):
+    return np.allclose(a, b, rtol=1e-9, atol=1e-9)
+
+
+def check_fleet(rng):
+    from gatec.core.fleet import Fleet
+
+    fleet = Fleet([make_plant(i, rng) for i in range(200)])
+    for _ in range(500):
+        index = rng.randrange(len(fleet))
+        field = rng.choice(['total_output', 'plant_efficiency', 'extraction', 'ccs_capture', 'ccs'])
+        value = rng.random() < 0.5 if field == 'ccs' else rng.uniform(1, 1000 if field == 'total_output' else 60)
+        fleet.update_plant(index, **{field: value})
+    incremental = fleet.summary()
+    incremental_contributions = fleet.marginal_contributions()
+
+    fleet.refresh()
+    full = fleet.summary()
+    full_contributions = fleet.marginal_contributions()
+
+    failures = [key for key in full if key != 'stage_shares' and not close(incremental[key], full[key])]
+    failures += [f"stage_shares[{stage}]" for stage in full['stage_shares']
+                 if not close(incremental['stage_shares'][stage], full['stage_shares'][stage])]
+    if not close(incremental_contributions['efficiency_contribution'], full_contributions['efficiency_contribution']):
+        failures.append('efficiency_contribution')
+    return failures
+
+
+def check_timeseries(rng):
+    from gatec.core.timeseries import stream_timeseries, SERIES_OUTPUTS
+
+    n = 5000
+    series = {
+        'total_output': np.array([rng.uniform(0, 500) if rng.random() > 0.1 else 0.0 for _ in range(n)]),
+        'plant_efficiency': np.array([rng.uniform(30, 60) for _ in range(n)]),
+        'ccs': np.array([rng.random() < 0.7 for _ in range(n)]),
+    }
+    plant = {field: value for field, value in make_plant(0, rng).items() if field != 'plant_location'}
+
+    def run(chunk_size):
+        outputs = {name: [] for name in SERIES_OUTPUTS}
+        calculator = None
+        for calculator, results in stream_timeseries(series, plant, window_hours=24, chunk_size=chunk_size):
+            for name in SERIES_OUTPUTS:
+                outputs[name].append(results[name])
+        return {name: np.concatenate(values) for name, values in outputs.items()}, calculator.summary()
+
+    whole, whole_summary = run(n)
+    failures = []
+    # Chunks shorter than the window, and ones not dividing the series evenly
+    for chunk_size in (7, 23, 24, 97, 1000):
+        chunked, chunked_summary = run(chunk_size)
+        failures += [f"{name} (chunk {chunk_size})" for name in SERIES_OUTPUTS if not close(chunked[name], whole[name])]
+        failures += [f"summary {key} (chunk {chunk_size})" for key in whole_summary
+                     if not close(chunked_summary[key], whole_summary[key])]
+    return failures
+
+
+def check_ccs(rng):
+    from gatec.core.calculator import calculate_results
+    from gatec.core.ccs_optimizer import optimize_ccs, COMPONENTS
+
+    options = {
+        'capture': [{'name': f"capture {i}", 'consumption': rng.uniform(10, 30), 'capture_rate': rng.uniform(0.7, 0.99)}
+                    for i in range(5)],
+    }
+    for component in COMPONENTS[1:]:
+        options[component] = [{'name': f"{component} {i}", 'consumption': rng.uniform(2, 60),
+                               'leakage': rng.uniform(0, 0.03)} for i in range(4)]
+    plant = make_plant(0, rng)
+    plant['generation'] = plant['total_output'] / (plant['plant_efficiency'] / 100)
+
+    points = []
+    for combination in itertools.product(*(options[component] for component in COMPONENTS)):
+        input_data = dict(plant, ccs=True, include_emissions=True)
+        retention = 1.0
+        for component, option in zip(COMPONENTS, combination):
+            input_data[f'ccs_{component}'] = option['consumption']
+            retention *= option['capture_rate'] if component == 'capture' else 1 - option['leakage']
+        input_data['ccs_capture_rate'] = retention
+        results = calculate_results(input_data)
+        points.append((tuple(option['name'] for option in combination),
+                       results['total_efficiency'], results['total_emissions']))
+
+    expected = {
+        names for names, efficiency, emissions in points
+        if not any(e >= efficiency and m <= emissions and (e > efficiency or m < emissions) for _, e, m in points)
+    }
+    found = {tuple(entry[component] for component in COMPONENTS) for entry in optimize_ccs(plant, options)}
+    return [f"missing {' / '.join(names)}" for names in expected - found] + \
+           [f"extra {' / '.join(names)}" for names in found - expected]
+
+
+CHECKS = {
+    'fleet': check_fleet,
+    'timeseries': check_timeseries,
+    'ccs': check_ccs,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare GATEC fast paths with direct computation")
+    parser.add_argument('checks', nargs='*', help=f"Checks to run: {', '.join(CHECKS)} (default: all)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown check: {', '.join(unknown)}")
+
+    failed = False
+    for name in args.checks or CHECKS:
+        failures = CHECKS[name](random.Random(args.seed))
+        print(f"{name}: {'FAIL ' + ', '.join(failures) if failures else 'ok'}")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Load test for the GATEC calculation service (gatec serve).
+
+Opens a number of keep-alive connections and fires POST /calculate requests
+for a fixed duration, then prints throughput and latency percentiles.
+
+    python scripts/load_test.py --connections 64 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+def make_input():
+    efficiency = random.uniform(30, 60)
+    output = random.uniform(100, 1000)
+    return {
+        'total_output': output,
+        'plant_efficiency': efficiency,
+        'generation': output / (efficiency / 100),
+        'extraction': random.uniform(5, 20),
+        'processing': random.uniform(5, 15),
+        'transportation': random.uniform(5, 15),
+        'ccs': random.random() < 0.5,
+        'ccs_capture': 20,
+        'ccs_compression': 15,
+        'ccs_transportation': 45,
+        'ccs_storage': 5,
+        'include_emissions': True,
+        'emissions_value': 341,
+        'upstream_emissions': 270,
+    }
+
+
+async def client(host, port, deadline, latencies, errors, payloads):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            body = random.choice(payloads)
+            request = (
+                f"POST /calculate HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode().partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+
+            if b' 200 ' in status_line:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status_line.decode().strip())
+    finally:
+        writer.close()
+
+
+async def run(host, port, connections, duration):
+    payloads = [json.dumps(make_input()).encode() for _ in range(1000)]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, deadline, latencies, errors, payloads) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    print(f"Requests: {len(latencies)} ok, {len(errors)} failed in {elapsed:.1f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} req/s")
+    if latencies:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        print(f"Latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms")
+    if errors:
+        print(f"First error: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the GATEC calculation service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.connections, args.duration))
+
+
+if __name__ == '__main__':
+    main()
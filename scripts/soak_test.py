@@ -0,0 +1,183 @@
+"""
+Soak test for the GATEC desktop application.
+
+Drives thousands of home / input / RUN / history cycles through
+App.show_frame, as an operator would over days, and samples the process
+RSS, the number of Tk widgets, canvas items and pending after() callbacks.
+Fails with exit code 1 when any of them grows by more than its threshold
+between the end of the warm-up and the last cycle.
+
+Needs a display; on a headless machine run it under Xvfb:
+
+    xvfb-run -a python scripts/soak_test.py --cycles 2000 --csv soak.csv
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_scenario(index, rng):
+    efficiency = rng.uniform(30, 60)
+    output = rng.uniform(100, 1000)
+    return {
+        'plant_location': f"Soak Plant {index} - Testland",
+        'plant_efficiency': round(efficiency, 2),
+        'total_output': round(output, 2),
+        'generation': round(output / (efficiency / 100), 2),
+        'extraction': round(rng.uniform(5, 20), 2),
+        'processing': round(rng.uniform(5, 15), 2),
+        'transportation': round(rng.uniform(5, 15), 2),
+        'ccs': rng.random() < 0.5,
+        'ccs_capture': 20.0,
+        'ccs_compression': 15.0,
+        'ccs_transportation': 45.0,
+        'ccs_storage': 5.0,
+        'ccs_capture_rate': 0.9,
+        'include_emissions': True,
+        'emissions_value': 341.0,
+        'upstream_emissions': 270.0,
+        'sensitivity_value': 5.0,
+        'ccs_sensitivity_value': 5.0,
+    }
+
+
+def rss_kb():
+    """Resident set size of this process in kB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # peak only, where /proc is missing
+
+
+def walk(widget):
+    yield widget
+    for child in widget.winfo_children():
+        yield from walk(child)
+
+
+def take_sample(app, cycle, started):
+    widgets = list(walk(app))
+    return {
+        'cycle': cycle,
+        'seconds': round(time.perf_counter() - started, 1),
+        'rss_kb': rss_kb(),
+        'widgets': len(widgets),
+        'canvas_items': sum(len(w.find_all()) for w in widgets if w.winfo_class() == 'Canvas'),
+        'after_callbacks': len(app.tk.splitlist(app.tk.call('after', 'info'))),
+        'python_objects': len(gc.get_objects()),
+    }
+
+
+def pump(app):
+    """Let Tk process the redraws and callbacks a real session would"""
+    app.update_idletasks()
+    app.update()
+
+
+def run_cycle(app, scenario, screens, db):
+    HomeScreen, InputScreen, HistoryScreen = screens
+    app.show_frame(HomeScreen)
+    pump(app)
+
+    input_screen = app.show_frame(InputScreen)
+    input_screen.load_inputs(scenario)
+    pump(app)
+    input_screen.collect_data()  # RUN: saves and shows the results
+    pump(app)
+    db.poll_changes()  # the app does this once a second
+
+    history = app.show_frame(HistoryScreen)
+    pump(app)
+    history.load_history_result(json.dumps(scenario))
+    pump(app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test the GATEC desktop application")
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200,
+                        help="Cycles before the baseline sample (caches and undo history fill up)")
+    parser.add_argument('--sample-every', type=int, default=50)
+    parser.add_argument('--scenarios', type=int, default=50,
+                        help="Distinct scenarios cycled through, so the history stops growing after warm-up")
+    parser.add_argument('--max-rss-growth-mb', type=float, default=64.0)
+    parser.add_argument('--max-widget-growth', type=int, default=20)
+    parser.add_argument('--max-canvas-growth', type=int, default=100)
+    parser.add_argument('--max-after-growth', type=int, default=20)
+    parser.add_argument('--csv', default=None, help="Write all samples to this CSV file")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    # Keep the soak history out of the real database
+    workdir = tempfile.mkdtemp(prefix='gatec-soak-')
+    os.environ['GATEC_DB_PATH'] = os.path.join(workdir, 'history.db')
+
+    from gatec.core.db_manager import db
+    from gatec.gui.app import App
+    from gatec.gui.frames import HomeScreen, InputScreen, HistoryScreen
+
+    rng = random.Random(args.seed)
+    scenarios = [make_scenario(i, rng) for i in range(args.scenarios)]
+    screens = (HomeScreen, InputScreen, HistoryScreen)
+
+    app = App()
+    pump(app)
+    started = time.perf_counter()
+    samples = []
+    baseline = None
+    try:
+        for cycle in range(1, args.cycles + 1):
+            run_cycle(app, scenarios[cycle % len(scenarios)], screens, db)
+            if cycle == args.warmup or cycle % args.sample_every == 0 or cycle == args.cycles:
+                gc.collect()
+                sample = take_sample(app, cycle, started)
+                samples.append(sample)
+                if cycle == args.warmup:
+                    baseline = sample
+                print(f"cycle {cycle}: rss {sample['rss_kb'] / 1024:.1f} MB, {sample['widgets']} widgets, "
+                      f"{sample['canvas_items']} canvas items, {sample['after_callbacks']} after callbacks")
+    finally:
+        app.destroy()
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+            writer.writeheader()
+            writer.writerows(samples)
+
+    if baseline is None:
+        print("Not enough cycles to pass the warm-up; nothing checked")
+        return 0
+
+    final = samples[-1]
+    limits = [
+        ('rss_kb', args.max_rss_growth_mb * 1024, "RSS (kB)"),
+        ('widgets', args.max_widget_growth, "Tk widgets"),
+        ('canvas_items', args.max_canvas_growth, "Canvas items"),
+        ('after_callbacks', args.max_after_growth, "after() callbacks"),
+    ]
+    failed = False
+    print(f"\nGrowth from cycle {baseline['cycle']} to {final['cycle']}:")
+    for key, limit, label in limits:
+        growth = final[key] - baseline[key]
+        status = "FAIL" if growth > limit else "ok"
+        failed |= growth > limit
+        print(f"  {label}: {baseline[key]} -> {final[key]} ({growth:+}, limit {limit:g}) {status}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())